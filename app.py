@@ -1,4 +1,6 @@
 from dotenv import load_dotenv
+import argparse
+import asyncio
 import os
 import sys
 
@@ -8,7 +10,12 @@ sys.path.insert(0, os.path.abspath(os.path.join(current_dir, "..")))
 from contract_breach_detector.modules.contract_processor import ContractProcessor
 from contract_breach_detector.modules.DB_code import DataBase
 from contract_breach_detector.modules.breach_detector import DetectBreach
-from contract_breach_detector.modules.query_llm import QueryLLM
+from contract_breach_detector.modules.query_llm import QueryLLM, AsyncQueryLLM
+from contract_breach_detector.modules.batch_pipeline import BatchProcessor
+from contract_breach_detector.modules.contract_watcher import ContractWatcher
+from contract_breach_detector.modules.parsed_contract import ParsedContractCache
+from contract_breach_detector.modules.prompt_compactor import PromptCompactor
+from contract_breach_detector.modules.field_extractor import FieldExtractor
 import contract_breach_detector.modules.structured_outputs as structured_outputs
 
 # Load environment variables from .env file
@@ -20,11 +27,87 @@ base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # List of test contracts to process
 test_contracts = ["Copper_contract", "Steel_contract", "Aluminium_contract"]
 
+# Command-line options, including an optional batch mode that processes a directory of contracts concurrently
+parser = argparse.ArgumentParser(description="Detect contract breaches against ERP data.")
+parser.add_argument("--batch", help="Directory of .docx contracts to process concurrently.")
+parser.add_argument("--max-in-flight", type=int, default=8, help="Maximum contracts processed at once.")
+parser.add_argument("--output-dir", help="Directory for highlighted HTML output (skipped if not set).")
+parser.add_argument("--use-async", action="store_true", help="Drive the batch from a single asyncio event loop.")
+parser.add_argument("--erp-db", help="Persistent .duckdb file to ingest the ERP JSON into (re-ingested only on change).")
+parser.add_argument("--token-budget", type=int, help="Send only the most relevant sections of longer contracts, up to this many tokens.")
+parser.add_argument("--local-fields", action="store_true", help="Extract pattern-matched fields locally, asking the LLM only for the rest.")
+parser.add_argument("--watch", help="Directory of .docx contracts to watch, reprocessing only what changes.")
+parser.add_argument("--manifest", default="cache/watch_manifest.json", help="Where --watch keeps hashes and results.")
+parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds between --watch scans.")
+args = parser.parse_args()
+
 # Initialize the LLM, document processor, and database
 llm = QueryLLM(debug=False)
-doc_processor = ContractProcessor(llm)
+contract_cache = ParsedContractCache()
+compactor = PromptCompactor(token_budget=args.token_budget) if args.token_budget else None
+field_extractor = FieldExtractor() if args.local_fields else None
+# Highlight positions are found by searching the contract for each extracted value
+doc_processor = ContractProcessor(
+    llm, contract_cache=contract_cache, compactor=compactor, align_locations=True, field_extractor=field_extractor
+)
 terms_to_extract = structured_outputs.contract_enforcement
-ERP_db = DataBase('db/deliveries.json', 'db/items.json')
+# ERP lookups are returned as NumPy arrays, avoiding a DataFrame per contract
+ERP_db = DataBase('db/deliveries.json', 'db/items.json', db_path=args.erp_db, result_format="numpy")
+
+# Batch mode: process every contract in a directory and print a throughput summary
+if args.batch:
+    if args.use_async:
+        async_llm = AsyncQueryLLM(debug=False)
+        async_processor = ContractProcessor(
+            async_llm, contract_cache=contract_cache, compactor=compactor, align_locations=True,
+            field_extractor=field_extractor,
+        )
+        batch = BatchProcessor(
+            async_processor, ERP_db, async_llm,
+            output_dir=args.output_dir, max_in_flight=args.max_in_flight,
+        )
+        report = asyncio.run(batch.aprocess(args.batch))
+    else:
+        batch = BatchProcessor(
+            doc_processor, ERP_db, llm, output_dir=args.output_dir, max_in_flight=args.max_in_flight
+        )
+        report = batch.process(args.batch)
+    for result in report.results:
+        if result.error:
+            print(f"{result.contract_name}: FAILED ({result.error})")
+        else:
+            status = "BREACHED" if result.breach.get("breached") else "OK"
+            print(f"{result.contract_name}: {status} ({result.elapsed:.2f}s)")
+    summary = report.summary
+    print(
+        f"\nProcessed {summary.total} contracts ({summary.succeeded} succeeded, {summary.failed} failed, "
+        f"{summary.breached} breached) in {summary.wall_time:.2f}s "
+        f"({summary.contracts_per_second:.2f} contracts/s, max {summary.max_in_flight} in flight)"
+    )
+    sys.exit(0)
+
+# Watch mode: poll a contracts directory and the ERP sources, reprocessing only what changed
+if args.watch:
+    batch = BatchProcessor(doc_processor, ERP_db, llm, output_dir=args.output_dir, max_in_flight=args.max_in_flight)
+    watcher = ContractWatcher(batch, args.watch, manifest_path=args.manifest, poll_interval=args.poll_interval)
+
+    def print_scan(report):
+        for result in report.extracted + report.reevaluated:
+            if result.error:
+                print(f"{result.contract_name}: FAILED ({result.error})")
+            else:
+                print(f"{result.contract_name}: {'BREACHED' if result.breach.get('breached') else 'OK'}")
+        if report.extracted or report.reevaluated or report.removed:
+            print(
+                f"Scan: {len(report.extracted)} extracted, {len(report.reevaluated)} re-checked after ERP changes, "
+                f"{len(report.removed)} removed, {report.unchanged} unchanged ({report.wall_time:.2f}s)"
+            )
+
+    try:
+        watcher.run(on_scan=print_scan)
+    except KeyboardInterrupt:
+        pass
+    sys.exit(0)
 
 # Process each contract
 for i, contract_name in enumerate(test_contracts):
@@ -35,18 +118,27 @@ for i, contract_name in enumerate(test_contracts):
     provided_contract_file_path = os.path.join(contracts_file_path, "provided", f"{contract_name}.docx")
     highlighted_html_contract_file_path = os.path.join(contracts_file_path, "highlighted", f"{contract_name}.html")
 
-    # Load the provided contract
-    doc = doc_processor.load_document(provided_contract_file_path)
+    # Load the provided contract (parsed once, then served from the contract cache)
+    doc = doc_processor.load_contract(provided_contract_file_path)
 
-    # Extract and display responses to example questions
-    exampleQ_responses = doc_processor.extract_terms(doc, structured_outputs.example_questions)
+    # Extract the example questions, contract terms and highlight locations in one query
+    extracted = doc_processor.extract_terms_combined(doc, {
+        "example_questions": structured_outputs.example_questions,
+        "contract_terms": terms_to_extract,
+        "locations": doc_processor.location_terms(
+            ["deliver_date", "contract_number", "quantity", "pallet_dimensions"]
+        ),
+    })
+
+    # Display responses to example questions
+    exampleQ_responses = extracted["example_questions"]
     print("Responses to Example Questions:")
     for key, value in exampleQ_responses.items():
         print(f"Q: {key}\nA: {value}")
     print()
 
-    # Extract structured contract terms
-    doc_structure = doc_processor.extract_terms(doc, terms_to_extract)
+    # Structured contract terms
+    doc_structure = extracted["contract_terms"]
 
     # Initialize breach detector
     breach_detector = DetectBreach(doc_structure, ERP_db, llm)
@@ -61,15 +153,13 @@ for i, contract_name in enumerate(test_contracts):
         print(f"{i+1}. {statement}")
     print()
 
-    # Analyze the comparisons for breaches
-    breach_detail = breach_detector.analyse_comparisons(contract_and_delivered)
+    # Decide breaches with the rule engine, asking the LLM only about fields it cannot decide
+    breach_detail = breach_detector.detect_breach(filtered_ERP)
     if breach_detail["breached"]:
         print(f"The contract has been breached: {breach_detail['breached_description']}\n")
 
-    # Extract terms with locations and generate an HTML-highlighted contract
-    doc_structured_linked = doc_processor.extract_terms_with_locations(
-        doc, fields=["deliver_date", "contract_number", "quantity", "pallet_dimensions"]
-    )
+    # Generate an HTML-highlighted contract from the extracted locations
+    doc_structured_linked = extracted["locations"]
     doc_processor.generate_html_highlight(doc, doc_structured_linked, highlighted_html_contract_file_path)
     print(f"An HTML file with highlighted contract information can be found here: {highlighted_html_contract_file_path}\n")
 print(f"-----------------------------------------------\n")
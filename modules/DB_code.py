@@ -1,60 +1,589 @@
+import glob
+import hashlib
+import os
+import re
+import threading
+
 import duckdb
+import numpy as np
+
+from .metrics import MetricsSink, NullMetrics
+
+# Explicit column types for ingested tables, in source order
+DELIVERIES_COLUMNS = {
+    "delivery_id": "BIGINT",
+    "delivery_date": "DATE",
+    "supplier": "VARCHAR",
+    "carrier": "VARCHAR",
+    "tracking_number": "VARCHAR",
+    "order_number": "VARCHAR",
+}
+
+ITEMS_COLUMNS = {
+    "item_id": "BIGINT",
+    "material_number": "VARCHAR",
+    "material_type": "VARCHAR",
+    "description": "VARCHAR",
+    "base_unit_of_measure": "VARCHAR",
+    "quantity": "BIGINT",
+    "unit_price": "DOUBLE",
+    "currency": "VARCHAR",
+    "batch_number": "VARCHAR",
+    "serial_number": "VARCHAR",
+    "vendor": "VARCHAR",
+    "manufacturer": "VARCHAR",
+    "country_of_origin": "VARCHAR",
+    "weight": "DOUBLE",
+    "dimensions": "VARCHAR",
+    "tax_code": "VARCHAR",
+    "procurement_type": "VARCHAR",
+    "material_group": "VARCHAR",
+    "plant": "VARCHAR",
+    "storage_location": "VARCHAR",
+    "valuation_class": "VARCHAR",
+    "price_control": "VARCHAR",
+    "profit_center": "VARCHAR",
+    "expiration_date": "DATE",
+    "total_amount": "DOUBLE",
+    "pallet_dimensions": "VARCHAR",
+    "contract_number": "BIGINT",
+    "delivery_id": "BIGINT",
+}
+
+# Input formats by file extension; anything else is read as a JSON array
+SOURCE_FORMATS = {".ndjson": "ndjson", ".jsonl": "ndjson", ".parquet": "parquet"}
+
+# Queries prepared once per connection and executed with bound parameters: name -> SQL
+PREPARED_QUERIES = {
+    "lookup_contract": """
+        SELECT d.*, i.*
+        FROM deliveries d
+        JOIN items i
+        ON d.delivery_id = i.delivery_id
+        WHERE i.contract_number = $1::BIGINT
+    """,
+}
+
+# Result formats supported by `query_db` and the lookups
+RESULT_FORMATS = ("pandas", "arrow", "numpy", "rows")
+
+# Result formats of contract lookups, which `DetectBreach` reads by column name
+LOOKUP_FORMATS = ("pandas", "arrow", "numpy")
+
+# Indexes created on ingested tables: name -> (table, column)
+INDEXES = {
+    "items_contract_number_idx": ("items", "contract_number"),
+    "items_delivery_id_idx": ("items", "delivery_id"),
+    "deliveries_delivery_id_idx": ("deliveries", "delivery_id"),
+}
+
 
 class DataBase:
     """
-    A class to interact with a DuckDB in-memory database that processes JSON data
+    A class to interact with a DuckDB database that processes JSON data
     related to deliveries and items.
 
+    By default the JSON files are registered as views on an in-memory database, so
+    every query re-reads them. Passing `db_path` instead ingests them once into typed,
+    indexed tables in a persistent .duckdb file, re-ingesting only sources that changed.
+
+    Sources may be JSON arrays, newline-delimited JSON (.ndjson/.jsonl) or Parquet, and a
+    path may be a glob (e.g. "exports/items-*.parquet") matching many shards. Shards are
+    ingested one at a time, so with `memory_limit` set large exports stream through in
+    bounded memory.
+
     Attributes:
         con (duckdb.DuckDBPyConnection): A connection to the DuckDB database.
+        lock (threading.Lock): Serialises access to the connection, which is not thread-safe.
+        deliveries_path (str): The path or glob of the deliveries source.
+        items_path (str): The path or glob of the items source.
+        db_path (str): The path to the persistent database file, or None for views.
+        prefetched (dict): (result format, ERP rows) loaded by `prefetch_contracts`, keyed by contract number.
+        prepared (set): The names of the `PREPARED_QUERIES` prepared on this connection.
+        result_format (str): The default format query results are fetched in.
+        metrics (MetricsSink): Receives lookup and query timings and prefetch hits.
     """
 
-    def __init__(self, deliveries_path: str, items_path: str):
+    def __init__(
+        self,
+        deliveries_path: str,
+        items_path: str,
+        db_path: str = None,
+        result_format: str = "pandas",
+        memory_limit: str = None,
+        metrics: MetricsSink = None,
+    ):
         """
-        Initializes the database by connecting to an in-memory DuckDB instance 
-        and registering JSON files as database tables.
+        Initializes the database by connecting to DuckDB and registering the JSON files
+        as views, or ingesting them into tables if `db_path` is given.
 
         Args:
-            deliveries_path (str): The path to the deliveries JSON file.
-            items_path (str): The path to the items JSON file.
+            deliveries_path (str): The path or glob of the deliveries JSON, NDJSON or Parquet files.
+            items_path (str): The path or glob of the items JSON, NDJSON or Parquet files.
+            db_path (str): The path to a persistent .duckdb file to ingest into
+                (default is None, query the JSON files through views).
+            result_format (str): The default result format of lookups, one of `LOOKUP_FORMATS`
+                (default is "pandas"). Row tuples are available per query from `query_db`.
+            memory_limit (str): A DuckDB memory limit such as "2GB"; also lets ingestion stream
+                rows without preserving insertion order (default is None, DuckDB's default).
+            metrics (MetricsSink): Where to record lookup and query timings (default is None, discarded).
         """
-        self.con = duckdb.connect()  # Connect to an in-memory DuckDB database
+        self._check_lookup_format(result_format)
+        self.deliveries_path = deliveries_path
+        self.items_path = items_path
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.prefetched = {}
+        self.prepared = set()
+        self.result_format = result_format
+        self.metrics = metrics or NullMetrics()
 
-        # Register the JSON files as tables
-        self.con.execute(
-            f"CREATE VIEW deliveries AS SELECT * FROM read_json_auto('{deliveries_path}');"
-        )
+        if db_path is None:
+            self.con = duckdb.connect()  # Connect to an in-memory DuckDB database
+            self._configure(memory_limit)
+
+            # Register the source files as tables
+            self.con.execute(
+                f"CREATE VIEW deliveries AS SELECT * FROM {self._reader(deliveries_path)};"
+            )
+            self.con.execute(
+                f"CREATE VIEW items AS SELECT * FROM {self._reader(items_path)};"
+            )
+        else:
+            self.con = duckdb.connect(db_path)
+            self._configure(memory_limit)
+            self.ingest()
+
+    @staticmethod
+    def _check_lookup_format(result_format: str):
+        """
+        Rejects result formats that contract lookups do not support.
+
+        Raises:
+            ValueError: If `result_format` is not one of `LOOKUP_FORMATS`.
+        """
+        if result_format not in LOOKUP_FORMATS:
+            raise ValueError(f"Unsupported lookup result format {result_format!r}; expected one of {LOOKUP_FORMATS}.")
+
+    def _configure(self, memory_limit: str = None):
+        """
+        Applies the memory settings to the connection.
+
+        Args:
+            memory_limit (str): A DuckDB memory limit such as "2GB" (default is None, unchanged).
+        """
+        if memory_limit is not None:
+            self.con.execute("SET memory_limit = ?;", [memory_limit])
+            self.con.execute("SET preserve_insertion_order = false;")
+
+    @staticmethod
+    def _source_format(path: str) -> str:
+        """
+        Determines the format of a source from its extension.
+
+        Args:
+            path (str): The path or glob of the source.
+
+        Returns:
+            str: "json", "ndjson" or "parquet".
+        """
+        return SOURCE_FORMATS.get(os.path.splitext(path)[1].lower(), "json")
+
+    def _reader(self, path: str, columns: dict = None) -> str:
+        """
+        Builds the DuckDB table function reading a source file.
+
+        Args:
+            path (str): The path or glob of the source.
+            columns (dict): Column names and SQL types to read them as (default is None, infer types).
+
+        Returns:
+            str: The SQL table expression.
+        """
+        source_format = self._source_format(path)
+        if source_format == "parquet":
+            if columns is None:
+                return f"read_parquet('{path}')"
+            casts = ", ".join(f"CAST({name} AS {sql_type}) AS {name}" for name, sql_type in columns.items())
+            return f"(SELECT {casts} FROM read_parquet('{path}'))"
+
+        if columns is None:
+            auto_reader = "read_ndjson_auto" if source_format == "ndjson" else "read_json_auto"
+            return f"{auto_reader}('{path}')"
+        column_types = ", ".join(f"'{name}': '{sql_type}'" for name, sql_type in columns.items())
+        options = ", format = 'newline_delimited'" if source_format == "ndjson" else ""
+        return f"read_json('{path}'{options}, columns={{{column_types}}})"
+
+    @staticmethod
+    def _source_files(path: str) -> list:
+        """
+        Expands a source path or glob into the files it matches.
+
+        Args:
+            path (str): The path or glob of the source.
+
+        Returns:
+            list: The matching file paths, sorted.
+
+        Raises:
+            FileNotFoundError: If no file matches.
+        """
+        files = sorted(glob.glob(path)) if glob.has_magic(path) else [path]
+        if not files or not all(os.path.exists(file) for file in files):
+            raise FileNotFoundError(f"No ERP source files match {path}.")
+        return files
+
+    def source_state(self) -> dict:
+        """
+        Lists the files behind each ERP source with their mtime and size, a cheap check for
+        whether the sources may have changed since they were last read.
+
+        Returns:
+            dict: {"deliveries": [[file, mtime, size], ...], "items": [...]}.
+
+        Raises:
+            FileNotFoundError: If a source matches no file.
+        """
+        state = {}
+        for table, path in [("deliveries", self.deliveries_path), ("items", self.items_path)]:
+            state[table] = []
+            for file in self._source_files(path):
+                stat = os.stat(file)
+                state[table].append([file, stat.st_mtime, stat.st_size])
+        return state
+
+    @staticmethod
+    def _file_sha256(path: str) -> str:
+        """
+        Hashes a file in chunks so large exports are never read into memory at once.
+
+        Args:
+            path (str): The path to the file.
+
+        Returns:
+            str: The SHA256 hex digest of the file contents.
+        """
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _create_schema(self):
+        """
+        Creates the typed tables, their indexes and the ingestion bookkeeping table.
+        """
+        for table, columns in [("deliveries", DELIVERIES_COLUMNS), ("items", ITEMS_COLUMNS)]:
+            column_defs = ", ".join(f"{name} {sql_type}" for name, sql_type in columns.items())
+            self.con.execute(f"CREATE TABLE IF NOT EXISTS {table} ({column_defs});")
+        for index, (table, column) in INDEXES.items():
+            self.con.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({column});")
         self.con.execute(
-            f"CREATE VIEW items AS SELECT * FROM read_json_auto('{items_path}');"
+            "CREATE TABLE IF NOT EXISTS ingest_state "
+            "(source VARCHAR PRIMARY KEY, path VARCHAR, mtime DOUBLE, size BIGINT, sha256 VARCHAR);"
         )
 
-    def query_db(self, query: str):
+    def ingest(self, force=False) -> list:
         """
-        Executes a SQL query on the database and fetches the result as a DataFrame.
+        Loads the sources into the persistent tables, skipping sources that have not changed.
+
+        A source is unchanged if its path, size and mtime match the last ingestion, or
+        failing that, if its contents hash the same. For a glob, the latest mtime, total
+        size and a hash over every matching shard are compared.
+
+        Args:
+            force (bool): Re-ingest every source regardless of changes (default is False).
+
+        Returns:
+            list: The names of the tables that were (re-)ingested.
+
+        Raises:
+            ValueError: If the database was not opened with a `db_path`.
+        """
+        if self.db_path is None:
+            raise ValueError("ingest requires a persistent database; pass db_path to DataBase.")
+
+        ingested = []
+        with self.lock:
+            self._create_schema()
+            for table, path, columns in [
+                ("deliveries", self.deliveries_path, DELIVERIES_COLUMNS),
+                ("items", self.items_path, ITEMS_COLUMNS),
+            ]:
+                files = self._source_files(path)
+                stats = [os.stat(file) for file in files]
+                mtime = max(stat.st_mtime for stat in stats)
+                size = sum(stat.st_size for stat in stats)
+                state = self.con.execute(
+                    "SELECT path, mtime, size, sha256 FROM ingest_state WHERE source = ?;", [table]
+                ).fetchone()
+                if not force and state and state[:3] == (path, mtime, size):
+                    continue
+
+                if len(files) == 1:
+                    sha256 = self._file_sha256(files[0])
+                else:
+                    # Hash the shard names and contents, so adding, removing or editing a shard is a change
+                    sha256 = hashlib.sha256(
+                        "".join(f"{os.path.basename(file)}:{self._file_sha256(file)}\n" for file in files).encode()
+                    ).hexdigest()
+                if not force and state and state[0] == path and state[3] == sha256:
+                    # Touched but not modified; remember the new mtime so it is not rehashed next time
+                    self.con.execute(
+                        "UPDATE ingest_state SET mtime = ?, size = ? WHERE source = ?;",
+                        [mtime, size, table],
+                    )
+                    continue
+
+                self.con.execute("BEGIN TRANSACTION;")
+                try:
+                    self.con.execute(f"DELETE FROM {table};")
+                    for file in files:  # One shard at a time keeps memory bounded by the largest shard
+                        self.con.execute(f"INSERT INTO {table} SELECT * FROM {self._reader(file, columns)};")
+                    self.con.execute(
+                        "INSERT OR REPLACE INTO ingest_state VALUES (?, ?, ?, ?, ?);",
+                        [table, path, mtime, size, sha256],
+                    )
+                    self.con.execute("COMMIT;")
+                except Exception:
+                    self.con.execute("ROLLBACK;")
+                    raise
+                ingested.append(table)
+        return ingested
+
+    def _fetch(self, cursor, result_format: str = None):
+        """
+        Fetches the result of an executed query in the requested format. Must be called
+        with `lock` held.
+
+        Args:
+            cursor (duckdb.DuckDBPyConnection): The connection the query was executed on.
+            result_format (str): One of `RESULT_FORMATS` (default is None, use `result_format`).
+
+        Returns:
+            pandas.DataFrame | pyarrow.Table | dict | list: A DataFrame for "pandas", an Arrow
+                table for "arrow", a dict of column name to NumPy array for "numpy", or a list
+                of row tuples for "rows".
+        """
+        result_format = result_format or self.result_format
+        if result_format == "pandas":
+            return cursor.fetchdf()
+        if result_format == "arrow":
+            # to_arrow_table replaces fetch_arrow_table in newer DuckDB releases
+            fetch_arrow = getattr(cursor, "to_arrow_table", None) or cursor.fetch_arrow_table
+            return fetch_arrow()
+        if result_format == "numpy":
+            return cursor.fetchnumpy()
+        if result_format == "rows":
+            return cursor.fetchall()
+        raise ValueError(f"Unknown result format {result_format!r}; expected one of {RESULT_FORMATS}.")
+
+    def query_db(self, query: str, params: list = None, result_format: str = None, tables: dict = None):
+        """
+        Executes a SQL query on the database and fetches the result.
 
         Args:
             query (str): The SQL query to execute.
+            params (list): Values bound to the query's ? placeholders (default is None).
+            result_format (str): One of `RESULT_FORMATS` (default is None, use `result_format`).
+            tables (dict): DataFrames to register as temporary views for the duration of the
+                query, keyed by view name (default is None).
 
         Returns:
-            pandas.DataFrame: The result of the SQL query.
+            pandas.DataFrame | pyarrow.Table | dict | list: The result of the SQL query.
         """
-        return self.con.execute(query).fetchdf()
+        tables = tables or {}
+        with self.lock, self.metrics.timer("erp_query"):
+            for name, frame in tables.items():
+                self.con.register(name, frame)
+            try:
+                cursor = self.con.execute(query) if params is None else self.con.execute(query, params)
+                return self._fetch(cursor, result_format)
+            finally:
+                for name in tables:
+                    self.con.unregister(name)
 
-    def lookup_contract(self, query_contract_number: str):
+    def lookup_contract(self, query_contract_number: str, result_format: str = None):
         """
         Looks up contract details in the database based on the given contract number.
 
+        The number is bound as a BIGINT parameter to a prepared statement, so it is never
+        interpolated into the SQL and the comparison uses the `contract_number` index.
+
         Args:
             query_contract_number (str): The contract number to search for.
+            result_format (str): One of `LOOKUP_FORMATS` (default is None, use `result_format`).
+
+        Returns:
+            pandas.DataFrame | pyarrow.Table | dict: The details of the contract, empty if the
+                number is not numeric or has no ERP rows.
+        """
+        result_format = result_format or self.result_format
+        self._check_lookup_format(result_format)
+        with self.metrics.timer("lookup_contract"):
+            prefetched_format, prefetched = self.prefetched.get(str(query_contract_number), (None, None))
+            if prefetched is not None and prefetched_format in (result_format, "pandas"):
+                self.metrics.count("erp_prefetch_hits")
+                return prefetched if prefetched_format == result_format else self._convert(prefetched, result_format)
+
+            with self.lock, self.metrics.timer("erp_query"):
+                cursor = self._execute_prepared("lookup_contract", self._parse_contract_number(query_contract_number))
+                return self._fetch(cursor, result_format)
+
+    @staticmethod
+    def _sql_literal(value) -> str:
+        """
+        Renders a typed parameter for `EXECUTE`, which only accepts literal arguments.
+
+        Args:
+            value (int | float | None): The parameter value.
+
+        Returns:
+            str: The SQL literal.
+
+        Raises:
+            TypeError: If the value is not a number or None, so text can never reach the SQL.
+        """
+        if value is None:
+            return "NULL"
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return repr(value)
+        raise TypeError(f"Unsupported prepared statement parameter: {value!r}")
+
+    def _execute_prepared(self, name: str, *params):
+        """
+        Executes one of the `PREPARED_QUERIES`, preparing it on first use so later calls
+        skip parsing and planning. Must be called with `lock` held.
+
+        Args:
+            name (str): The name of the prepared query.
+            *params: The typed parameters to bind.
 
         Returns:
-            pandas.DataFrame: A DataFrame containing the details of the contract.
+            duckdb.DuckDBPyConnection: The connection, ready to `_fetch` the result.
         """
-        query = f"""
+        if name not in self.prepared:
+            self.con.execute(f"PREPARE {name} AS {PREPARED_QUERIES[name].strip()};")
+            self.prepared.add(name)
+        arguments = ", ".join(self._sql_literal(param) for param in params)
+        return self.con.execute(f"EXECUTE {name}({arguments});")
+
+    @staticmethod
+    def _parse_contract_number(value):
+        """
+        Converts a contract number, possibly extracted by the LLM as text, to the integer
+        type of the `contract_number` column.
+
+        Args:
+            value (str | int): The contract number, e.g. 1415738, "1415738" or "No. 1415738".
+
+        Returns:
+            int: The contract number, or None if it is not a single run of digits.
+        """
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        match = re.fullmatch(r"\D*(\d+)\D*", str(value))
+        return int(match.group(1)) if match else None
+
+    @staticmethod
+    def _convert(df, result_format: str):
+        """
+        Converts a DataFrame of ERP rows to another result format.
+
+        Args:
+            df (pandas.DataFrame): The rows to convert.
+            result_format (str): One of `RESULT_FORMATS`.
+
+        Returns:
+            pandas.DataFrame | pyarrow.Table | dict: The rows in the requested format.
+        """
+        if result_format == "pandas":
+            return df
+        if result_format == "arrow":
+            import pyarrow  # Only needed for Arrow results
+            return pyarrow.Table.from_pandas(df, preserve_index=False)
+        if result_format == "numpy":
+            return {column: df[column].to_numpy() for column in df.columns}
+        raise ValueError(f"Unsupported lookup result format {result_format!r}; expected one of {LOOKUP_FORMATS}.")
+
+    @staticmethod
+    def _group_indices(keys, numbers: dict) -> dict:
+        """
+        Finds the rows of each requested contract in a result, without building a DataFrame.
+
+        Args:
+            keys (numpy.ndarray): The `contract_number` of each row.
+            numbers (dict): The requested contract numbers (as strings) and their parsed values.
+
+        Returns:
+            dict: The row indices per requested contract number, empty for misses.
+        """
+        keys = np.asarray(keys)
+        order = np.argsort(keys, kind="stable")
+        unique, starts = np.unique(keys[order], return_index=True)
+        ends = np.append(starts[1:], len(keys))
+        spans = {int(key): (start, end) for key, start, end in zip(unique, starts, ends)}
+        empty = (0, 0)
+        return {number: order[slice(*spans.get(value, empty))] for number, value in numbers.items()}
+
+    def lookup_contracts(self, query_contract_numbers: list, result_format: str = None) -> dict:
+        """
+        Looks up the details of many contracts with a single joined query.
+
+        Args:
+            query_contract_numbers (list): The contract numbers to search for.
+            result_format (str): One of `LOOKUP_FORMATS` (default is None, use `result_format`).
+                Rows are fetched and grouped in that format, so "numpy" and "arrow" lookups
+                never build a DataFrame.
+
+        Returns:
+            dict: The contract details per requested contract number (as a string).
+                Contracts with no ERP rows map to an empty result.
+        """
+        result_format = result_format or self.result_format
+        self._check_lookup_format(result_format)
+        numbers = list(dict.fromkeys(str(number) for number in query_contract_numbers))  # Dedupe, keep order
+        parsed = {number: self._parse_contract_number(number) for number in numbers}
+        query = """
         SELECT d.*, i.*
         FROM deliveries d
         JOIN items i
         ON d.delivery_id = i.delivery_id
-        WHERE i.contract_number = '{query_contract_number}';
+        WHERE i.contract_number IN (SELECT UNNEST(?::BIGINT[]));
+        """
+        with self.lock, self.metrics.timer("erp_query"):
+            cursor = self.con.execute(query, [[n for n in parsed.values() if n is not None]])
+            result = self._fetch(cursor, result_format)
+
+        if result_format == "pandas":
+            indices = self._group_indices(result["contract_number"].to_numpy(), parsed)
+            return {number: result.iloc[rows].reset_index(drop=True) for number, rows in indices.items()}
+        if result_format == "arrow":
+            indices = self._group_indices(result.column("contract_number").to_numpy(), parsed)
+            return {number: result.take(rows) for number, rows in indices.items()}
+        indices = self._group_indices(result["contract_number"], parsed)
+        return {number: {column: values[rows] for column, values in result.items()} for number, rows in indices.items()}
+
+    def prefetch_contracts(self, query_contract_numbers: list) -> dict:
+        """
+        Loads the ERP rows for a whole batch of contracts in one query, so subsequent
+        `lookup_contract` calls for those contracts do not touch the database.
+
+        Rows are fetched and kept in `result_format`, so lookups in that format return
+        them as they are.
+
+        Args:
+            query_contract_numbers (list): The contract numbers to prefetch.
+
+        Returns:
+            dict: The prefetched rows per contract number.
+        """
+        results = self.lookup_contracts(query_contract_numbers)
+        self.prefetched.update((number, (self.result_format, rows)) for number, rows in results.items())
+        return results
+
+    def clear_prefetch(self):
+        """
+        Drops all prefetched rows so lookups query the database again.
         """
-        return self.query_db(query)
+        self.prefetched = {}
@@ -0,0 +1,488 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import List, Optional, Union
+
+from .breach_detector import DetectBreach
+from .breach_rules import BreachRules
+from .bulk_loader import BulkContractLoader, LoadResult
+from .contract_processor import ContractProcessor
+from .DB_code import DataBase
+from .metrics import MetricsSink, NullMetrics
+from .query_llm import QueryLLM
+from . import structured_outputs
+
+
+@dataclass
+class ContractResult:
+    """
+    The outcome of running the breach detection pipeline over a single contract.
+
+    Attributes:
+        contract_name (str): The contract file name without its extension.
+        source_path (str): The path to the source .docx file.
+        example_answers (dict): Responses to the example questions, if requested.
+        contract_terms (dict): The structured terms extracted from the contract.
+        comparisons (list): Contract vs delivered comparison statements.
+        breach (dict): The breach analysis returned by `DetectBreach.detect_breach`.
+        html_path (str): The path to the highlighted HTML output, if generated.
+        error (str): The error message if any stage failed, otherwise None.
+        elapsed (float): Wall time spent on this contract in seconds.
+    """
+    contract_name: str
+    source_path: str
+    example_answers: dict = field(default_factory=dict)
+    contract_terms: dict = field(default_factory=dict)
+    comparisons: list = field(default_factory=list)
+    breach: dict = field(default_factory=dict)
+    html_path: Optional[str] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchSummary:
+    """
+    Throughput summary for a batch run.
+
+    Attributes:
+        total (int): The number of contracts submitted.
+        succeeded (int): The number of contracts processed without error.
+        failed (int): The number of contracts that raised an error.
+        breached (int): The number of contracts flagged as breached.
+        wall_time (float): Total wall time of the batch in seconds.
+        contracts_per_second (float): Batch throughput.
+        mean_latency (float): Mean per-contract wall time in seconds.
+        max_in_flight (int): The concurrency limit the batch ran with.
+    """
+    total: int
+    succeeded: int
+    failed: int
+    breached: int
+    wall_time: float
+    contracts_per_second: float
+    mean_latency: float
+    max_in_flight: int
+
+
+@dataclass
+class BatchReport:
+    """
+    Per-contract results together with the batch summary.
+    """
+    results: List[ContractResult]
+    summary: BatchSummary
+
+
+class BatchProcessor:
+    """
+    Runs the load -> extract_terms -> searchdb -> get_comparisons -> detect_breach
+    -> highlight pipeline over many contracts concurrently.
+
+    Each stage is dominated by network wait on the LLM, so contracts are processed on a
+    thread pool whose size bounds the number of contracts in flight at once.
+
+    Attributes:
+        doc_processor (ContractProcessor): The processor used to load and query contracts.
+        db (DataBase): The ERP database used for contract lookups.
+        llm (QueryLLM): The LLM interface used for breach analysis.
+        output_dir (str): Directory for highlighted HTML output, or None to skip highlighting.
+        max_in_flight (int): The maximum number of contracts processed concurrently.
+        terms (dict): The structured terms to extract from each contract.
+        questions (dict): Optional example questions to answer for each contract.
+        highlight_fields (list): The fields to locate and highlight in the HTML output.
+        rules (BreachRules): The rule engine used to decide breaches before consulting the LLM.
+        metrics (MetricsSink): Receives per-contract and breach detection timings.
+        bulk_loader (BulkContractLoader): Parses the contracts in worker processes, or None.
+    """
+
+    def __init__(
+        self,
+        doc_processor: ContractProcessor,
+        db: DataBase,
+        llm: QueryLLM,
+        output_dir: str = None,
+        max_in_flight: int = 8,
+        terms: dict = None,
+        questions: dict = None,
+        highlight_fields: list = None,
+        rules: BreachRules = None,
+        metrics: MetricsSink = None,
+        bulk_loader: BulkContractLoader = None,
+    ):
+        """
+        Initializes the BatchProcessor class.
+
+        Args:
+            doc_processor (ContractProcessor): The processor used to load and query contracts.
+            db (DataBase): The ERP database used for contract lookups.
+            llm (QueryLLM): The LLM interface used for breach analysis.
+            output_dir (str): Directory for highlighted HTML output (default is None, no highlighting).
+            max_in_flight (int): The maximum number of contracts processed concurrently (default is 8).
+            terms (dict): The terms to extract (default is `structured_outputs.contract_enforcement`).
+            questions (dict): Example questions to answer per contract (default is None, skipped).
+            highlight_fields (list): The fields to highlight in the HTML output.
+            rules (BreachRules): The rule engine to use (default is None, `BreachRules()`).
+            metrics (MetricsSink): Where to record timings (default is None, discarded). Pass the
+                same sink to the `ContractProcessor`, `DataBase` and `QueryLLM` to see every stage.
+            bulk_loader (BulkContractLoader): If set, contracts are parsed in its process pool and
+                extraction starts as each one arrives (default is None, parsed in the batch threads).
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1.")
+        self.doc_processor = doc_processor
+        self.db = db
+        self.llm = llm
+        self.output_dir = output_dir
+        self.max_in_flight = max_in_flight
+        self.terms = terms or structured_outputs.contract_enforcement
+        self.questions = questions
+        self.highlight_fields = highlight_fields or [
+            "deliver_date", "contract_number", "quantity", "pallet_dimensions"
+        ]
+        self.rules = rules or BreachRules()
+        self.metrics = metrics or NullMetrics()
+        self.bulk_loader = bulk_loader
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+
+    @staticmethod
+    def collect_contracts(source: Union[str, List[str]]) -> List[str]:
+        """
+        Resolves a directory or a list of paths into a sorted list of .docx files.
+
+        Args:
+            source (str | list): A directory containing contracts, or a list of .docx paths.
+
+        Returns:
+            list: The .docx file paths to process.
+        """
+        if isinstance(source, str):
+            if not os.path.isdir(source):
+                raise ValueError(f"{source} is not a directory.")
+            return sorted(
+                os.path.join(source, name)
+                for name in os.listdir(source)
+                if name.lower().endswith(".docx") and not name.startswith("~$")  # Skip Word lock files
+            )
+        return list(source)
+
+    def _schemas(self) -> dict:
+        """
+        Builds the term dictionaries to extract from each contract in one combined query.
+
+        Returns:
+            dict: A mapping of section name to term dictionary.
+        """
+        schemas = {"contract_terms": self.terms}
+        if self.questions:
+            schemas["example_questions"] = self.questions
+        if self.output_dir:
+            schemas["locations"] = ContractProcessor.location_terms(self.highlight_fields)
+        return schemas
+
+    def _extract_contract(self, filepath: str, loaded: LoadResult = None) -> tuple:
+        """
+        Loads a contract and extracts its terms, the first phase of the pipeline.
+
+        Any exception is captured on the result so one bad contract does not fail the batch.
+
+        Args:
+            filepath (str): The path to the .docx contract.
+            loaded (LoadResult): The contract already parsed by `bulk_loader` (default is None,
+                loaded here).
+
+        Returns:
+            tuple: The ContractResult, the loaded contract and the extracted sections.
+        """
+        contract_name = os.path.splitext(os.path.basename(filepath))[0]
+        result = ContractResult(contract_name=contract_name, source_path=filepath)
+        if loaded is not None and not loaded.succeeded:
+            result.error = loaded.error
+            return result, None, None
+        start = time.perf_counter()
+        doc, extracted = None, None
+        try:
+            doc = loaded.contract if loaded is not None else self.doc_processor.load_contract(filepath)
+
+            # One combined query covers the terms, questions and highlight locations
+            extracted = self.doc_processor.extract_terms_combined(doc, self._schemas())
+            result.example_answers = extracted.get("example_questions", {})
+            result.contract_terms = extracted["contract_terms"]
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        result.elapsed = time.perf_counter() - start
+        return result, doc, extracted
+
+    def _detect_breach(self, staged: tuple) -> ContractResult:
+        """
+        Compares an extracted contract against the ERP data and highlights it, the second
+        phase of the pipeline. Contracts that failed extraction are returned unchanged, and
+        contracts staged without their extracted sections are not highlighted.
+
+        Args:
+            staged (tuple): The output of `_extract_contract`.
+
+        Returns:
+            ContractResult: The outcome for this contract.
+        """
+        result, doc, extracted = staged
+        if not result.succeeded:
+            return result
+        start = time.perf_counter()
+        try:
+            breach_detector = DetectBreach(
+                result.contract_terms, self.db, self.llm, rules=self.rules, metrics=self.metrics
+            )
+            filtered_ERP = breach_detector.searchdb()
+            result.comparisons = breach_detector.get_comparisons(filtered_ERP)
+            result.breach = breach_detector.detect_breach(filtered_ERP)
+
+            if self.output_dir and extracted is not None:
+                annotations = extracted["locations"]
+                result.html_path = os.path.join(self.output_dir, f"{result.contract_name}.html")
+                self.doc_processor.generate_html_highlight(doc, annotations, result.html_path)
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        result.elapsed += time.perf_counter() - start
+        return result
+
+    def _prefetch(self, staged: list):
+        """
+        Loads the ERP rows for every successfully extracted contract with one database query.
+
+        Args:
+            staged (list): The outputs of `_extract_contract`.
+        """
+        numbers = [
+            result.contract_terms["info"]["contract_number"]
+            for result, _, _ in staged
+            if result.succeeded and "contract_number" in result.contract_terms.get("info", {})
+        ]
+        if numbers:
+            self.db.prefetch_contracts(numbers)
+
+    def process_contract(self, filepath: str) -> ContractResult:
+        """
+        Runs every pipeline stage for a single contract.
+
+        Any exception is captured on the result so one bad contract does not fail the batch.
+
+        Args:
+            filepath (str): The path to the .docx contract.
+
+        Returns:
+            ContractResult: The outcome for this contract.
+        """
+        return self._detect_breach(self._extract_contract(filepath))
+
+    def process(self, source: Union[str, List[str]]) -> BatchReport:
+        """
+        Processes every contract in `source` with at most `max_in_flight` running at once.
+
+        Terms are extracted from every contract first, so the ERP rows for the whole batch
+        can be fetched with a single database query before breach detection runs.
+
+        Args:
+            source (str | list): A directory containing contracts, or a list of .docx paths.
+
+        Returns:
+            BatchReport: Per-contract results in input order, and a throughput summary.
+        """
+        paths = self.collect_contracts(source)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            if self.bulk_loader is None:
+                staged = list(executor.map(self._extract_contract, paths))
+            else:
+                # Parse in worker processes, extracting each contract as soon as it is parsed
+                futures = [None] * len(paths)
+                for loaded in self.bulk_loader.iter_load(paths, ordered=False):
+                    futures[loaded.index] = executor.submit(self._extract_contract, loaded.path, loaded)
+                staged = [future.result() for future in futures]
+            self._prefetch(staged)
+            try:
+                results = list(executor.map(self._detect_breach, staged))
+            finally:
+                self.db.clear_prefetch()  # Later runs should see fresh ERP data
+        wall_time = time.perf_counter() - start
+
+        return BatchReport(results=results, summary=self._summarise(results, wall_time))
+
+    def reevaluate(self, results: List[ContractResult]) -> BatchReport:
+        """
+        Re-runs searchdb -> get_comparisons -> detect_breach for contracts whose terms were
+        already extracted, e.g. after the ERP data changed.
+
+        The extracted terms are reused, so no contract is reloaded or sent for extraction,
+        and highlighted HTML is left as it is. The ERP rows are prefetched in one query.
+
+        Args:
+            results (list): Earlier successful results of `process` or `aprocess`.
+
+        Returns:
+            BatchReport: The refreshed results in input order, and a throughput summary.
+        """
+        staged = [(replace(result, comparisons=[], breach={}, elapsed=0.0), None, None) for result in results]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            self._prefetch(staged)
+            try:
+                refreshed = list(executor.map(self._detect_breach, staged))
+            finally:
+                self.db.clear_prefetch()
+        wall_time = time.perf_counter() - start
+
+        return BatchReport(results=refreshed, summary=self._summarise(refreshed, wall_time))
+
+    async def _aextract_contract(self, filepath: str, loaded: LoadResult = None) -> tuple:
+        """
+        Asynchronously loads a contract and extracts its terms.
+
+        Args:
+            filepath (str): The path to the .docx contract.
+            loaded (LoadResult): The contract already parsed by `bulk_loader` (default is None,
+                loaded here).
+
+        Returns:
+            tuple: The ContractResult, the loaded contract and the extracted sections.
+        """
+        contract_name = os.path.splitext(os.path.basename(filepath))[0]
+        result = ContractResult(contract_name=contract_name, source_path=filepath)
+        if loaded is not None and not loaded.succeeded:
+            result.error = loaded.error
+            return result, None, None
+        start = time.perf_counter()
+        doc, extracted = None, None
+        try:
+            if loaded is not None:
+                doc = loaded.contract
+            else:
+                doc = await asyncio.to_thread(self.doc_processor.load_contract, filepath)
+
+            # One combined query covers the terms, questions and highlight locations
+            extracted = await self.doc_processor.aextract_terms_combined(doc, self._schemas())
+            result.example_answers = extracted.get("example_questions", {})
+            result.contract_terms = extracted["contract_terms"]
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        result.elapsed = time.perf_counter() - start
+        return result, doc, extracted
+
+    async def _adetect_breach(self, staged: tuple) -> ContractResult:
+        """
+        Asynchronously compares an extracted contract against the ERP data and highlights it.
+
+        Args:
+            staged (tuple): The output of `_aextract_contract`.
+
+        Returns:
+            ContractResult: The outcome for this contract.
+        """
+        result, doc, extracted = staged
+        if not result.succeeded:
+            return result
+        start = time.perf_counter()
+        try:
+            breach_detector = DetectBreach(
+                result.contract_terms, self.db, self.llm, rules=self.rules, metrics=self.metrics
+            )
+            filtered_ERP = await asyncio.to_thread(breach_detector.searchdb)
+            result.comparisons = breach_detector.get_comparisons(filtered_ERP)
+            result.breach = await breach_detector.adetect_breach(filtered_ERP)
+
+            if self.output_dir:
+                annotations = extracted["locations"]
+                result.html_path = os.path.join(self.output_dir, f"{result.contract_name}.html")
+                await asyncio.to_thread(
+                    self.doc_processor.generate_html_highlight, doc, annotations, result.html_path
+                )
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        result.elapsed += time.perf_counter() - start
+        return result
+
+    async def aprocess_contract(self, filepath: str) -> ContractResult:
+        """
+        Asynchronously runs every pipeline stage for a single contract.
+
+        LLM stages are awaited on the event loop; document parsing, database lookups
+        and HTML writes run in worker threads. Requires `llm` to be an `AsyncQueryLLM`.
+
+        Args:
+            filepath (str): The path to the .docx contract.
+
+        Returns:
+            ContractResult: The outcome for this contract.
+        """
+        return await self._adetect_breach(await self._aextract_contract(filepath))
+
+    async def aprocess(self, source: Union[str, List[str]]) -> BatchReport:
+        """
+        Asynchronously processes every contract in `source` on a single event loop.
+
+        At most `max_in_flight` contracts are in progress at once; LLM request concurrency
+        and token rate are further bounded by the `AsyncQueryLLM` scheduler. As in `process`,
+        the ERP rows for the whole batch are prefetched between extraction and detection.
+
+        Args:
+            source (str | list): A directory containing contracts, or a list of .docx paths.
+
+        Returns:
+            BatchReport: Per-contract results in input order, and a throughput summary.
+        """
+        paths = self.collect_contracts(source)
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        async def bounded(stage, *items):
+            async with semaphore:
+                return await stage(*items)
+
+        start = time.perf_counter()
+        if self.bulk_loader is None:
+            staged = await asyncio.gather(*(bounded(self._aextract_contract, path) for path in paths))
+        else:
+            loaded = await asyncio.to_thread(self.bulk_loader.load, paths)
+            staged = await asyncio.gather(*(bounded(self._aextract_contract, item.path, item) for item in loaded))
+        await asyncio.to_thread(self._prefetch, staged)
+        try:
+            results = await asyncio.gather(*(bounded(self._adetect_breach, item) for item in staged))
+        finally:
+            self.db.clear_prefetch()  # Later runs should see fresh ERP data
+        wall_time = time.perf_counter() - start
+
+        return BatchReport(results=list(results), summary=self._summarise(results, wall_time))
+
+    def _summarise(self, results: List[ContractResult], wall_time: float) -> BatchSummary:
+        """
+        Builds the throughput summary for a finished batch.
+
+        Args:
+            results (list): The per-contract results.
+            wall_time (float): Total wall time of the batch in seconds.
+
+        Returns:
+            BatchSummary: The batch summary.
+        """
+        succeeded = [r for r in results if r.succeeded]
+        for result in results:
+            self.metrics.timing("contract", result.elapsed)
+            self.metrics.count("contracts", status="succeeded" if result.succeeded else "failed")
+        return BatchSummary(
+            total=len(results),
+            succeeded=len(succeeded),
+            failed=len(results) - len(succeeded),
+            breached=sum(1 for r in succeeded if r.breach.get("breached")),
+            wall_time=wall_time,
+            contracts_per_second=len(results) / wall_time if wall_time > 0 else 0.0,
+            mean_latency=sum(r.elapsed for r in results) / len(results) if results else 0.0,
+            max_in_flight=self.max_in_flight,
+        )
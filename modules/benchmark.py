@@ -0,0 +1,322 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+
+from faker import Faker
+
+from .batch_pipeline import BatchProcessor
+from .bulk_loader import BulkContractLoader
+from .contract_processor import ContractProcessor
+from .field_extractor import FieldExtractor
+from .data_generator_code import ContractCorpusWriter, DeliveryFactory, ERPWriter
+from .DB_code import DataBase
+from .metrics import InMemoryMetrics
+from .mock_llm_server import MockLLMServer
+from .parsed_contract import ParsedContract
+from .query_llm import AsyncQueryLLM, QueryLLM
+
+@dataclass
+class BenchmarkConfig:
+    """
+    Settings for an end-to-end benchmark run against the mock LLM server.
+
+    Attributes:
+        contracts (int): The number of generated contracts to process.
+        breach_fraction (float): The fraction of contracts with a breached field.
+        latency (float): The mock server's mean response delay in seconds.
+        jitter (float): The maximum deviation from `latency` in seconds.
+        error_rate (float): The fraction of mock requests that fail.
+        passes (int): The number of runs over the corpus; later passes hit the LLM cache.
+        max_in_flight (int): The maximum number of contracts processed concurrently.
+        mode (str): "thread" for `BatchProcessor.process`, "async" for `aprocess`.
+        highlight (bool): Whether to generate highlighted HTML output.
+        seed (int): Seed for the corpus and the mock server.
+        local_fields (bool): Whether pattern-matched fields are extracted locally instead of by the LLM.
+        parse_workers (int): Processes for parsing contracts with `BulkContractLoader`, or 0 to
+            parse in the batch threads.
+    """
+    contracts: int = 50
+    breach_fraction: float = 0.3
+    latency: float = 0.05
+    jitter: float = 0.02
+    error_rate: float = 0.0
+    passes: int = 2
+    max_in_flight: int = 8
+    mode: str = "thread"
+    highlight: bool = True
+    seed: int = 0
+    local_fields: bool = False
+    parse_workers: int = 0
+
+
+def peak_rss_mb() -> float:
+    """
+    Returns the peak resident set size of this process in MiB, or None if unavailable.
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1024.0 / 1024.0 if sys.platform == "darwin" else peak / 1024.0
+
+
+def _counter_total(counters: dict, name: str) -> float:
+    """
+    Sums a counter over all of its label sets, e.g. "llm_prompt_tokens{model=...}".
+    """
+    return sum(value for key, value in counters.items() if key == name or key.startswith(name + "{"))
+
+
+def generate_corpus(work_dir: str, config: BenchmarkConfig) -> dict:
+    """
+    Generates ERP data and a labelled contract corpus for the benchmark.
+
+    Args:
+        work_dir (str): Directory to write the ERP files and contracts to.
+        config (BenchmarkConfig): The benchmark settings.
+
+    Returns:
+        dict: The paths of the deliveries, items and contracts, and the contract labels.
+    """
+    random.seed(config.seed)
+    Faker.seed(config.seed)
+    deliveries_path = os.path.join(work_dir, "deliveries.ndjson")
+    items_path = os.path.join(work_dir, "items.ndjson")
+    contracts_dir = os.path.join(work_dir, "contracts")
+
+    corpus = ContractCorpusWriter(contracts_dir, config.contracts, config.breach_fraction, seed=config.seed)
+    with ERPWriter(deliveries_path, items_path, corpus=corpus) as writer:
+        while len(corpus.labels) < config.contracts:
+            writer.write_delivery(DeliveryFactory())
+
+    return {
+        "deliveries": deliveries_path,
+        "items": items_path,
+        "contracts": contracts_dir,
+        "labels": corpus.labels,
+    }
+
+
+def canned_responses(contracts_dir: str, labels: dict, highlight_fields: list) -> dict:
+    """
+    Builds the mock server's term extraction response for every generated contract.
+
+    The responses are what a perfect LLM would return for the combined extraction query:
+    the labelled terms, and the positions of each highlighted value in the contract text.
+
+    Args:
+        contracts_dir (str): Directory holding the generated contracts.
+        labels (dict): The corpus labels, keyed by file name.
+        highlight_fields (list): The fields the pipeline asks to locate.
+
+    Returns:
+        dict: Responses keyed by each contract's "Contract Number: ..." line.
+    """
+    responses = {}
+    for filename, label in labels.items():
+        terms = label["terms"]
+        text = ParsedContract.from_file(os.path.join(contracts_dir, filename)).text
+        values = {
+            "contract_number": str(terms["contract_number"]),
+            "deliver_date": text.split("no later than ", 1)[-1].split(".", 1)[0],
+            "quantity": terms["quantity"],
+            "pallet_dimensions": terms["pallet_dimensions"],
+        }
+        locations = {}
+        for field in highlight_fields:
+            value = values.get(field, "")
+            start = text.find(value) if value else -1
+            locations[field] = (
+                {"value": value, "start_position": start, "end_position": start + len(value)}
+                if start >= 0 else {"value": "", "start_position": "", "end_position": ""}
+            )
+        responses[f"Contract Number: {terms['contract_number']}\n"] = {
+            "contract_terms": {
+                "info": {"supplier_name": terms["supplier_name"], "contract_number": str(terms["contract_number"])},
+                "details": {field: terms[field] for field in ["delivery_date", "pallet_dimensions", "quantity", "weight"]},
+            },
+            "locations": locations,
+        }
+    return responses
+
+
+def run_benchmark(config: BenchmarkConfig, work_dir: str = None) -> dict:
+    """
+    Runs the real pipeline over a generated corpus against a local mock LLM server.
+
+    `QueryLLM` (or `AsyncQueryLLM`), `ContractProcessor`, `DataBase` and `DetectBreach`
+    run unmodified inside `BatchProcessor`; only the LLM endpoint is local, and stage
+    timings come from their `InMemoryMetrics` instrumentation. Each pass
+    shares the LLM cache, so the first pass measures cold runs and later passes warm ones.
+
+    Args:
+        config (BenchmarkConfig): The benchmark settings.
+        work_dir (str): Directory for the corpus, database and caches (default is None,
+            a temporary directory removed afterwards).
+
+    Returns:
+        dict: The config, per-pass results (throughput, per-stage latency percentiles,
+            cache hit ratio, token usage, agreement with the labels) and peak RSS, ready to
+            save as JSON.
+    """
+    if config.mode not in ("thread", "async"):
+        raise ValueError(f"Unknown mode {config.mode!r}; expected 'thread' or 'async'.")
+    if work_dir is None:
+        with tempfile.TemporaryDirectory(prefix="cbd-benchmark-") as tmp:
+            return run_benchmark(config, tmp)
+
+    corpus = generate_corpus(work_dir, config)
+    db = DataBase(corpus["deliveries"], corpus["items"], db_path=os.path.join(work_dir, "erp.duckdb"))
+    server = MockLLMServer(
+        latency=config.latency, jitter=config.jitter, error_rate=config.error_rate,
+        error_status=429 if config.mode == "async" else 500, seed=config.seed,
+    )
+    llm_class = AsyncQueryLLM if config.mode == "async" else QueryLLM
+    output_dir = os.path.join(work_dir, "html") if config.highlight else None
+
+    passes = []
+    with server:
+        for pass_number in range(1, config.passes + 1):
+            # Components are rebuilt each pass so each has its own metrics; the cache persists
+            metrics = InMemoryMetrics()
+            llm = llm_class(
+                cache_dir=os.path.join(work_dir, "cache"), base_url=server.url, api_key="mock", metrics=metrics
+            )
+            db.metrics = metrics
+            field_extractor = FieldExtractor() if config.local_fields else None
+            bulk_loader = BulkContractLoader(config.parse_workers, metrics=metrics) if config.parse_workers else None
+            processor = BatchProcessor(
+                ContractProcessor(llm, metrics=metrics, field_extractor=field_extractor), db, llm, output_dir=output_dir,
+                max_in_flight=config.max_in_flight, metrics=metrics, bulk_loader=bulk_loader,
+            )
+            server.responses = canned_responses(corpus["contracts"], corpus["labels"], processor.highlight_fields)
+
+            if config.mode == "async":
+                report = asyncio.run(processor.aprocess(corpus["contracts"]))
+            else:
+                report = processor.process(corpus["contracts"])
+
+            recorded = metrics.summary()
+            hits = _counter_total(recorded["counters"], "llm_cache_hits")
+            queries = hits + _counter_total(recorded["counters"], "llm_cache_misses")
+            agreed = sum(
+                1 for result in report.results
+                if result.succeeded and bool(result.breach.get("breached"))
+                == corpus["labels"][f"{result.contract_name}.docx"]["breached"]
+            )
+            summary = report.summary
+            passes.append({
+                "pass": pass_number,
+                "contracts": summary.total,
+                "succeeded": summary.succeeded,
+                "failed": summary.failed,
+                "wall_time": summary.wall_time,
+                "contracts_per_second": summary.contracts_per_second,
+                "stages": recorded["stages"],
+                "cache": {"queries": queries, "hits": hits, "hit_ratio": hits / queries if queries else 0.0},
+                "tokens": {
+                    "prompt": _counter_total(recorded["counters"], "llm_prompt_tokens"),
+                    "completion": _counter_total(recorded["counters"], "llm_completion_tokens"),
+                },
+                "label_agreement": agreed / summary.total if summary.total else 0.0,
+            })
+    db.con.close()
+
+    return {
+        "config": asdict(config),
+        "passes": passes,
+        "server": {"requests": server.requests, "errors": server.errors},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare_results(baseline: dict, current: dict, tolerance: float = 0.2) -> list:
+    """
+    Compares two benchmark results pass by pass.
+
+    Args:
+        baseline (dict): A previous `run_benchmark` result.
+        current (dict): The result to check.
+        tolerance (float): The allowed relative slowdown (default is 0.2, 20%).
+
+    Returns:
+        list: A description of each regression: lower throughput or a higher p95 stage
+            latency than the baseline allows. Empty if there are none.
+    """
+    regressions = []
+    for before, after in zip(baseline["passes"], current["passes"]):
+        label = f"pass {after['pass']}"
+        if after["contracts_per_second"] < before["contracts_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{label}: throughput {after['contracts_per_second']:.2f}/s "
+                f"< baseline {before['contracts_per_second']:.2f}/s"
+            )
+        for stage, stats in after["stages"].items():
+            if stage not in before["stages"]:
+                continue
+            if stats["p95_ms"] > before["stages"][stage]["p95_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{label}: {stage} p95 {stats['p95_ms']:.1f}ms "
+                    f"> baseline {before['stages'][stage]['p95_ms']:.1f}ms"
+                )
+    return regressions
+
+
+if __name__ == "__main__":
+    defaults = BenchmarkConfig()
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline end to end against a local mock LLM server.")
+    parser.add_argument("--contracts", type=int, default=defaults.contracts, help="Number of contracts to process.")
+    parser.add_argument("--breach-fraction", type=float, default=defaults.breach_fraction, help="Fraction of breached contracts.")
+    parser.add_argument("--latency", type=float, default=defaults.latency, help="Mock LLM mean latency in seconds.")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter, help="Mock LLM latency jitter in seconds.")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="Fraction of failed LLM requests.")
+    parser.add_argument("--passes", type=int, default=defaults.passes, help="Runs over the corpus (later ones are cached).")
+    parser.add_argument("--max-in-flight", type=int, default=defaults.max_in_flight, help="Contracts processed concurrently.")
+    parser.add_argument("--mode", choices=["thread", "async"], default=defaults.mode, help="Batch processing mode.")
+    parser.add_argument("--no-highlight", action="store_true", help="Skip generating highlighted HTML.")
+    parser.add_argument("--local-fields", action="store_true", help="Extract pattern-matched fields without the LLM.")
+    parser.add_argument("--parse-workers", type=int, default=defaults.parse_workers, help="Processes for parsing contracts (0 parses in threads).")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Random seed for reproducible runs.")
+    parser.add_argument("--work-dir", help="Directory for the corpus and caches (default is a temporary directory).")
+    parser.add_argument("--output", default="benchmark_results.json", help="File to save the results to.")
+    parser.add_argument("--baseline", help="A previous results file to check for regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown against the baseline.")
+    args = parser.parse_args()
+
+    config = BenchmarkConfig(
+        contracts=args.contracts, breach_fraction=args.breach_fraction, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, passes=args.passes, max_in_flight=args.max_in_flight, mode=args.mode,
+        highlight=not args.no_highlight, seed=args.seed, local_fields=args.local_fields,
+        parse_workers=args.parse_workers,
+    )
+    if args.work_dir:
+        os.makedirs(args.work_dir, exist_ok=True)
+    results = run_benchmark(config, args.work_dir)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=4)
+
+    for result in results["passes"]:
+        stages = ", ".join(f"{stage} p95 {stats['p95_ms']:.1f}ms" for stage, stats in result["stages"].items())
+        print(
+            f"Pass {result['pass']}: {result['contracts_per_second']:.2f} contracts/s, "
+            f"cache hit ratio {result['cache']['hit_ratio']:.0%}, {stages}"
+        )
+    if results["peak_rss_mb"] is not None:
+        print(f"Peak RSS {results['peak_rss_mb']:.0f} MiB.")
+    print(f"Results saved to {args.output}.")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_results(json.load(f), results, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            raise SystemExit(1)
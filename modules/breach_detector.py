@@ -1,4 +1,11 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from .breach_rules import BreachRules
 from .DB_code import DataBase
+from .metrics import MetricsSink, NullMetrics
 from .query_llm import QueryLLM
 
 class DetectBreach:
@@ -10,9 +17,14 @@ class DetectBreach:
         contract (dict): The contract details including info and expected values.
         db (DataBase): The database instance to query for actual delivered values.
         llm (QueryLLM): The LLM interface for analyzing comparisons and breaches.
+        rules (BreachRules): The rule engine deciding fields without the LLM.
+        verdicts (list): The per-field FieldVerdicts from the last `detect_breach` call.
+        metrics (MetricsSink): Receives comparison, rule and analysis timings.
     """
 
-    def __init__(self, contract: dict, db: DataBase, llm: QueryLLM):
+    def __init__(
+        self, contract: dict, db: DataBase, llm: QueryLLM, rules: BreachRules = None, metrics: MetricsSink = None
+    ):
         """
         Initializes the DetectBreach class.
 
@@ -20,10 +32,15 @@ class DetectBreach:
             contract (dict): The contract details to evaluate.
             db (DataBase): A database instance to query for delivered values.
             llm (QueryLLM): An instance of the LLM interface for analysis.
+            rules (BreachRules): The rule engine to use (default is None, `BreachRules()`).
+            metrics (MetricsSink): Where to record stage timings (default is None, discarded).
         """
         self.contract = contract
         self.db = db
         self.llm = llm
+        self.rules = rules or BreachRules()
+        self.verdicts = []
+        self.metrics = metrics or NullMetrics()
         self.contract_number = self.contract["info"]["contract_number"]
 
     def searchdb(self) -> dict:
@@ -35,27 +52,133 @@ class DetectBreach:
         """
         return self.db.lookup_contract(self.contract_number)
 
+    @staticmethod
+    def _first_value(ERP_info, key: str):
+        """
+        Reads the first delivered value of a column from any `DataBase` result format.
+
+        Dates are rendered as pandas does, so the comparison text (and therefore the
+        cached LLM analysis) is the same whichever format the lookup used.
+
+        Args:
+            ERP_info (pandas.DataFrame | pyarrow.Table | dict): The ERP information.
+            key (str): The column to read.
+
+        Returns:
+            The first value of the column, or "" if the column or rows are missing.
+        """
+        if hasattr(ERP_info, "column_names"):  # Arrow table
+            if key not in ERP_info.column_names or ERP_info.num_rows == 0:
+                return ""
+            value = ERP_info.column(key)[0].as_py()
+        else:
+            values = ERP_info.get(key, [""])
+            if len(values) == 0:
+                return ""
+            value = values[0]
+        if isinstance(value, (np.datetime64, datetime.date)):
+            return pd.Timestamp(value)
+        return value
+
     def get_comparisons(self, ERP_info: dict) -> list:
         """
         Compares the contract details against the values retrieved from the database.
 
         Args:
-            ERP_info (dict): The ERP information retrieved from the database.
+            ERP_info (dict): The ERP information retrieved from the database, in the
+                "pandas", "numpy" or "arrow" result format.
 
         Returns:
             list: A list of strings describing the comparisons between 
                   contract values and delivered values.
         """
         contract_vs_actuals = []
-        for key, expected_value in self.contract["details"].items():
-            actual_value = ERP_info.get(key, [""])[0]  # Safely handle missing keys
-            comparison = (
-                f"The contract states that the value for {key} should be {expected_value}. "
-                f"The delivered value was {actual_value}."
-            )
-            contract_vs_actuals.append(comparison)
+        with self.metrics.timer("get_comparisons"):
+            for key, expected_value in self.contract["details"].items():
+                actual_value = self._first_value(ERP_info, key)  # Safely handle missing keys
+                contract_vs_actuals.append(self._comparison(key, expected_value, actual_value))
         return contract_vs_actuals
 
+    @staticmethod
+    def _comparison(key: str, expected_value, actual_value) -> str:
+        return (
+            f"The contract states that the value for {key} should be {expected_value}. "
+            f"The delivered value was {actual_value}."
+        )
+
+    def _evaluate_rules(self, ERP_info) -> list:
+        """
+        Runs the rule engine over the contract details and the first ERP row.
+
+        Args:
+            ERP_info (pandas.DataFrame | pyarrow.Table | dict): The ERP information.
+
+        Returns:
+            list: The comparison strings for the fields the rules could not decide.
+        """
+        details = self.contract["details"]
+        columns = list(details) + [c for c in self.rules.ERP_COLUMNS if c not in details]
+        erp_row = {column: self._first_value(ERP_info, column) for column in columns}
+        self.verdicts = self.rules.evaluate(details, erp_row)
+        return [
+            self._comparison(v.field, v.contract_value, v.delivered_value)
+            for v in self.verdicts
+            if not v.decided
+        ]
+
+    def _combine(self, llm_response: dict = None) -> dict:
+        """
+        Merges the rule verdicts with the LLM's analysis of the undecided fields.
+
+        Args:
+            llm_response (dict): The LLM breach analysis, or None if it was not needed.
+
+        Returns:
+            dict: {'breached': <True/False>, 'breached_description': <description of the breach>}
+        """
+        descriptions = [v.reason for v in self.verdicts if v.breached]
+        breached = bool(descriptions)
+        if llm_response and llm_response.get("breached"):
+            breached = True
+            descriptions.append(llm_response.get("breached_description", ""))
+        return {"breached": breached, "breached_description": " ".join(d for d in descriptions if d)}
+
+    def detect_breach(self, ERP_info) -> dict:
+        """
+        Decides whether the contract is breached, using the rule engine for every field it
+        can decide and the LLM only for the rest.
+
+        Args:
+            ERP_info (pandas.DataFrame | pyarrow.Table | dict): The ERP information retrieved
+                from the database.
+
+        Returns:
+            dict: A JSON object describing whether the contract is breached
+                  and the reasons for the breach.
+        """
+        with self.metrics.timer("breach_rules"):
+            undecided = self._evaluate_rules(ERP_info)
+        self.metrics.count("fields_deferred_to_llm", len(undecided))
+        return self._combine(self.analyse_comparisons(undecided) if undecided else None)
+
+    async def adetect_breach(self, ERP_info) -> dict:
+        """
+        Asynchronously decides whether the contract is breached. Requires `llm` to be an
+        `AsyncQueryLLM` if any field is left to the LLM.
+
+        Args:
+            ERP_info (pandas.DataFrame | pyarrow.Table | dict): The ERP information retrieved
+                from the database.
+
+        Returns:
+            dict: A JSON object describing whether the contract is breached
+                  and the reasons for the breach.
+        """
+        with self.metrics.timer("breach_rules"):
+            undecided = self._evaluate_rules(ERP_info)
+        self.metrics.count("fields_deferred_to_llm", len(undecided))
+        return self._combine(await self.aanalyse_comparisons(undecided) if undecided else None)
+
     def analyse_comparisons(self, comparisons: list) -> dict:
         """
         Analyzes comparisons to detect contract breaches using an LLM.
@@ -67,9 +190,44 @@ class DetectBreach:
             dict: A JSON object describing whether the contract is breached 
                   and the reasons for the breach.
         """
+        # Query the LLM
+        with self.metrics.timer("analyse_comparisons"):
+            response = self.llm.query_llm(self._analysis_messages(comparisons))
+
+        # For debugging purposes, uncomment the following line:
+        # print("LLM Response:", response)
+
+        return response
+
+    async def aanalyse_comparisons(self, comparisons: list) -> dict:
+        """
+        Asynchronously analyzes comparisons to detect contract breaches.
+
+        Requires `llm` to be an `AsyncQueryLLM`.
+
+        Args:
+            comparisons (list): A list of comparisons between contract values and delivered values.
+
+        Returns:
+            dict: A JSON object describing whether the contract is breached
+                  and the reasons for the breach.
+        """
+        with self.metrics.timer("analyse_comparisons"):
+            return await self.llm.aquery_llm(self._analysis_messages(comparisons))
+
+    def _analysis_messages(self, comparisons: list) -> list:
+        """
+        Builds the messages for a breach analysis query.
+
+        Args:
+            comparisons (list): A list of comparisons between contract values and delivered values.
+
+        Returns:
+            list: The messages to send to the LLM.
+        """
         text = "\n".join(comparisons)
 
-        messages = [
+        return [
             {
                 "role": "system",
                 "content": (
@@ -90,15 +248,3 @@ class DetectBreach:
                 ),
             },
         ]
-
-        # Query the LLM
-        response = self.llm.query_llm(messages)
-
-        # For debugging purposes, uncomment the following line:
-        # print("LLM Response:", response)
-
-        # Assuming the response is already in JSON format; parse if necessary
-        # Uncomment the following line if the response needs to be parsed:
-        # response = json.loads(response.choices[0].message.content)
-
-        return response
@@ -0,0 +1,327 @@
+import datetime
+import math
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from dateutil import parser as date_parser
+
+# Units a contract or ERP value may be expressed in: unit -> (dimension, factor to the base unit).
+# Mass is converted to kilograms. Reels, each and units are all counted per item, so they
+# convert one-to-one; boxes, lengths and volumes only compare against the same dimension.
+UNITS = {
+    "kg": ("mass", 1.0), "kgs": ("mass", 1.0), "kilogram": ("mass", 1.0), "kilograms": ("mass", 1.0),
+    "g": ("mass", 0.001), "gram": ("mass", 0.001), "grams": ("mass", 0.001),
+    "t": ("mass", 1000.0), "ton": ("mass", 1000.0), "tons": ("mass", 1000.0),
+    "tonne": ("mass", 1000.0), "tonnes": ("mass", 1000.0), "mt": ("mass", 1000.0),
+    "lb": ("mass", 0.45359237), "lbs": ("mass", 0.45359237),
+    "ea": ("count", 1.0), "each": ("count", 1.0), "unit": ("count", 1.0), "units": ("count", 1.0),
+    "pc": ("count", 1.0), "pcs": ("count", 1.0), "piece": ("count", 1.0), "pieces": ("count", 1.0),
+    "item": ("count", 1.0), "items": ("count", 1.0), "reel": ("count", 1.0), "reels": ("count", 1.0),
+    "box": ("box", 1.0), "boxes": ("box", 1.0),
+    "m": ("length", 1.0), "metre": ("length", 1.0), "metres": ("length", 1.0),
+    "meter": ("length", 1.0), "meters": ("length", 1.0), "km": ("length", 1000.0),
+    "l": ("volume", 1.0), "litre": ("volume", 1.0), "litres": ("volume", 1.0),
+    "liter": ("volume", 1.0), "liters": ("volume", 1.0),
+}
+
+# Lengths used in pallet dimensions, in millimetres
+DIMENSION_UNITS = {"mm": 1.0, "cm": 10.0, "m": 1000.0, "in": 25.4, "inch": 25.4, "inches": 25.4}
+
+# Relative slack when comparing amounts, so float rounding in parsed or converted values is not a breach
+AMOUNT_EPSILON = 1e-9
+
+_NUMBER = r"\d[\d,]*(?:\.\d+)?"
+_AMOUNT_PATTERN = re.compile(rf"({_NUMBER})\s*([a-zA-Z]+)?")
+_DIMENSION_PATTERN = re.compile(rf"({_NUMBER})\s*(?:(mm|cm|m|inches|inch|in)(?![a-z]))?", re.IGNORECASE)
+
+
+@dataclass
+class FieldVerdict:
+    """
+    The rule engine's decision for one contract field.
+
+    Attributes:
+        field (str): The contract field, e.g. "delivery_date".
+        contract_value: The value stated in the contract.
+        delivered_value: The value recorded in the ERP data.
+        breached (bool): Whether the field is breached, or None if the rules cannot decide.
+        reason (str): A human-readable explanation of the decision.
+    """
+    field: str
+    contract_value: object
+    delivered_value: object
+    breached: Optional[bool]
+    reason: str
+
+    @property
+    def decided(self) -> bool:
+        return self.breached is not None
+
+
+def is_missing(value) -> bool:
+    """
+    Checks whether a contract or ERP value is absent.
+
+    Args:
+        value: The value to check.
+
+    Returns:
+        bool: True for None, NaN/NaT and empty or placeholder strings.
+    """
+    if value is None:
+        return True
+    if isinstance(value, float) and math.isnan(value):
+        return True
+    if isinstance(value, str):
+        return value.strip().lower() in ("", "none", "null", "n/a", "nan", "nat", "yyyy-mm-dd")
+    return str(value) == "NaT"
+
+
+def parse_date(value) -> Optional[datetime.date]:
+    """
+    Parses a contract or ERP date.
+
+    Args:
+        value (str | datetime.date | numpy.datetime64 | pandas.Timestamp): The date.
+
+    Returns:
+        datetime.date: The parsed date, or None if it cannot be parsed.
+    """
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return date_parser.parse(str(value), dayfirst=False).date()
+    except (ValueError, OverflowError):
+        return None
+
+
+def parse_amount(value, default_unit: str = None) -> Optional[tuple]:
+    """
+    Parses a quantity such as "73 tons", "73,000 kg" or 500 into a value in its base unit.
+
+    Args:
+        value (str | int | float): The quantity.
+        default_unit (str): The unit to assume if the value has none (default is None).
+
+    Returns:
+        tuple: (amount, dimension) with the amount in the dimension's base unit, where the
+            dimension is None if no unit is known. None if the value cannot be parsed, has
+            several numbers, or an unknown unit.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        amount, unit = float(value), default_unit
+    else:
+        matches = _AMOUNT_PATTERN.findall(str(value))
+        if len(matches) != 1:
+            return None
+        number, unit = matches[0]
+        amount = float(number.replace(",", ""))
+        unit = unit or default_unit
+
+    if not unit:
+        return amount, None
+    conversion = UNITS.get(unit.lower())
+    if conversion is None:
+        return None
+    dimension, factor = conversion
+    return amount * factor, dimension
+
+
+def parse_dimensions(value) -> Optional[tuple]:
+    """
+    Parses pallet dimensions such as "1200mm x 1000mm x 150mm" or "120 x 100 x 15 cm".
+
+    Args:
+        value (str): The dimensions.
+
+    Returns:
+        tuple: The dimensions in millimetres, or None if they cannot be parsed.
+    """
+    matches = _DIMENSION_PATTERN.findall(str(value))
+    if len(matches) < 2:
+        return None
+    trailing_unit = next((unit for _, unit in reversed(matches) if unit), "mm")  # "120 x 100 x 15 cm"
+    return tuple(
+        float(number.replace(",", "")) * DIMENSION_UNITS[(unit or trailing_unit).lower()]
+        for number, unit in matches
+    )
+
+
+def is_short(delivered, expected, tolerance: float = 0.0):
+    """
+    Checks whether a delivered amount falls short of the contracted amount. Works on
+    scalars and NumPy arrays alike.
+
+    Args:
+        delivered (float | numpy.ndarray): The delivered amount, in base units.
+        expected (float | numpy.ndarray): The contracted amount, in base units.
+        tolerance (float): The relative shortfall allowed (default is 0.0).
+
+    Returns:
+        bool | numpy.ndarray: True where the delivery is short.
+    """
+    return delivered < expected * (1 - tolerance) - abs(expected) * AMOUNT_EPSILON
+
+
+class BreachRules:
+    """
+    A deterministic rule engine deciding whether each contract field is breached by
+    the delivered ERP values, so the LLM is only consulted for fields it cannot decide.
+
+    The rules mirror the breach analysis prompt: early delivery and over-delivery are
+    not breaches, and a missing value is a breach requiring human clarification.
+
+    Attributes:
+        date_tolerance_days (int): Days a delivery may be late without a breach.
+        amount_tolerance (float): Relative shortfall in quantity or weight allowed without a breach.
+        dimension_tolerance_mm (float): Allowed difference per pallet dimension, in millimetres.
+        erp_weight_unit (str): The unit of the ERP `weight` column.
+    """
+
+    # Contract field -> method deciding it
+    FIELD_RULES = {
+        "delivery_date": "compare_date",
+        "quantity": "compare_quantity",
+        "weight": "compare_weight",
+        "pallet_dimensions": "compare_dimensions",
+    }
+
+    # ERP columns the rules read, besides the contract fields themselves
+    ERP_COLUMNS = ["base_unit_of_measure"]
+
+    def __init__(
+        self,
+        date_tolerance_days: int = 0,
+        amount_tolerance: float = 0.0,
+        dimension_tolerance_mm: float = 0.0,
+        erp_weight_unit: str = "kg",
+    ):
+        """
+        Initializes the BreachRules class.
+
+        Args:
+            date_tolerance_days (int): Days a delivery may be late without a breach (default is 0).
+            amount_tolerance (float): Relative shortfall allowed, e.g. 0.02 for 2% (default is 0.0).
+            dimension_tolerance_mm (float): Allowed difference per pallet dimension (default is 0.0).
+            erp_weight_unit (str): The unit of the ERP `weight` column (default is "kg").
+        """
+        self.date_tolerance_days = date_tolerance_days
+        self.amount_tolerance = amount_tolerance
+        self.dimension_tolerance_mm = dimension_tolerance_mm
+        self.erp_weight_unit = erp_weight_unit
+
+    def evaluate(self, contract_details: dict, erp_row: dict) -> list:
+        """
+        Decides every contract field against the delivered values.
+
+        Args:
+            contract_details (dict): The contract's "details" terms, e.g. {"quantity": "73 tons"}.
+            erp_row (dict): The delivered values keyed by ERP column.
+
+        Returns:
+            list: A FieldVerdict per contract field, in order.
+        """
+        return [
+            self.evaluate_field(field, contract_value, erp_row)
+            for field, contract_value in contract_details.items()
+        ]
+
+    def evaluate_field(self, field: str, contract_value, erp_row: dict) -> FieldVerdict:
+        """
+        Decides a single contract field against the delivered values.
+
+        Args:
+            field (str): The contract field.
+            contract_value: The value stated in the contract.
+            erp_row (dict): The delivered values keyed by ERP column.
+
+        Returns:
+            FieldVerdict: The decision, undecided if no rule applies or a value cannot be parsed.
+        """
+        delivered_value = erp_row.get(field)
+        if is_missing(contract_value) or is_missing(delivered_value):
+            return FieldVerdict(
+                field, contract_value, delivered_value, True,
+                f"The {field} value is missing; human clarification is required.",
+            )
+
+        rule = self.FIELD_RULES.get(field)
+        if rule is None:
+            return FieldVerdict(field, contract_value, delivered_value, None, f"No rule for {field}.")
+        return getattr(self, rule)(field, contract_value, delivered_value, erp_row)
+
+    def compare_date(self, field, contract_value, delivered_value, erp_row) -> FieldVerdict:
+        """
+        A delivery on or before the contract date (plus tolerance) is not a breach.
+        """
+        expected, delivered = parse_date(contract_value), parse_date(delivered_value)
+        if expected is None or delivered is None:
+            return FieldVerdict(field, contract_value, delivered_value, None, f"Could not parse the {field}.")
+
+        days_late = (delivered - expected).days
+        if days_late > self.date_tolerance_days:
+            return FieldVerdict(
+                field, contract_value, delivered_value, True,
+                f"Delivered on {delivered}, {days_late} day(s) after the contracted {expected}.",
+            )
+        return FieldVerdict(field, contract_value, delivered_value, False, f"Delivered on time ({delivered}).")
+
+    def compare_quantity(self, field, contract_value, delivered_value, erp_row) -> FieldVerdict:
+        """
+        Delivering at least the contracted quantity, after unit conversion, is not a breach.
+        """
+        erp_unit = erp_row.get("base_unit_of_measure")
+        return self._compare_amount(
+            field, contract_value, delivered_value, None if is_missing(erp_unit) else str(erp_unit)
+        )
+
+    def compare_weight(self, field, contract_value, delivered_value, erp_row) -> FieldVerdict:
+        """
+        Delivering at least the contracted weight, after unit conversion, is not a breach.
+        """
+        return self._compare_amount(field, contract_value, delivered_value, self.erp_weight_unit)
+
+    def _compare_amount(self, field, contract_value, delivered_value, erp_unit) -> FieldVerdict:
+        delivered = parse_amount(delivered_value, default_unit=erp_unit)
+        # A bare contract number is taken to be in the ERP's unit
+        expected = parse_amount(contract_value, default_unit=erp_unit)
+        if expected is None or delivered is None:
+            return FieldVerdict(field, contract_value, delivered_value, None, f"Could not parse the {field}.")
+
+        (expected_amount, expected_dimension), (delivered_amount, delivered_dimension) = expected, delivered
+        if expected_dimension != delivered_dimension:
+            return FieldVerdict(
+                field, contract_value, delivered_value, None,
+                f"Cannot convert between the contracted and delivered {field} units.",
+            )
+
+        if is_short(delivered_amount, expected_amount, self.amount_tolerance):
+            delivered_text = f"{delivered_value} {erp_unit}" if erp_unit else f"{delivered_value}"
+            return FieldVerdict(
+                field, contract_value, delivered_value, True,
+                f"Delivered {field} {delivered_text} is less than the contracted {contract_value}.",
+            )
+        return FieldVerdict(
+            field, contract_value, delivered_value, False, f"Delivered {field} meets the contracted {contract_value}."
+        )
+
+    def compare_dimensions(self, field, contract_value, delivered_value, erp_row) -> FieldVerdict:
+        """
+        Pallet dimensions must match within tolerance, in any orientation.
+        """
+        expected, delivered = parse_dimensions(contract_value), parse_dimensions(delivered_value)
+        if expected is None or delivered is None or len(expected) != len(delivered):
+            return FieldVerdict(field, contract_value, delivered_value, None, f"Could not parse the {field}.")
+
+        if all(
+            abs(e - d) <= self.dimension_tolerance_mm
+            for e, d in zip(sorted(expected), sorted(delivered))
+        ):
+            return FieldVerdict(field, contract_value, delivered_value, False, f"The {field} match.")
+        return FieldVerdict(
+            field, contract_value, delivered_value, True,
+            f"Delivered {field} {delivered_value} do not match the contracted {contract_value}.",
+        )
@@ -0,0 +1,307 @@
+import argparse
+import functools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from faker import Faker
+
+# Fixed choices, matching the factories in data_generator_code.py
+MATERIAL_TYPES = np.array(["Raw Material", "Finished Product", "Semi-Finished", "Service"])
+UNITS_OF_MEASURE = np.array(["EA", "KG", "L", "M", "Reel", "Box", "Ton"])
+TAX_CODES = np.array(["A0", "B1", "C2"])
+PROCUREMENT_TYPES = np.array(["External", "In-house"])
+MATERIAL_GROUPS = np.array(["MG01", "MG02", "MG03"])
+PLANTS = np.array(["Plant1", "Plant2", "Plant3"])
+STORAGE_LOCATIONS = np.array(["SL01", "SL02", "SL03"])
+VALUATION_CLASSES = np.array(["3000", "7920", "7930"])
+PRICE_CONTROLS = np.array(["Standard", "Moving Average"])
+
+PALLET_DIMENSIONS = np.array([1200, 1000, 150])  # Standard dimensions in mm
+BREACH_FIELDS = np.array(["delivery_date", "quantity", "weight", "pallet_dimensions"])
+
+# Contract numbers are offset item ids, so they are unique across shards
+CONTRACT_NUMBER_OFFSET = 1_000_000
+
+# The latest delivery date generated; deliveries fall in the year before it
+REFERENCE_DATE = np.datetime64("2024-12-31")
+
+
+@functools.lru_cache(maxsize=4)
+def faker_pools(seed: int, size: int = 1000) -> dict:
+    """
+    Precomputes pools of Faker values, so rows draw from them by index instead of calling
+    Faker per row. Cached per process.
+
+    Args:
+        seed (int): The Faker seed.
+        size (int): The number of values per pool (default is 1000).
+
+    Returns:
+        dict: Arrays of companies, descriptions and country codes.
+    """
+    fake = Faker()
+    fake.seed_instance(seed)
+    return {
+        "companies": np.array([fake.company() for _ in range(size)]),
+        "descriptions": np.array([
+            f"{fake.color_name()} {fake.word().capitalize()} {fake.random_element(elements=('Widget', 'Gadget', 'Component'))}"
+            for _ in range(size)
+        ]),
+        "countries": np.array([fake.country_code() for _ in range(size)]),
+    }
+
+
+def _codes(prefix: str, values: np.ndarray, width: int) -> np.ndarray:
+    return np.char.add(prefix, np.char.zfill(values.astype(str), width))
+
+
+class BulkDataGenerator:
+    """
+    Generates large synthetic ERP datasets for load testing, with paired contract terms.
+
+    Every field is generated with vectorised NumPy operations, Faker values are drawn from
+    precomputed pools, and shards are generated in separate processes. Each shard is
+    seeded from (`seed`, shard index), so output is reproducible regardless of the
+    number of workers.
+
+    Every item has its own contract. Its terms match the delivery (a delivery date on
+    or after the delivered date, a quantity and weight at most those delivered, standard
+    pallet dimensions), except for a `breach_fraction` of contracts where one field is
+    deliberately breached. The breached field is recorded as a ground-truth label.
+
+    Attributes:
+        rows (int): The total number of items to generate.
+        shards (int): The number of shards to split the items into.
+        seed (int): The random seed.
+        breach_fraction (float): The fraction of contracts with an injected breach.
+        output_format (str): "parquet" or "ndjson".
+        workers (int): The number of processes to generate shards with.
+    """
+
+    def __init__(
+        self,
+        rows: int,
+        shards: int = 1,
+        seed: int = 0,
+        breach_fraction: float = 0.1,
+        output_format: str = "parquet",
+        workers: int = None,
+    ):
+        """
+        Initializes the BulkDataGenerator class.
+
+        Args:
+            rows (int): The total number of items to generate.
+            shards (int): The number of shards to split the items into (default is 1).
+            seed (int): The random seed (default is 0).
+            breach_fraction (float): The fraction of contracts with an injected breach (default is 0.1).
+            output_format (str): "parquet" or "ndjson" (default is "parquet").
+            workers (int): The number of processes (default is None, one per CPU up to `shards`).
+        """
+        if output_format not in ("parquet", "ndjson"):
+            raise ValueError(f"Unknown output format {output_format!r}; expected 'parquet' or 'ndjson'.")
+        if not 0 <= breach_fraction <= 1:
+            raise ValueError("breach_fraction must be between 0 and 1.")
+        self.rows = rows
+        self.shards = max(1, shards)
+        self.seed = seed
+        self.breach_fraction = breach_fraction
+        self.output_format = output_format
+        self.workers = workers or min(self.shards, os.cpu_count() or 1)
+
+    def shard_rows(self, shard_index: int) -> int:
+        """
+        The number of items in a shard; earlier shards take any remainder.
+
+        Args:
+            shard_index (int): The shard index.
+
+        Returns:
+            int: The number of items in the shard.
+        """
+        base, remainder = divmod(self.rows, self.shards)
+        return base + (1 if shard_index < remainder else 0)
+
+    def generate_shard(self, shard_index: int) -> dict:
+        """
+        Generates one shard of deliveries, items and contract terms.
+
+        Args:
+            shard_index (int): The shard index.
+
+        Returns:
+            dict: "deliveries", "items" and "contracts" DataFrames.
+        """
+        rng = np.random.default_rng([self.seed, shard_index])
+        pools = faker_pools(self.seed)
+        n = self.shard_rows(shard_index)
+        id_offset = sum(self.shard_rows(i) for i in range(shard_index))
+
+        # Deliveries of 1-5 items; ids never exceed the item ids, so they are unique across shards
+        sizes = rng.integers(1, 6, size=max(n, 1))
+        ends = np.cumsum(sizes)
+        delivery_count = int(np.searchsorted(ends, n) + 1) if n else 0
+        item_delivery = np.repeat(np.arange(delivery_count), sizes[:delivery_count])[:n]
+        delivery_ids = id_offset + np.arange(delivery_count) + 1
+        delivery_dates = REFERENCE_DATE - rng.integers(0, 365, size=delivery_count).astype("timedelta64[D]")
+
+        deliveries = pd.DataFrame({
+            "delivery_id": delivery_ids,
+            "delivery_date": delivery_dates,
+            "supplier": pools["companies"][rng.integers(0, len(pools["companies"]), size=delivery_count)],
+            "carrier": pools["companies"][rng.integers(0, len(pools["companies"]), size=delivery_count)],
+            "tracking_number": _codes("TN", rng.integers(0, 10**10, size=delivery_count), 10),
+            "order_number": _codes("ORD-", rng.integers(0, 10**5, size=delivery_count), 5),
+        })
+
+        item_ids = id_offset + np.arange(n) + 1
+        quantity = rng.integers(1, 1001, size=n)
+        unit_price = np.round(rng.uniform(5.0, 500.0, size=n), 2)
+        weight = np.round(rng.uniform(0.1, 50.0, size=n), 2)
+        pallets = np.tile(PALLET_DIMENSIONS, (n, 1))
+        item_dates = delivery_dates[item_delivery]
+
+        # Contract terms that the delivery satisfies: due on or after delivery, no more than delivered
+        contract_dates = item_dates + rng.integers(0, 15, size=n).astype("timedelta64[D]")
+        contract_quantity = quantity - rng.integers(0, 3, size=n).clip(max=quantity - 1)
+        contract_weight = np.round(weight * rng.uniform(0.9, 1.0, size=n), 2)
+
+        # Inject one breached field into a fraction of contracts
+        breached = rng.random(size=n) < self.breach_fraction
+        breach_field = np.where(breached, BREACH_FIELDS[rng.integers(0, len(BREACH_FIELDS), size=n)], "")
+        late = breach_field == "delivery_date"
+        contract_dates[late] = item_dates[late] - rng.integers(1, 31, size=late.sum()).astype("timedelta64[D]")
+        short = breach_field == "quantity"
+        contract_quantity[short] = quantity[short] + rng.integers(1, 101, size=short.sum())
+        light = breach_field == "weight"
+        contract_weight[light] = np.round(weight[light] * rng.uniform(1.1, 2.0, size=light.sum()), 2)
+        wrong_pallet = breach_field == "pallet_dimensions"
+        pallets[wrong_pallet, rng.integers(0, 3, size=wrong_pallet.sum())] -= 100  # As in generate_pallet_dimensions
+
+        pallet_text = np.char.add(
+            np.char.add(np.char.add(pallets[:, 0].astype(str), "mm x "), np.char.add(pallets[:, 1].astype(str), "mm x ")),
+            np.char.add(pallets[:, 2].astype(str), "mm"),
+        )
+        units = UNITS_OF_MEASURE[rng.integers(0, len(UNITS_OF_MEASURE), size=n)]
+        contract_numbers = CONTRACT_NUMBER_OFFSET + item_ids
+
+        items = pd.DataFrame({
+            "item_id": item_ids,
+            "material_number": _codes("MAT-", rng.integers(0, 10**8, size=n), 8),
+            "material_type": MATERIAL_TYPES[rng.integers(0, len(MATERIAL_TYPES), size=n)],
+            "description": pools["descriptions"][rng.integers(0, len(pools["descriptions"]), size=n)],
+            "base_unit_of_measure": units,
+            "quantity": quantity,
+            "unit_price": unit_price,
+            "currency": "USD",
+            "batch_number": _codes("BN-", rng.integers(0, 10**8, size=n), 8),
+            "serial_number": _codes("SN-", rng.integers(0, 10**10, size=n), 10),
+            "vendor": pools["companies"][rng.integers(0, len(pools["companies"]), size=n)],
+            "manufacturer": pools["companies"][rng.integers(0, len(pools["companies"]), size=n)],
+            "country_of_origin": pools["countries"][rng.integers(0, len(pools["countries"]), size=n)],
+            "weight": weight,
+            "dimensions": np.char.add(
+                np.char.add(np.char.add(rng.integers(5, 101, size=n).astype(str), "x"),
+                            np.char.add(rng.integers(5, 101, size=n).astype(str), "x")),
+                np.char.add(rng.integers(5, 101, size=n).astype(str), " cm"),
+            ),
+            "tax_code": TAX_CODES[rng.integers(0, len(TAX_CODES), size=n)],
+            "procurement_type": PROCUREMENT_TYPES[rng.integers(0, len(PROCUREMENT_TYPES), size=n)],
+            "material_group": MATERIAL_GROUPS[rng.integers(0, len(MATERIAL_GROUPS), size=n)],
+            "plant": PLANTS[rng.integers(0, len(PLANTS), size=n)],
+            "storage_location": STORAGE_LOCATIONS[rng.integers(0, len(STORAGE_LOCATIONS), size=n)],
+            "valuation_class": VALUATION_CLASSES[rng.integers(0, len(VALUATION_CLASSES), size=n)],
+            "price_control": PRICE_CONTROLS[rng.integers(0, len(PRICE_CONTROLS), size=n)],
+            "profit_center": np.char.add("PC", rng.integers(1000, 10000, size=n).astype(str)),
+            "expiration_date": item_dates + rng.integers(0, 730, size=n).astype("timedelta64[D]"),
+            "total_amount": np.round(unit_price * quantity, 2),
+            "pallet_dimensions": pallet_text,
+            "contract_number": contract_numbers,
+            "delivery_id": delivery_ids[item_delivery],
+        })
+
+        contracts = pd.DataFrame({
+            "contract_number": contract_numbers,
+            "supplier_name": deliveries["supplier"].to_numpy()[item_delivery],
+            "delivery_date": contract_dates,
+            "quantity": contract_quantity,
+            "unit": units,
+            "weight": contract_weight,
+            "pallet_dimensions": "1200mm x 1000mm x 150mm",
+            "breached": breached,
+            "breach_field": breach_field,
+        })
+        return {"deliveries": deliveries, "items": items, "contracts": contracts}
+
+    def write_shard(self, shard_index: int, output_dir: str) -> dict:
+        """
+        Generates one shard and writes each table to `<table>-<shard>.<format>`.
+
+        Args:
+            shard_index (int): The shard index.
+            output_dir (str): The directory to write to.
+
+        Returns:
+            dict: The written path per table.
+        """
+        paths = {}
+        for table, frame in self.generate_shard(shard_index).items():
+            path = os.path.join(output_dir, f"{table}-{shard_index:05d}.{self.output_format}")
+            if self.output_format == "parquet":
+                frame.to_parquet(path, index=False)
+            else:
+                # Dates as YYYY-MM-DD, as DataBase expects
+                for column in [c for c in frame.columns if pd.api.types.is_datetime64_any_dtype(frame[c])]:
+                    frame[column] = np.datetime_as_string(frame[column].to_numpy(), unit="D")
+                frame.to_json(path, orient="records", lines=True)
+            paths[table] = path
+        return paths
+
+    def write(self, output_dir: str) -> list:
+        """
+        Generates and writes every shard, in parallel across `workers` processes.
+
+        Args:
+            output_dir (str): The directory to write to.
+
+        Returns:
+            list: The written paths per shard, in shard order.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        shard_indexes = range(self.shards)
+        if self.workers <= 1:
+            return [self.write_shard(i, output_dir) for i in shard_indexes]
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(self.write_shard, shard_indexes, [output_dir] * self.shards))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate sharded synthetic ERP data and contract terms for load testing.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Total number of items to generate.")
+    parser.add_argument("--shards", type=int, default=8, help="Number of output shards.")
+    parser.add_argument("--workers", type=int, help="Number of processes (default is one per CPU, up to --shards).")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for reproducible output.")
+    parser.add_argument("--breach-fraction", type=float, default=0.1, help="Fraction of contracts with an injected breach.")
+    parser.add_argument("--format", choices=["parquet", "ndjson"], default="parquet", help="Output file format.")
+    parser.add_argument("--output-dir", default="db/bulk", help="Directory to write the shards to.")
+    args = parser.parse_args()
+
+    generator = BulkDataGenerator(
+        args.rows, shards=args.shards, seed=args.seed, breach_fraction=args.breach_fraction,
+        output_format=args.format, workers=args.workers,
+    )
+    start = time.perf_counter()
+    generator.write(args.output_dir)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"Wrote {args.rows} items in {args.shards} shards to {args.output_dir} in {elapsed:.2f}s "
+        f"({args.rows / elapsed * 60:,.0f} items/minute)."
+    )
+    print(
+        f"Load with DataBase('{args.output_dir}/deliveries-*.{args.format}', "
+        f"'{args.output_dir}/items-*.{args.format}', db_path=...)."
+    )
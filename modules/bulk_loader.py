@@ -0,0 +1,201 @@
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+from .metrics import MetricsSink, NullMetrics
+from .parsed_contract import ParsedContract, ParsedContractCache
+
+
+@dataclass
+class LoadResult:
+    """
+    The outcome of loading one contract in a bulk load.
+
+    Attributes:
+        index (int): The position of the contract in the submitted paths.
+        path (str): The path to the .docx file.
+        contract (ParsedContract): The parsed contract, or None if loading failed.
+        error (str): The error message if loading failed, otherwise None.
+        cached (bool): Whether the contract was served from the contract cache.
+    """
+    index: int
+    path: str
+    contract: Optional[ParsedContract] = None
+    error: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+def _load_chunk(chunk: List[tuple], cache_dir: Optional[str]) -> List[LoadResult]:
+    """
+    Parses a chunk of contracts in a worker process.
+
+    Only the `ParsedContract` (flattened text, paragraph offsets and metadata) is returned
+    across the process boundary, never the python-docx `Document`.
+
+    Args:
+        chunk (list): (index, path) pairs.
+        cache_dir (str): The `ParsedContractCache` directory, or None to always parse.
+
+    Returns:
+        list: A LoadResult per contract, in chunk order.
+    """
+    cache = ParsedContractCache(cache_dir) if cache_dir else None
+    results = []
+    for index, path in chunk:
+        result = LoadResult(index=index, path=path)
+        try:
+            if cache is not None:
+                hits = cache.hits
+                result.contract = cache.load(path)
+                result.cached = cache.hits > hits
+            else:
+                result.contract = ParsedContract.from_file(path)
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        results.append(result)
+    return results
+
+
+class BulkContractLoader:
+    """
+    Parses many .docx contracts in parallel across processes.
+
+    Parsing a .docx is CPU-bound zip and XML work that holds the GIL, so threads do not
+    speed it up. Paths are submitted to a process pool in chunks, at most `max_pending`
+    chunks at a time so memory stays bounded for large drops, and results are streamed
+    back in input order or as soon as each chunk finishes.
+
+    Attributes:
+        workers (int): The number of worker processes; 1 parses in the calling process.
+        chunksize (int): The number of contracts per task sent to a worker.
+        max_pending (int): The maximum number of chunks submitted but not yet consumed.
+        contract_cache (ParsedContractCache): The contract cache used by the workers, or None.
+        metrics (MetricsSink): Counts the contracts loaded, labelled by outcome.
+    """
+
+    def __init__(
+        self,
+        workers: int = None,
+        chunksize: int = 16,
+        max_pending: int = None,
+        contract_cache: ParsedContractCache = None,
+        mp_context=None,
+        metrics: MetricsSink = None,
+    ):
+        """
+        Initializes the BulkContractLoader class.
+
+        The worker processes import this module, so under the "spawn" and "forkserver"
+        start methods the calling script must guard its entry point with
+        `if __name__ == "__main__":`.
+
+        Args:
+            workers (int): The number of worker processes (default is None, one per CPU).
+            chunksize (int): The number of contracts per task (default is 16).
+            max_pending (int): The maximum number of chunks in flight (default is None, twice `workers`).
+            contract_cache (ParsedContractCache): If set, workers serve unchanged contracts from
+                its directory and store new parses there (default is None, always parse).
+            mp_context: The multiprocessing context for the pool (default is None, the platform default).
+            metrics (MetricsSink): Where to count loaded contracts (default is None, discarded).
+        """
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1.")
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.max_pending = max_pending or 2 * self.workers
+        self.contract_cache = contract_cache
+        self.mp_context = mp_context
+        self.metrics = metrics or NullMetrics()
+
+    def _chunks(self, paths: List[str]) -> Iterator[List[tuple]]:
+        indexed = list(enumerate(paths))
+        for start in range(0, len(indexed), self.chunksize):
+            yield indexed[start:start + self.chunksize]
+
+    def _record(self, results: List[LoadResult]) -> List[LoadResult]:
+        """
+        Counts a finished chunk, and mirrors the workers' cache hits and misses on `contract_cache`.
+        """
+        for result in results:
+            if not result.succeeded:
+                status = "failed"
+            else:
+                status = "cached" if result.cached else "parsed"
+                if self.contract_cache is not None:
+                    if result.cached:
+                        self.contract_cache.hits += 1
+                    else:
+                        self.contract_cache.misses += 1
+            self.metrics.count("contracts_loaded", status=status)
+        return results
+
+    def iter_load(self, paths: List[str], ordered: bool = True) -> Iterator[LoadResult]:
+        """
+        Parses contracts and streams the results as chunks complete.
+
+        A contract that cannot be loaded yields a LoadResult with `error` set, so one bad
+        file does not stop the load.
+
+        Args:
+            paths (list): The .docx paths to load.
+            ordered (bool): If True, results are yielded in the order of `paths`; otherwise
+                as soon as each chunk finishes, with `index` giving the input position
+                (default is True).
+
+        Yields:
+            LoadResult: The outcome for each contract.
+        """
+        paths = list(paths)
+        cache_dir = self.contract_cache.cache_dir if self.contract_cache is not None else None
+        chunks = self._chunks(paths)
+
+        if self.workers <= 1 or len(paths) <= self.chunksize:
+            for chunk in chunks:
+                yield from self._record(_load_chunk(chunk, cache_dir))
+            return
+
+        executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=self.mp_context)
+        try:
+            pending = deque()
+
+            def submit():
+                # Keep at most `max_pending` chunks outstanding
+                while len(pending) < self.max_pending:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        return
+                    pending.append(executor.submit(_load_chunk, chunk, cache_dir))
+
+            submit()
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    done = [future for future in pending if future in finished]
+                    for future in done:
+                        pending.remove(future)
+                for future in done:
+                    results = self._record(future.result())
+                    submit()
+                    yield from results
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def load(self, paths: List[str]) -> List[LoadResult]:
+        """
+        Parses contracts and returns every result in the order of `paths`.
+
+        Args:
+            paths (list): The .docx paths to load.
+
+        Returns:
+            list: A LoadResult per path.
+        """
+        return list(self.iter_load(paths, ordered=True))
@@ -0,0 +1,849 @@
+import argparse
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class CacheEntryInfo:
+    """
+    Access metadata for a single cache entry, used by eviction.
+
+    Attributes:
+        key (str): The cache key.
+        size (int): The stored size of the entry in bytes.
+        created_at (float): When the entry was written (Unix time).
+        accessed_at (float): When the entry was last read or written (Unix time).
+        access_count (int): How many times the entry has been read.
+    """
+    key: str
+    size: int
+    created_at: float
+    accessed_at: float
+    access_count: int = 0
+
+
+@dataclass
+class CachePolicy:
+    """
+    Limits applied by `CacheBackend.gc`. Any limit left as None is not enforced.
+
+    Attributes:
+        max_bytes (int): The maximum total size of the cache in bytes.
+        max_entries (int): The maximum number of entries.
+        ttl (float): The maximum age of an entry in seconds, measured from when it was written.
+        eviction (str): "lru" evicts least recently used entries first, "lfu" least frequently used.
+    """
+    max_bytes: Optional[int] = None
+    max_entries: Optional[int] = None
+    ttl: Optional[float] = None
+    eviction: str = "lru"
+
+    def __post_init__(self):
+        if self.eviction not in ("lru", "lfu"):
+            raise ValueError(f"Unknown eviction policy {self.eviction!r}; expected 'lru' or 'lfu'.")
+
+
+class CacheBackend:
+    """
+    The interface for QueryLLM response caches.
+
+    Keys are the SHA256 hex digests produced by `QueryLLM._generate_hash`; values are
+    any picklable object. Subclasses must implement `get`, `set`, `delete`, `keys`
+    and `entries`.
+
+    Attributes:
+        ttl (float): The maximum age of an entry in seconds; older entries read as misses.
+    """
+
+    ttl: Optional[float] = None
+
+    def get(self, key: str):
+        """
+        Loads a cached value.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            object: The cached value or None if not found.
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, value):
+        """
+        Stores a value, replacing any existing entry atomically.
+
+        Args:
+            key (str): The cache key.
+            value (object): The value to cache.
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """
+        Removes an entry if it exists.
+
+        Args:
+            key (str): The cache key.
+        """
+        raise NotImplementedError
+
+    def keys(self):
+        """
+        Iterates over every key in the cache.
+
+        Returns:
+            iterator: The cache keys.
+        """
+        raise NotImplementedError
+
+    def entries(self):
+        """
+        Iterates over the access metadata of every entry.
+
+        Returns:
+            iterator: A `CacheEntryInfo` per entry.
+        """
+        raise NotImplementedError
+
+    def set_many(self, items):
+        """
+        Stores several values. Backends may override this to batch writes.
+
+        Args:
+            items (iterable): (key, value) pairs to cache.
+        """
+        for key, value in items:
+            self.set(key, value)
+
+    def close(self):
+        """
+        Releases any resources held by the backend.
+        """
+
+    def compact(self):
+        """
+        Reclaims space left behind by deleted entries. Backends override this where needed.
+        """
+
+    def usage(self) -> tuple:
+        """
+        Reports the current size of the cache.
+
+        Returns:
+            tuple: (number of entries, total bytes).
+        """
+        count = size = 0
+        for entry in self.entries():
+            count += 1
+            size += entry.size
+        return count, size
+
+    def _expired(self, created_at: float, now: float = None) -> bool:
+        """
+        Checks an entry's age against the backend TTL.
+
+        Args:
+            created_at (float): When the entry was written (Unix time).
+            now (float): The current time (default is `time.time()`).
+
+        Returns:
+            bool: True if the entry is older than the TTL.
+        """
+        if self.ttl is None:
+            return False
+        return created_at < (time.time() if now is None else now) - self.ttl
+
+    def _delete_older_than(self, cutoff: float) -> int:
+        """
+        Deletes every entry written before `cutoff`.
+
+        Args:
+            cutoff (float): The oldest creation time to keep (Unix time).
+
+        Returns:
+            int: The number of entries deleted.
+        """
+        expired = [entry.key for entry in self.entries() if entry.created_at < cutoff]
+        for key in expired:
+            self.delete(key)
+        return len(expired)
+
+    def check_policy(self, policy: CachePolicy):
+        """
+        Checks that the backend can enforce a policy. Backends override this to reject
+        limits they cannot honour.
+
+        Args:
+            policy (CachePolicy): The limits to enforce.
+
+        Raises:
+            ValueError: If the backend cannot enforce the policy.
+        """
+
+    def _eviction_order(self, eviction: str) -> list:
+        """
+        Lists entries in the order they should be evicted.
+
+        Args:
+            eviction (str): "lru" or "lfu".
+
+        Returns:
+            list: `CacheEntryInfo` objects, first to be evicted first.
+        """
+        if eviction == "lfu":
+            return sorted(self.entries(), key=lambda e: (e.access_count, e.accessed_at))
+        return sorted(self.entries(), key=lambda e: e.accessed_at)
+
+    def gc(self, policy: CachePolicy, now: float = None) -> dict:
+        """
+        Removes expired entries, then evicts entries until the cache is within quota.
+
+        Args:
+            policy (CachePolicy): The limits to enforce.
+            now (float): The current time (default is `time.time()`).
+
+        Returns:
+            dict: The number of entries expired and evicted, and the remaining entries and bytes.
+
+        Raises:
+            ValueError: If the backend cannot enforce the policy, see `check_policy`.
+        """
+        self.check_policy(policy)
+        now = time.time() if now is None else now
+        expired = 0
+        if policy.ttl is not None:
+            expired = self._delete_older_than(now - policy.ttl)
+
+        count, size = self.usage()
+
+        def over_quota():
+            return (policy.max_entries is not None and count > policy.max_entries) or (
+                policy.max_bytes is not None and size > policy.max_bytes
+            )
+
+        evicted = 0
+        if over_quota():
+            for entry in self._eviction_order(policy.eviction):
+                if not over_quota():
+                    break
+                self.delete(entry.key)
+                count -= 1
+                size -= entry.size
+                evicted += 1
+
+        return {"expired": expired, "evicted": evicted, "entries": count, "bytes": size}
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.keys())
+
+
+class PickleDirCache(CacheBackend):
+    """
+    The original cache layout: one `<hash>.pkl` file per response in a directory.
+
+    Access metadata comes from the filesystem: the file's mtime is its creation time and
+    its atime, bumped on every read, its last access. Read counts are not tracked, so
+    LFU eviction is rejected for this backend; use `SQLiteCache` for it.
+
+    Attributes:
+        cache_dir (str): Directory to store cached responses.
+        debug (bool): Flag for enabling debug mode.
+        ttl (float): The maximum age of an entry in seconds, or None.
+    """
+
+    def __init__(self, cache_dir: str = "./cache", debug=False, ttl: float = None):
+        """
+        Initializes the PickleDirCache class.
+
+        Args:
+            cache_dir (str): Directory to store cached responses (default is "./cache").
+            debug (bool): Enable or disable debug mode (default is False).
+            ttl (float): The maximum age of an entry in seconds (default is None, no expiry).
+        """
+        self.cache_dir = cache_dir
+        self.debug = debug
+        self.ttl = ttl
+        os.makedirs(self.cache_dir, exist_ok=True)  # Ensure the cache directory exists
+
+    def path(self, key: str) -> str:
+        """
+        Constructs the file path for a cache entry.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            str: The full path to the cache file.
+        """
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key: str):
+        cache_file = self.path(key)
+        try:
+            with open(cache_file, "rb") as file:
+                created_at = os.fstat(file.fileno()).st_mtime
+                expired = self._expired(created_at)
+                value = None if expired else pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except (EOFError, pickle.UnpicklingError):
+            # Handle empty or corrupted cache file
+            if self.debug:
+                print(f"Cache file {cache_file} is corrupted or empty. Deleting...")
+            self.delete(key)
+            return None
+
+        if expired:
+            self.delete(key)
+            return None
+        try:
+            os.utime(cache_file, (time.time(), created_at))  # Record the access, keep the creation time
+        except FileNotFoundError:
+            pass  # Evicted concurrently; the value we read is still valid
+        return value
+
+    def set(self, key: str, value):
+        # Write to a temporary file and rename so readers never see a partial pickle
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump(value, file)
+            os.replace(tmp_path, self.path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def keys(self):
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".pkl"):
+                yield name[:-len(".pkl")]
+
+    def check_policy(self, policy: CachePolicy):
+        if policy.eviction == "lfu":
+            raise ValueError(
+                "PickleDirCache does not track read counts, so it cannot evict least frequently "
+                "used entries; use a SQLiteCache for LFU eviction."
+            )
+
+    def entries(self):
+        with os.scandir(self.cache_dir) as it:
+            for dir_entry in it:
+                if not dir_entry.name.endswith(".pkl"):
+                    continue
+                try:
+                    stat = dir_entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield CacheEntryInfo(
+                    key=dir_entry.name[:-len(".pkl")],
+                    size=stat.st_size,
+                    created_at=stat.st_mtime,
+                    accessed_at=max(stat.st_atime, stat.st_mtime),
+                )
+
+    def compact(self, max_tmp_age: float = 3600):
+        """
+        Removes temporary files left behind by writers that died mid-write.
+
+        Args:
+            max_tmp_age (float): Only remove temporary files older than this many seconds (default is 3600).
+        """
+        cutoff = time.time() - max_tmp_age
+        with os.scandir(self.cache_dir) as it:
+            for dir_entry in it:
+                if dir_entry.name.endswith(".tmp"):
+                    try:
+                        if dir_entry.stat().st_mtime < cutoff:
+                            os.remove(dir_entry.path)
+                    except FileNotFoundError:
+                        pass
+
+
+class SQLiteCache(CacheBackend):
+    """
+    A single-file cache store backed by SQLite in WAL mode.
+
+    WAL mode lets any number of readers (threads or processes) proceed while a writer
+    commits, and each write is a single atomic transaction. Lookups are primary-key
+    probes, so cold start cost does not grow with the number of entries.
+
+    Each row records when it was written, last read and how often it was read. Read
+    metadata is buffered in memory and flushed in batches so lookups stay read-only.
+
+    Attributes:
+        db_path (str): The path to the SQLite database file.
+        debug (bool): Flag for enabling debug mode.
+        ttl (float): The maximum age of an entry in seconds, or None.
+        access_flush_size (int): The number of buffered reads that triggers a metadata flush.
+    """
+
+    def __init__(self, db_path: str = "./cache.sqlite", debug=False, ttl: float = None, access_flush_size: int = 256):
+        """
+        Initializes the SQLiteCache class.
+
+        Args:
+            db_path (str): The path to the SQLite database file (default is "./cache.sqlite").
+            debug (bool): Enable or disable debug mode (default is False).
+            ttl (float): The maximum age of an entry in seconds (default is None, no expiry).
+            access_flush_size (int): Buffered reads that trigger a metadata flush (default is 256).
+        """
+        self.db_path = db_path
+        self.debug = debug
+        self.ttl = ttl
+        self.access_flush_size = access_flush_size
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()  # SQLite connections must not be shared across threads
+        self._access_lock = threading.Lock()
+        self._pending_access = {}  # key -> [read count, last read time]
+
+        with self._connection() as con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "created_at REAL, accessed_at REAL, access_count INTEGER NOT NULL DEFAULT 0)"
+            )
+            # Stores created before access metadata existed only have key and value
+            columns = {row[1] for row in con.execute("PRAGMA table_info(cache)")}
+            for column, definition in [
+                ("created_at", "REAL"),
+                ("accessed_at", "REAL"),
+                ("access_count", "INTEGER NOT NULL DEFAULT 0"),
+            ]:
+                if column not in columns:
+                    con.execute(f"ALTER TABLE cache ADD COLUMN {column} {definition}")
+            now = time.time()
+            con.execute("UPDATE cache SET created_at = ? WHERE created_at IS NULL", (now,))
+            con.execute("UPDATE cache SET accessed_at = created_at WHERE accessed_at IS NULL")
+            con.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Returns this thread's connection, opening it on first use.
+
+        Returns:
+            sqlite3.Connection: The connection for the calling thread.
+        """
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.db_path, timeout=30)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def get(self, key: str):
+        row = self._connection().execute(
+            "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if self._expired(row[1]):
+            self.delete(key)
+            return None
+        try:
+            value = pickle.loads(row[0])
+        except (EOFError, pickle.UnpicklingError):
+            if self.debug:
+                print(f"Cache entry {key} is corrupted or empty. Deleting...")
+            self.delete(key)
+            return None
+        self._record_access(key)
+        return value
+
+    def _record_access(self, key: str):
+        """
+        Buffers a read of `key`, flushing the buffer once it is large enough.
+
+        Args:
+            key (str): The cache key that was read.
+        """
+        with self._access_lock:
+            pending = self._pending_access.setdefault(key, [0, 0.0])
+            pending[0] += 1
+            pending[1] = time.time()
+            should_flush = len(self._pending_access) >= self.access_flush_size
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes buffered read metadata to the database in one transaction.
+        """
+        with self._access_lock:
+            pending, self._pending_access = self._pending_access, {}
+        if not pending:
+            return
+        with self._connection() as con:
+            con.executemany(
+                "UPDATE cache SET access_count = access_count + ?, accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+                ((count, accessed_at, key) for key, (count, accessed_at) in pending.items()),
+            )
+
+    def set(self, key: str, value):
+        self.set_many([(key, value)])
+
+    def set_many(self, items):
+        now = time.time()
+        with self._connection() as con:  # Commits the whole batch as one transaction
+            con.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, created_at, accessed_at, access_count) "
+                "VALUES (?, ?, ?, ?, 0)",
+                ((key, pickle.dumps(value), now, now) for key, value in items),
+            )
+
+    def delete(self, key: str):
+        with self._connection() as con:
+            con.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def keys(self):
+        for (key,) in self._connection().execute("SELECT key FROM cache"):
+            yield key
+
+    def entries(self):
+        self.flush()
+        query = "SELECT key, length(value), created_at, accessed_at, access_count FROM cache"
+        for row in self._connection().execute(query):
+            yield CacheEntryInfo(*row)
+
+    def usage(self) -> tuple:
+        count, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(length(value)), 0) FROM cache"
+        ).fetchone()
+        return count, size
+
+    def _delete_older_than(self, cutoff: float) -> int:
+        with self._connection() as con:
+            return con.execute("DELETE FROM cache WHERE created_at < ?", (cutoff,)).rowcount
+
+    def _eviction_order(self, eviction: str) -> list:
+        self.flush()
+        order = "access_count, accessed_at" if eviction == "lfu" else "accessed_at"
+        query = f"SELECT key, length(value), created_at, accessed_at, access_count FROM cache ORDER BY {order}"
+        return [CacheEntryInfo(*row) for row in self._connection().execute(query)]
+
+    def compact(self):
+        """
+        Checkpoints the WAL into the main file and returns freed pages to the filesystem.
+        """
+        self.flush()
+        con = self._connection()
+        con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        con.execute("VACUUM")
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def close(self):
+        self.flush()
+        con = getattr(self._local, "con", None)
+        if con is not None:
+            con.close()
+            self._local.con = None
+
+
+class MemoryCache(CacheBackend):
+    """
+    A bounded in-process LRU cache, used as a tier in front of a disk backend.
+
+    Values are stored pickled so callers cannot mutate a cached response through a
+    returned reference, and so the byte limit reflects the real cost of each entry.
+
+    Attributes:
+        max_entries (int): The maximum number of entries held.
+        max_bytes (int): The maximum total size of the pickled entries.
+        ttl (float): The maximum age of an entry in seconds, or None.
+        hits (int): The number of lookups served from memory.
+        misses (int): The number of lookups not found in memory.
+        evictions (int): The number of entries evicted to respect the limits.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024, ttl: float = None):
+        """
+        Initializes the MemoryCache class.
+
+        Args:
+            max_entries (int): The maximum number of entries held (default is 1024).
+            max_bytes (int): The maximum total size of the pickled entries (default is 64 MiB).
+            ttl (float): The maximum age of an entry in seconds (default is None, no expiry).
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (pickled value, created_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[1]):
+                self._discard(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)  # Mark as most recently used
+            self.hits += 1
+        return pickle.loads(entry[0])
+
+    def set(self, key: str, value):
+        data = pickle.dumps(value)
+        with self._lock:
+            self._discard(key)
+            if len(data) > self.max_bytes:
+                return  # Larger than the whole tier; leave it to the disk backend
+            self._entries[key] = (data, time.time())
+            self._bytes += len(data)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: str):
+        """
+        Removes an entry and its size from the totals. The caller must hold the lock.
+
+        Args:
+            key (str): The cache key.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+
+    def keys(self):
+        with self._lock:
+            return iter(list(self._entries))
+
+    def entries(self):
+        with self._lock:
+            # OrderedDict order is least to most recently used; report that as access order
+            return iter([
+                CacheEntryInfo(key=key, size=len(data), created_at=created_at, accessed_at=position)
+                for position, (key, (data, created_at)) in enumerate(self._entries.items())
+            ])
+
+    def clear(self):
+        """
+        Removes every entry, keeping the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Reports the counters needed to size the tier.
+
+        Returns:
+            dict: hits, misses, evictions, hit_ratio, entries and bytes.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CacheCompactor:
+    """
+    Keeps a cache within its policy by running `gc` and `compact` on a background thread.
+
+    Attributes:
+        backend (CacheBackend): The cache to maintain.
+        policy (CachePolicy): The limits to enforce.
+        interval (float): Seconds between runs.
+        last_result (dict): The result of the most recent `gc` run.
+    """
+
+    def __init__(self, backend: CacheBackend, policy: CachePolicy, interval: float = 300.0):
+        """
+        Initializes the CacheCompactor class.
+
+        Args:
+            backend (CacheBackend): The cache to maintain.
+            policy (CachePolicy): The limits to enforce.
+            interval (float): Seconds between runs (default is 300).
+
+        Raises:
+            ValueError: If the backend cannot enforce the policy, see `CacheBackend.check_policy`.
+        """
+        backend.check_policy(policy)
+        self.backend = backend
+        self.policy = policy
+        self.interval = interval
+        self.last_result = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self) -> dict:
+        """
+        Runs a single gc and compaction pass.
+
+        Returns:
+            dict: The result of `CacheBackend.gc`.
+        """
+        self.last_result = self.backend.gc(self.policy)
+        if self.last_result["expired"] or self.last_result["evicted"]:
+            self.backend.compact()
+        return self.last_result
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:  # Never let a failed pass kill the maintenance thread
+                print(f"Cache compaction failed: {e}")
+
+    def start(self):
+        """
+        Starts the background thread. Does nothing if it is already running.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="cache-compactor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stops the background thread and waits for it to finish.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def open_cache(location: str, ttl: float = None) -> CacheBackend:
+    """
+    Opens a cache backend from a location: a `.sqlite`/`.db` file or a pickle directory.
+
+    Args:
+        location (str): The cache file or directory.
+        ttl (float): The maximum age of an entry in seconds (default is None, no expiry).
+
+    Returns:
+        CacheBackend: The opened backend.
+    """
+    if location.endswith((".sqlite", ".db")):
+        return SQLiteCache(location, ttl=ttl)
+    return PickleDirCache(location, ttl=ttl)
+
+
+def migrate_pickle_dir(cache_dir: str, dest: CacheBackend, remove_source=False, batch_size: int = 1000) -> int:
+    """
+    Imports every response from a `<hash>.pkl` cache directory into another backend.
+
+    Corrupted or empty pickles are skipped.
+
+    Args:
+        cache_dir (str): The pickle cache directory to import.
+        dest (CacheBackend): The backend to import into.
+        remove_source (bool): Delete each .pkl file once imported (default is False).
+        batch_size (int): The number of entries written per transaction (default is 1000).
+
+    Returns:
+        int: The number of entries imported.
+    """
+    source = PickleDirCache(cache_dir)
+    imported = 0
+    batch = []
+
+    def flush():
+        dest.set_many(batch)
+        if remove_source:
+            for key, _ in batch:
+                source.delete(key)
+        batch.clear()
+
+    for key in source.keys():
+        value = source.get(key)
+        if value is None:
+            continue
+        batch.append((key, value))
+        imported += 1
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return imported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the QueryLLM response cache.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate = subparsers.add_parser("migrate", help="Import a .pkl cache directory into a SQLite cache file.")
+    migrate.add_argument("--from", dest="source", default="./cache", help="The .pkl cache directory.")
+    migrate.add_argument("--to", dest="dest", default="./cache.sqlite", help="The SQLite cache file.")
+    migrate.add_argument("--remove-source", action="store_true", help="Delete .pkl files once imported.")
+
+    gc = subparsers.add_parser("gc", help="Expire and evict cache entries to stay within limits.")
+    gc.add_argument("--cache", default="./cache", help="A .pkl cache directory or a .sqlite cache file.")
+    gc.add_argument("--max-bytes", type=int, help="Maximum total cache size in bytes.")
+    gc.add_argument("--max-entries", type=int, help="Maximum number of cached responses.")
+    gc.add_argument("--ttl", type=float, help="Maximum entry age in seconds.")
+    gc.add_argument("--eviction", choices=["lru", "lfu"], default="lru", help="Eviction order.")
+    gc.add_argument("--watch", type=float, metavar="SECONDS", help="Keep running, compacting every SECONDS.")
+
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        store = SQLiteCache(args.dest)
+        count = migrate_pickle_dir(args.source, store, remove_source=args.remove_source)
+        store.close()
+        print(f"Imported {count} cached responses from {args.source} into {args.dest}.")
+
+    elif args.command == "gc":
+        store = open_cache(args.cache)
+        policy = CachePolicy(
+            max_bytes=args.max_bytes, max_entries=args.max_entries, ttl=args.ttl, eviction=args.eviction
+        )
+        try:
+            compactor = CacheCompactor(store, policy, interval=args.watch or 0)
+        except ValueError as e:
+            store.close()
+            parser.error(str(e))
+        while True:
+            result = compactor.run_once()
+            print(
+                f"Expired {result['expired']}, evicted {result['evicted']}; "
+                f"{result['entries']} entries, {result['bytes']} bytes remain."
+            )
+            if not args.watch:
+                break
+            time.sleep(args.watch)
+        store.close()
@@ -1,6 +1,12 @@
 from docx import Document
 
+from .field_extractor import FieldExtractor, count_fields, merge_terms
+from .html_highlight import highlight_spans, write_highlighted_html
+from .metrics import MetricsSink, NullMetrics
+from .parsed_contract import ParsedContract, ParsedContractCache, document_text
+from .prompt_compactor import CompactedText, PromptCompactor
 from .query_llm import QueryLLM
+from .span_aligner import SpanAligner
 
 
 class ContractProcessor:
@@ -8,18 +14,52 @@ class ContractProcessor:
     A class for processing contract documents to extract terms and generate HTML highlights
     using an LLM (Large Language Model).
 
+    Methods that take a `document` accept either a python-docx `Document` or a
+    `ParsedContract` from `load_contract`.
+
     Attributes:
         llm (QueryLLM): An instance of the LLM interface for querying and extracting data.
+        contract_cache (ParsedContractCache): The on-disk cache of parsed contracts, or None.
+        metrics (MetricsSink): Receives the wall time of each loading, extraction and highlighting call.
+        compactor (PromptCompactor): Trims long contracts to their most relevant sections, or None.
+        align_locations (bool): Whether LLM-reported positions are corrected by searching the text.
+        field_extractor (FieldExtractor): Fills pattern-matched fields locally before asking the LLM, or None.
     """
 
-    def __init__(self, llm: QueryLLM):
+    def __init__(
+        self,
+        llm: QueryLLM,
+        contract_cache: ParsedContractCache = None,
+        metrics: MetricsSink = None,
+        compactor: PromptCompactor = None,
+        align_locations: bool = False,
+        field_extractor: FieldExtractor = None,
+    ):
         """
         Initializes the ContractProcessor class.
 
         Args:
             llm (QueryLLM): The LLM instance for querying and data extraction.
+            contract_cache (ParsedContractCache): Cache used by `load_contract` to skip reparsing
+                unchanged files (default is None, always parse).
+            metrics (MetricsSink): Where to record stage timings (default is None, discarded).
+            compactor (PromptCompactor): If set, prompts include only the sections of long
+                contracts most relevant to the requested terms, within its token budget, and
+                returned positions are mapped back to the full text (default is None, send
+                the whole contract).
+            align_locations (bool): If True, the positions of extracted locations are found by
+                searching the contract text for each value with a `SpanAligner`, rather than
+                trusting the positions the LLM reports (default is False).
+            field_extractor (FieldExtractor): If set, fields its patterns settle confidently are
+                filled locally and only the rest are sent to the LLM; if none remain, the LLM
+                is not called (default is None, the LLM extracts every field).
         """
         self.llm = llm
+        self.contract_cache = contract_cache
+        self.metrics = metrics or NullMetrics()
+        self.compactor = compactor
+        self.align_locations = align_locations
+        self.field_extractor = field_extractor
 
     def load_document(self, filepath: str) -> Document:
         """
@@ -31,23 +71,127 @@ class ContractProcessor:
         Returns:
             Document: A `Document` object representing the loaded .docx file.
         """
-        return Document(filepath)
+        with self.metrics.timer("load_document"):
+            return Document(filepath)
+
+    def load_contract(self, filepath: str) -> ParsedContract:
+        """
+        Loads a .docx contract as flattened text with paragraph offsets and a content hash.
+
+        If a `contract_cache` is configured, unchanged files are served from it without
+        parsing the .docx.
+
+        Args:
+            filepath (str): The path to the document file.
+
+        Returns:
+            ParsedContract: The parsed contract.
+        """
+        with self.metrics.timer("load_contract"):
+            if self.contract_cache is not None:
+                return self.contract_cache.load(filepath)
+            return ParsedContract.from_file(filepath)
+
+    def _compact(self, document: Document, schema) -> CompactedText:
+        """
+        Selects the contract text to send for a schema, using `compactor` if configured.
+
+        Args:
+            document (Document | ParsedContract): The contract.
+            schema (dict | list): The terms, fields or combined schemas being requested.
+
+        Returns:
+            CompactedText: The text to send and its mapping back to the full contract.
+        """
+        text = document_text(document)
+        if self.compactor is None:
+            return CompactedText.identity(text)
+        compacted = self.compactor.compact(text, schema)
+        if compacted.compacted:
+            self.metrics.count("prompt_chars_omitted", len(text) - len(compacted.text))
+        return compacted
 
     def extract_terms(self, document: Document, terms: dict) -> dict:
         """
         Extracts contract terms from a document using the LLM.
 
         Args:
-            document (Document): A `Document` object representing the contract.
+            document (Document | ParsedContract): The contract.
+            terms (dict): A dictionary specifying the format of terms to extract.
+
+        Returns:
+            dict: The extracted terms in JSON format.
+        """
+        # Fill pattern-matched fields locally, and ask the LLM only for the rest
+        filled, terms = self._fill_locally(document, terms)
+        if not terms:
+            return filled
+
+        # Query the LLM; term dictionaries with positions are mapped back to the full contract
+        compacted = self._compact(document, terms)
+        with self.metrics.timer("extract_terms"):
+            response = self.llm.query_llm(self._terms_messages(document, terms, compacted))
+        response = compacted.remap_locations(response)
+        return merge_terms(response, filled) if filled else response
+
+    async def aextract_terms(self, document: Document, terms: dict) -> dict:
+        """
+        Asynchronously extracts contract terms from a document.
+
+        Requires `llm` to be an `AsyncQueryLLM`.
+
+        Args:
+            document (Document | ParsedContract): The contract.
             terms (dict): A dictionary specifying the format of terms to extract.
 
         Returns:
             dict: The extracted terms in JSON format.
         """
-        # Combine all paragraphs into a single string
-        text = "\n".join([p.text for p in document.paragraphs])
+        filled, terms = self._fill_locally(document, terms)
+        if not terms:
+            return filled
+
+        compacted = self._compact(document, terms)
+        with self.metrics.timer("extract_terms"):
+            response = await self.llm.aquery_llm(self._terms_messages(document, terms, compacted))
+        response = compacted.remap_locations(response)
+        return merge_terms(response, filled) if filled else response
+
+    def _fill_locally(self, document: Document, terms: dict) -> tuple:
+        """
+        Fills the fields of a term dictionary that `field_extractor` settles confidently.
+
+        Args:
+            document (Document | ParsedContract): The contract.
+            terms (dict): A dictionary specifying the format of terms to extract.
+
+        Returns:
+            tuple: (filled, remaining) as returned by `FieldExtractor.fill`; nothing is filled
+                if no extractor is configured.
+        """
+        if self.field_extractor is None:
+            return {}, terms
+        with self.metrics.timer("extract_terms_local"):
+            filled, remaining = self.field_extractor.fill(document, terms)
+        self.metrics.count("fields_extracted_locally", count_fields(filled))
+        self.metrics.count("fields_sent_to_llm", count_fields(remaining))
+        return filled, remaining
+
+    def _terms_messages(self, document: Document, terms: dict, compacted: CompactedText = None) -> list:
+        """
+        Builds the messages for a structured term extraction query.
+
+        Args:
+            document (Document | ParsedContract): The contract.
+            terms (dict): A dictionary specifying the format of terms to extract.
+            compacted (CompactedText): The contract text to send (default is None, from `_compact`).
+
+        Returns:
+            list: The messages to send to the LLM.
+        """
+        text = (compacted or self._compact(document, terms)).text
 
-        messages = [
+        return [
             {
                 "role": "system",
                 "content": (
@@ -61,25 +205,56 @@ class ContractProcessor:
             },
         ]
 
-        # Query the LLM
-        response = self.llm.query_llm(messages)
-        return response
-
     def extract_terms_with_locations(self, document: Document, fields: list) -> dict:
         """
         Extracts specific fields along with their locations in the document.
 
         Args:
-            document (Document): A `Document` object representing the contract.
+            document (Document | ParsedContract): The contract.
             fields (list): A list of fields to extract with their start and end positions.
 
         Returns:
             dict: The extracted fields with their values and locations in JSON format.
         """
-        # Combine all paragraphs into a single string
-        text = "\n".join([p.text for p in document.paragraphs])
+        # Query the LLM on the compacted text, then map positions back to the full contract
+        compacted = self._compact(document, fields)
+        with self.metrics.timer("extract_terms_with_locations"):
+            response = self.llm.query_llm(self._locations_messages(document, fields, compacted))
+        return self._align(document, compacted.remap_locations(response))
+
+    async def aextract_terms_with_locations(self, document: Document, fields: list) -> dict:
+        """
+        Asynchronously extracts specific fields along with their locations in the document.
+
+        Requires `llm` to be an `AsyncQueryLLM`.
+
+        Args:
+            document (Document | ParsedContract): The contract.
+            fields (list): A list of fields to extract with their start and end positions.
+
+        Returns:
+            dict: The extracted fields with their values and locations in JSON format.
+        """
+        compacted = self._compact(document, fields)
+        with self.metrics.timer("extract_terms_with_locations"):
+            response = await self.llm.aquery_llm(self._locations_messages(document, fields, compacted))
+        return self._align(document, compacted.remap_locations(response))
+
+    def _locations_messages(self, document: Document, fields: list, compacted: CompactedText = None) -> list:
+        """
+        Builds the messages for a field extraction query that includes locations.
+
+        Args:
+            document (Document | ParsedContract): The contract.
+            fields (list): A list of fields to extract with their start and end positions.
+            compacted (CompactedText): The contract text to send (default is None, from `_compact`).
+
+        Returns:
+            list: The messages to send to the LLM.
+        """
+        text = (compacted or self._compact(document, fields)).text
 
-        messages = [
+        return [
             {
                 "role": "system",
                 "content": (
@@ -98,41 +273,228 @@ class ContractProcessor:
             },
         ]
 
-        # Query the LLM
-        response = self.llm.query_llm(messages)
-        return response
+    def _align(self, document: Document, locations: dict) -> dict:
+        """
+        Corrects location positions against the contract text if `align_locations` is set.
+
+        Args:
+            document (Document | ParsedContract): The contract.
+            locations (dict): Extracted fields with their values and positions.
+
+        Returns:
+            dict: The locations, aligned if enabled.
+        """
+        if not self.align_locations or not isinstance(locations, dict):
+            return locations
+        return SpanAligner(document_text(document)).align_locations(locations)
+
+    def _align_sections(self, document: Document, results: dict) -> dict:
+        """
+        Aligns every section of a combined extraction that holds field locations.
+
+        Args:
+            document (Document | ParsedContract): The contract.
+            results (dict): A mapping of section name to extracted terms.
+
+        Returns:
+            dict: The results with location sections aligned if enabled.
+        """
+        if not self.align_locations:
+            return results
+        aligner = SpanAligner(document_text(document))
+        return {
+            name: aligner.align_locations(section) if self._is_locations(section) else section
+            for name, section in results.items()
+        }
+
+    @staticmethod
+    def _is_locations(section: dict) -> bool:
+        return bool(section) and all(
+            isinstance(value, dict) and "start_position" in value for value in section.values()
+        )
+
+    def locate_values(self, document: Document, values: dict) -> dict:
+        """
+        Finds extracted values in the contract without asking the LLM for positions.
+
+        Args:
+            document (Document | ParsedContract): The contract.
+            values (dict): {field: value}, e.g. {"contract_number": "12345"}.
+
+        Returns:
+            dict: Field locations in the format of `extract_terms_with_locations`, ready for
+                `generate_html_highlight`. Values not found have empty positions.
+        """
+        return SpanAligner(document_text(document)).locate(values)
+
+    @staticmethod
+    def location_terms(fields: list) -> dict:
+        """
+        Builds a term dictionary asking for each field's value and location.
+
+        This lets location extraction share a combined query with other term dictionaries.
+
+        Args:
+            fields (list): The fields to extract with their start and end positions.
+
+        Returns:
+            dict: A term dictionary in the format returned by `extract_terms_with_locations`.
+        """
+        return {field: {"value": "", "start_position": "", "end_position": ""} for field in fields}
+
+    def extract_terms_combined(self, document: Document, schemas: dict) -> dict:
+        """
+        Extracts several term dictionaries from a document with a single LLM query.
+
+        The schemas are combined into one composite format so the document is sent once,
+        and the response is split back into one dict per schema. Any section missing
+        from the combined response is re-requested on its own.
+
+        Args:
+            document (Document | ParsedContract): The contract.
+            schemas (dict): A mapping of section name to the term dictionary to extract,
+                e.g. {"questions": structured_outputs.example_questions, "terms": ...}.
+
+        Returns:
+            dict: A mapping of section name to the extracted terms for that schema.
+        """
+        filled, schemas = self._fill_combined(document, schemas)
+        if not schemas:
+            return self._align_sections(document, filled)
+
+        compacted = self._compact(document, schemas)
+        with self.metrics.timer("extract_terms_combined"):
+            response = self.llm.query_llm(self._combined_messages(document, schemas, compacted))
+        results = self._split_combined(response, schemas, compacted)
+        for name, terms in schemas.items():
+            if not results[name]:
+                results[name] = self.extract_terms(document, terms)
+        return self._align_sections(document, self._merge_combined(results, filled))
+
+    async def aextract_terms_combined(self, document: Document, schemas: dict) -> dict:
+        """
+        Asynchronously extracts several term dictionaries with a single LLM query.
+
+        Requires `llm` to be an `AsyncQueryLLM`.
+
+        Args:
+            document (Document | ParsedContract): The contract.
+            schemas (dict): A mapping of section name to the term dictionary to extract.
+
+        Returns:
+            dict: A mapping of section name to the extracted terms for that schema.
+        """
+        filled, schemas = self._fill_combined(document, schemas)
+        if not schemas:
+            return self._align_sections(document, filled)
+
+        compacted = self._compact(document, schemas)
+        with self.metrics.timer("extract_terms_combined"):
+            response = await self.llm.aquery_llm(self._combined_messages(document, schemas, compacted))
+        results = self._split_combined(response, schemas, compacted)
+        for name, terms in schemas.items():
+            if not results[name]:
+                results[name] = await self.aextract_terms(document, terms)
+        return self._align_sections(document, self._merge_combined(results, filled))
+
+    def _fill_combined(self, document: Document, schemas: dict) -> tuple:
+        """
+        Fills each schema of a combined extraction locally where `field_extractor` can.
+
+        Args:
+            document (Document | ParsedContract): The contract.
+            schemas (dict): A mapping of section name to the term dictionary to extract.
+
+        Returns:
+            tuple: (filled, remaining), both keyed by section name. Every section appears in
+                `filled`, and only sections with fields left for the LLM in `remaining`.
+        """
+        filled, remaining = {}, {}
+        for name, terms in schemas.items():
+            filled[name], section_remaining = self._fill_locally(document, terms)
+            if section_remaining:
+                remaining[name] = section_remaining
+        return filled, remaining
+
+    @staticmethod
+    def _merge_combined(results: dict, filled: dict) -> dict:
+        """
+        Merges locally filled fields into the split sections of a combined response.
+        """
+        return {
+            name: merge_terms(results[name], section) if name in results else section
+            for name, section in filled.items()
+        }
+
+    @staticmethod
+    def _split_combined(response: dict, schemas: dict, compacted: CompactedText = None) -> dict:
+        """
+        Splits a combined response into one dict per schema.
+
+        Args:
+            response (dict): The combined LLM response.
+            schemas (dict): The schemas that were requested, keyed by section name.
+            compacted (CompactedText): The text the response refers to, used to map any
+                positions back to the full contract (default is None, the full contract).
+
+        Returns:
+            dict: A mapping of section name to its extracted terms (empty if missing).
+        """
+        results = {}
+        for name in schemas:
+            section = response.get(name) if isinstance(response, dict) else None
+            section = section if isinstance(section, dict) else {}
+            results[name] = compacted.remap_locations(section) if compacted is not None else section
+        return results
+
+    def _combined_messages(self, document: Document, schemas: dict, compacted: CompactedText = None) -> list:
+        """
+        Builds the messages for a combined extraction query over several schemas.
+
+        Args:
+            document (Document | ParsedContract): The contract.
+            schemas (dict): A mapping of section name to the term dictionary to extract.
+            compacted (CompactedText): The contract text to send (default is None, from `_compact`).
+
+        Returns:
+            list: The messages to send to the LLM.
+        """
+        text = (compacted or self._compact(document, schemas)).text
+
+        return [
+            {
+                "role": "system",
+                "content": (
+                    f"You are an AI assistant tasked with extracting structured information from documents. "
+                    f"Output a single JSON object with one top-level key per section, each section following "
+                    f"its own format: {schemas}. Where a field has a 'value', 'start_position' and "
+                    f"'end_position', give the character positions of the value in the document. "
+                    f"If a value is missing, leave it empty."
+                ),
+            },
+            {
+                "role": "user",
+                "content": f"Extract the key details from the following document:\n\n{text}",
+            },
+        ]
 
     def generate_html_highlight(self, document: Document, annotations: dict, output_path: str):
         """
         Generates an HTML file with highlighted terms from the document.
 
+        Overlapping or nested annotations are merged into one highlight, the contract text
+        is HTML-escaped, and the output is streamed to the file in one pass.
+
         Args:
-            document (Document): A `Document` object representing the contract.
+            document (Document | ParsedContract): The contract.
             annotations (dict): A dictionary of extracted fields with start and end positions.
             output_path (str): The file path to save the generated HTML file.
         """
-        # Combine all paragraphs into a single string
-        text = "\n".join([p.text for p in document.paragraphs])
-
-        # Sort extracted fields by their start positions
-        sorted_fields = sorted(
-            annotations.values(),
-            key=lambda x: int(x['start_position']) if x['start_position'] else float('inf'),
-        )
+        with self.metrics.timer("generate_html_highlight"):
+            # Combine all paragraphs into a single string
+            text = document_text(document)
+            spans = highlight_spans(annotations, len(text))
 
-        # Highlight extracted fields in the text
-        offset = 0
-        for field in sorted_fields:
-            if field['value']:  # Only highlight fields with valid values
-                start = int(field['start_position']) + offset
-                end = int(field['end_position']) + offset
-                text = (
-                    text[:start]
-                    + f'<span style="background-color: yellow;">{text[start:end]}</span>'
-                    + text[end:]
-                )
-                offset += len('<span style="background-color: yellow;"></span>')
-
-        # Save the highlighted text as an HTML file
-        with open(output_path, "w") as file:
-            file.write(f"<html><body><pre>{text}</pre></body></html>")
+            # Save the highlighted text as an HTML file
+            with open(output_path, "w", encoding="utf-8") as file:
+                write_highlighted_html(text, spans, file)
@@ -0,0 +1,328 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+
+from .batch_pipeline import BatchProcessor, ContractResult
+from .metrics import MetricsSink, NullMetrics
+
+MANIFEST_VERSION = 1
+
+
+def erp_row_digest(rows: pd.DataFrame) -> str:
+    """
+    Hashes the ERP rows of one contract, independent of row order.
+
+    Args:
+        rows (pandas.DataFrame): The rows returned by `DataBase.lookup_contracts`.
+
+    Returns:
+        str: A SHA256 hex digest of the column names and row contents.
+    """
+    digest = hashlib.sha256(",".join(map(str, rows.columns)).encode())
+    if len(rows):
+        digest.update(np.sort(pd.util.hash_pandas_object(rows, index=False).to_numpy()).tobytes())
+    return digest.hexdigest()
+
+
+class WatchManifest:
+    """
+    The watcher's record of every contract it has processed and the ERP sources it last saw,
+    saved as JSON so a restarted watcher resumes without reprocessing anything.
+
+    Attributes:
+        path (str): The manifest file.
+        contracts (dict): Per contract path, its "content_hash", "mtime", "size", the
+            "erp_digest" of its ERP rows, its last "result" (a `ContractResult` as a dict)
+            and when that result was produced ("processed_at").
+        erp_sources (dict): The `DataBase.source_state` when the ERP data was last checked.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initializes the WatchManifest class, loading the manifest if it exists.
+
+        Args:
+            path (str): The manifest file.
+        """
+        self.path = path
+        self.contracts = {}
+        self.erp_sources = {}
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.contracts = data["contracts"]
+            self.erp_sources = data["erp_sources"]
+
+    def save(self):
+        """
+        Atomically writes the manifest.
+        """
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            json.dump(
+                {"version": MANIFEST_VERSION, "erp_sources": self.erp_sources, "contracts": self.contracts},
+                file, default=str,
+            )
+        os.replace(tmp_path, self.path)
+
+
+@dataclass
+class WatchReport:
+    """
+    What one scan of the watch folder and ERP sources did.
+
+    Attributes:
+        extracted (list): Results for new or edited contracts, run through the whole pipeline.
+        reevaluated (list): Results for contracts whose ERP rows changed, re-checked with their
+            earlier extracted terms.
+        removed (list): Paths of contracts no longer in the folder.
+        unchanged (int): The number of contracts left as they were.
+        erp_changed (bool): Whether the ERP source files changed since the last scan.
+        wall_time (float): The scan's wall time in seconds.
+    """
+    extracted: List[ContractResult] = field(default_factory=list)
+    reevaluated: List[ContractResult] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    erp_changed: bool = False
+    wall_time: float = 0.0
+
+
+class ContractWatcher:
+    """
+    Polls a folder of contracts and the ERP sources, reprocessing only what changed.
+
+    A manifest keeps each contract's content hash, last result and a digest of its ERP rows.
+    On each scan:
+    - New or edited contracts go through the whole pipeline. Contracts that failed are
+      retried when they are edited, or otherwise at most once every `retry_interval` seconds.
+    - If the ERP files changed, the ERP rows of the other contracts are fetched in one query
+      and only contracts whose row digest changed are re-checked, reusing their extracted
+      terms (searchdb -> get_comparisons -> detect_breach, no LLM extraction).
+    - Removed contracts are dropped from the manifest.
+
+    Files are compared by mtime and size first, and hashed only if those differ, so a scan
+    with nothing to do costs a directory listing and a stat per file. A scan that fails
+    leaves the ERP sources unrecorded, so the next scan checks them again.
+
+    Attributes:
+        batch (BatchProcessor): Runs the pipeline over changed contracts.
+        watch_dir (str): The folder of .docx contracts to watch.
+        manifest (WatchManifest): The record of processed contracts.
+        poll_interval (float): Seconds between scans in `run`.
+        retry_interval (float): Seconds before an unchanged contract that failed is retried.
+        metrics (MetricsSink): Receives scan timings, per-outcome contract counts and failed scans.
+    """
+
+    def __init__(
+        self,
+        batch: BatchProcessor,
+        watch_dir: str,
+        manifest_path: str = "./cache/watch_manifest.json",
+        poll_interval: float = 5.0,
+        retry_interval: float = 300.0,
+        metrics: MetricsSink = None,
+    ):
+        """
+        Initializes the ContractWatcher class.
+
+        Args:
+            batch (BatchProcessor): Runs the pipeline; its `db` is checked for ERP changes.
+            watch_dir (str): The folder of .docx contracts to watch.
+            manifest_path (str): Where to keep the manifest (default is "./cache/watch_manifest.json").
+            poll_interval (float): Seconds between scans in `run` (default is 5.0).
+            retry_interval (float): Seconds before an unchanged contract that failed is
+                retried (default is 300.0).
+            metrics (MetricsSink): Where to record scan metrics (default is None, discarded).
+        """
+        self.batch = batch
+        self.watch_dir = watch_dir
+        self.manifest = WatchManifest(manifest_path)
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+        self.metrics = metrics or NullMetrics()
+
+    @staticmethod
+    def _file_sha256(path: str) -> str:
+        with open(path, "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest()
+
+    def _changed_state(self, path: str):
+        """
+        Checks a contract against the manifest.
+
+        Args:
+            path (str): The path to the .docx contract.
+
+        Returns:
+            dict: The file's new {"content_hash", "mtime", "size"} if it needs processing,
+                otherwise None.
+        """
+        entry = self.manifest.contracts.get(path)
+        stat = os.stat(path)
+        retry = entry is None or (
+            entry["result"].get("error") is not None
+            and time.time() - entry.get("processed_at", 0) >= self.retry_interval
+        )
+        if not retry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            return None
+
+        content_hash = self._file_sha256(path)
+        if not retry and entry["content_hash"] == content_hash:
+            # Touched but not modified; remember the new mtime so it is not rehashed next time
+            entry.update(mtime=stat.st_mtime, size=stat.st_size)
+            return None
+        return {"content_hash": content_hash, "mtime": stat.st_mtime, "size": stat.st_size}
+
+    def _erp_changed(self):
+        """
+        Checks whether the ERP source files changed, re-ingesting a persistent database if so.
+
+        Returns:
+            dict: The new `DataBase.source_state` if the sources differ from the last scan,
+                otherwise None. It is recorded in the manifest only once the scan succeeds.
+        """
+        db = self.batch.db
+        state = db.source_state()
+        if state == self.manifest.erp_sources:
+            return None
+        if db.db_path is not None:
+            db.ingest()
+        return state
+
+    @staticmethod
+    def _contract_number(result: dict):
+        number = result.get("contract_terms", {}).get("info", {}).get("contract_number")
+        return None if number in (None, "") else str(number)
+
+    def scan(self) -> WatchReport:
+        """
+        Processes whatever changed since the last scan and saves the manifest.
+
+        Returns:
+            WatchReport: What the scan did.
+        """
+        start = time.perf_counter()
+        report = WatchReport()
+        contracts = self.manifest.contracts
+        paths = BatchProcessor.collect_contracts(self.watch_dir)
+
+        present = set(paths)
+        report.removed = [path for path in contracts if path not in present]
+        for path in report.removed:
+            del contracts[path]
+
+        changed = {}
+        for path in paths:
+            state = self._changed_state(path)
+            if state is not None:
+                changed[path] = state
+        erp_state = self._erp_changed()
+        report.erp_changed = erp_state is not None
+
+        # New and edited contracts run through the whole pipeline
+        if changed:
+            report.extracted = self.batch.process(list(changed)).results
+            for path, result in zip(changed, report.extracted):
+                contracts[path] = {
+                    **changed[path], "erp_digest": None, "result": asdict(result), "processed_at": time.time(),
+                }
+
+        # Fetch the ERP rows of new contracts (and of any whose rows a failed scan left
+        # unfetched), and of every other contract if the ERP data changed
+        candidates = [
+            path for path, entry in contracts.items()
+            if (report.erp_changed or entry["erp_digest"] is None)
+            and entry["result"].get("error") is None
+            and self._contract_number(entry["result"]) is not None
+        ]
+        if candidates:
+            numbers = [self._contract_number(contracts[path]["result"]) for path in candidates]
+            rows = self.batch.db.lookup_contracts(numbers, result_format="pandas")
+
+            digests = {path: erp_row_digest(rows[number]) for path, number in zip(candidates, numbers)}
+            affected = [
+                path for path in candidates
+                if path not in changed and contracts[path]["erp_digest"] != digests[path]
+            ]
+
+            # Re-check only the contracts whose ERP rows changed, reusing their extracted terms
+            if affected:
+                previous = [ContractResult(**contracts[path]["result"]) for path in affected]
+                report.reevaluated = self.batch.reevaluate(previous).results
+                for path, result in zip(affected, report.reevaluated):
+                    contracts[path].update(result=asdict(result), processed_at=time.time())
+
+            # Recorded only now, so a failed re-check leaves the digests stale and is repeated
+            for path, digest in digests.items():
+                contracts[path]["erp_digest"] = digest
+
+        if erp_state is not None:
+            self.manifest.erp_sources = erp_state
+        report.unchanged = len(paths) - len(report.extracted) - len(report.reevaluated)
+        self.manifest.save()
+        report.wall_time = time.perf_counter() - start
+
+        self.metrics.timing("watch_scan", report.wall_time)
+        for status, count in [
+            ("extracted", len(report.extracted)), ("reevaluated", len(report.reevaluated)),
+            ("removed", len(report.removed)), ("unchanged", report.unchanged),
+        ]:
+            self.metrics.count("watched_contracts", count, status=status)
+        return report
+
+    def results(self) -> List[ContractResult]:
+        """
+        Returns the latest result of every contract in the manifest.
+
+        Returns:
+            list: The results, ordered by contract path.
+        """
+        return [ContractResult(**self.manifest.contracts[path]["result"]) for path in sorted(self.manifest.contracts)]
+
+    def run(
+        self,
+        iterations: int = None,
+        on_scan: Callable[[WatchReport], None] = None,
+        on_error: Callable[[Exception], None] = None,
+    ):
+        """
+        Scans every `poll_interval` seconds until stopped.
+
+        A scan that raises, e.g. because an ERP file is being replaced or the database is
+        unavailable, is reported and retried at the next poll instead of ending the loop.
+
+        Args:
+            iterations (int): The number of scans to run (default is None, run until interrupted).
+            on_scan (callable): Called with each WatchReport, e.g. to print changes (default is None).
+            on_error (callable): Called with the exception of a failed scan (default is None,
+                the error is printed).
+        """
+        count = 0
+        while iterations is None or count < iterations:
+            try:
+                report = self.scan()
+            except Exception as e:  # Never let a failed scan stop the watcher
+                self.metrics.count("watch_scan_errors")
+                if on_error is not None:
+                    on_error(e)
+                else:
+                    print(f"Watch scan failed: {type(e).__name__}: {e}")
+            else:
+                if on_scan is not None:
+                    on_scan(report)
+            count += 1
+            if iterations is None or count < iterations:
+                time.sleep(self.poll_interval)
@@ -1,3 +1,5 @@
+import argparse
+import os
 import random
 from datetime import timedelta, datetime
 from dataclasses import dataclass, field, asdict
@@ -5,6 +7,7 @@ from typing import List
 import json
 
 import factory
+from docx import Document
 from faker import Faker
 
 fake = Faker()
@@ -142,30 +145,234 @@ class DeliveryFactory(factory.Factory):
             self.items = ItemFactory.create_batch(random.randint(1, 5))
 
 
-# Generate data and save to JSON files
-if __name__ == "__main__":
-    deliveries = DeliveryFactory.create_batch(100)
+class RecordWriter:
+    """
+    Streams records to a file one at a time, as a JSON array or as newline-delimited
+    JSON (for .ndjson/.jsonl paths), so output size is not limited by memory.
+    """
 
-    # Convert deliveries to dicts for JSON serialization
-    deliveries_data = []
-    items_data = []
+    def __init__(self, path: str):
+        self.path = path
+        self.ndjson = os.path.splitext(path)[1].lower() in (".ndjson", ".jsonl")
+        self.count = 0
+        self.file = open(path, "w")
+        if not self.ndjson:
+            self.file.write("[")
 
-    for delivery in deliveries:
+    def write(self, record: dict):
+        if self.ndjson:
+            self.file.write(json.dumps(record) + "\n")
+        else:
+            # Match json.dump(..., indent=4) for a list of records
+            separator = ",\n" if self.count else "\n"
+            self.file.write(separator + "    " + json.dumps(record, indent=4).replace("\n", "\n    "))
+        self.count += 1
+
+    def close(self):
+        if not self.ndjson:
+            self.file.write("\n]" if self.count else "]")
+        self.file.close()
+
+
+# Contract numbers for the generated corpus start above ItemFactory's six-digit range, so they are unique
+CORPUS_CONTRACT_OFFSET = 2_000_000
+
+# How each ERP unit of measure is written in a contract
+UNIT_WORDS = {"EA": "units", "KG": "kg", "L": "litres", "M": "metres", "Reel": "reels", "Box": "boxes", "Ton": "tons"}
+
+CONTRACT_BREACH_FIELDS = ["delivery_date", "quantity", "weight", "pallet_dimensions"]
+
+
+def contract_terms(delivery: dict, item: dict, breach_field: str = None, rng: random.Random = random) -> dict:
+    """
+    Builds contract terms that the delivered item satisfies, or breaches in one field.
+
+    The contract is due on or after the delivery, asks for no more than the delivered
+    quantity and weight, and states the delivered pallet dimensions. A breached field is
+    made late, larger than delivered, or a different pallet size.
+    """
+    delivered_date = datetime.strptime(delivery["delivery_date"], "%Y-%m-%d")
+    due_date = delivered_date + timedelta(days=rng.randint(0, 14))
+    quantity = item["quantity"] - rng.randint(0, min(2, item["quantity"] - 1))
+    weight = round(item["weight"] * rng.uniform(0.9, 1.0), 2)
+    pallet = item["pallet_dimensions"]
+
+    if breach_field == "delivery_date":
+        due_date = delivered_date - timedelta(days=rng.randint(1, 30))
+    elif breach_field == "quantity":
+        quantity = item["quantity"] + rng.randint(1, 100)
+    elif breach_field == "weight":
+        weight = round(item["weight"] * rng.uniform(1.1, 2.0), 2)
+    elif breach_field == "pallet_dimensions":
+        dims = [int(dim.strip().rstrip("m")) for dim in pallet.split("x")]
+        dims[rng.randint(0, 2)] += 100
+        pallet = " x ".join(f"{dim}mm" for dim in dims)
+
+    return {
+        "contract_number": item["contract_number"],
+        "supplier_name": delivery["supplier"],
+        "description": item["description"],
+        "delivery_date": due_date.strftime("%Y-%m-%d"),
+        "quantity": f"{quantity} {UNIT_WORDS.get(item['base_unit_of_measure'], item['base_unit_of_measure'])}",
+        "weight": f"{weight} kg",
+        "pallet_dimensions": pallet,
+    }
+
+
+def write_contract_docx(path: str, terms: dict, buyer: str):
+    """
+    Writes a supply contract stating the given terms as a .docx file.
+    """
+    delivery_date = datetime.strptime(terms["delivery_date"], "%Y-%m-%d").strftime("%d %B %Y")
+    doc = Document()
+    doc.add_heading("SUPPLY AGREEMENT", level=1)
+    doc.add_paragraph(f"Contract Number: {terms['contract_number']}")
+    doc.add_paragraph(
+        f"This Supply Agreement is entered into between {buyer} (the \"Buyer\") and "
+        f"{terms['supplier_name']} (the \"Supplier\")."
+    )
+    doc.add_paragraph(
+        f"1. Goods. The Supplier shall supply {terms['quantity']} of {terms['description']} to the Buyer."
+    )
+    doc.add_paragraph(f"2. Delivery. The goods shall be delivered no later than {delivery_date}.")
+    doc.add_paragraph(f"3. Weight. The total net weight of the goods shall be not less than {terms['weight']}.")
+    doc.add_paragraph(
+        f"4. Packaging. The goods shall be delivered on pallets measuring {terms['pallet_dimensions']}."
+    )
+    doc.add_paragraph(
+        "5. Late Delivery. For each week of delay the Supplier shall pay the Buyer liquidated damages "
+        "of 2% of the contract value, up to a maximum of 10%."
+    )
+    doc.add_paragraph("6. Governing Law. This Agreement is governed by the laws of England and Wales.")
+    doc.save(path)
+
+
+class ContractCorpusWriter:
+    """
+    Writes a .docx contract for each of the first `limit` generated items, matching the
+    item's delivery or deliberately breaching one field, plus a labels.json of ground truth.
+
+    Labels map each file name to its contract number, whether and which field is breached,
+    the contracted terms and the delivered values.
+    """
+
+    def __init__(self, output_dir: str, limit: int, breach_fraction: float = 0.3, seed: int = None):
+        self.output_dir = output_dir
+        self.limit = limit
+        self.breach_fraction = breach_fraction
+        self.rng = random.Random(seed)
+        self.buyer = Faker()
+        self.buyer.seed_instance(seed)
+        self.labels = {}
+        os.makedirs(output_dir, exist_ok=True)
+
+    def add(self, delivery: dict, item: dict):
+        """
+        Writes a contract for an item about to be saved, giving it a unique contract number.
+        """
+        if len(self.labels) >= self.limit:
+            return
+        item["contract_number"] = CORPUS_CONTRACT_OFFSET + item["item_id"]
+        breach_field = None
+        if self.rng.random() < self.breach_fraction:
+            breach_field = self.rng.choice(CONTRACT_BREACH_FIELDS)
+
+        terms = contract_terms(delivery, item, breach_field, rng=self.rng)
+        filename = f"Contract_{item['contract_number']}.docx"
+        write_contract_docx(os.path.join(self.output_dir, filename), terms, self.buyer.company())
+        self.labels[filename] = {
+            "contract_number": item["contract_number"],
+            "breached": breach_field is not None,
+            "breach_field": breach_field,
+            "terms": terms,
+            "delivered": {
+                "delivery_date": delivery["delivery_date"],
+                "quantity": item["quantity"],
+                "base_unit_of_measure": item["base_unit_of_measure"],
+                "weight": item["weight"],
+                "pallet_dimensions": item["pallet_dimensions"],
+            },
+        }
+
+    def close(self):
+        with open(os.path.join(self.output_dir, "labels.json"), "w") as f:
+            json.dump(self.labels, f, indent=4)
+
+
+class ERPWriter:
+    """
+    Streams deliveries to a deliveries file and their items to an items file, tracking
+    the highest ids written so hand-made datasets can be appended after generated ones.
+    If a ContractCorpusWriter is given, every item is offered to it before being saved.
+    """
+
+    def __init__(self, deliveries_path: str, items_path: str, corpus: ContractCorpusWriter = None):
+        self.deliveries = RecordWriter(deliveries_path)
+        self.items = RecordWriter(items_path)
+        self.corpus = corpus
+        self.max_delivery_id = 0
+        self.max_item_id = 0
+
+    def write_delivery(self, delivery: Delivery):
         delivery_dict = asdict(delivery)
         delivery_dict.pop("items")  # Remove items to store separately
-        deliveries_data.append(delivery_dict)
+        self.deliveries.write(delivery_dict)
+        self.max_delivery_id = max(self.max_delivery_id, delivery.delivery_id)
 
         for item in delivery.items:
             item_dict = asdict(item)
             # Link item to delivery
             item_dict["delivery_id"] = delivery.delivery_id
-            items_data.append(item_dict)
+            if self.corpus is not None:
+                self.corpus.add(delivery_dict, item_dict)
+            self.items.write(item_dict)
+            self.max_item_id = max(self.max_item_id, item.item_id)
+
+    def close(self):
+        self.deliveries.close()
+        self.items.close()
+        if self.corpus is not None:
+            self.corpus.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Generate data and save to JSON files
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic ERP deliveries and items.")
+    parser.add_argument("--deliveries", type=int, default=100, help="Number of random deliveries to generate.")
+    parser.add_argument("--format", choices=["json", "ndjson"], default="json", help="Output file format.")
+    parser.add_argument("--output-dir", default="db", help="Directory to write the deliveries and items files to.")
+    parser.add_argument("--contracts", type=int, default=0, help="Number of labelled .docx contracts to generate.")
+    parser.add_argument("--contracts-dir", default="contracts/generated", help="Directory for generated contracts.")
+    parser.add_argument("--breach-fraction", type=float, default=0.3, help="Fraction of generated contracts breached.")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible output.")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+        Faker.seed(args.seed)
+
+    deliveries_path = os.path.join(args.output_dir, f"deliveries.{args.format}")
+    items_path = os.path.join(args.output_dir, f"items.{args.format}")
+    corpus = None
+    if args.contracts:
+        corpus = ContractCorpusWriter(args.contracts_dir, args.contracts, args.breach_fraction, seed=args.seed)
+    writer = ERPWriter(deliveries_path, items_path, corpus=corpus)
+
+    # Stream random deliveries to disk one at a time rather than building them all in memory
+    for _ in range(args.deliveries):
+        writer.write_delivery(DeliveryFactory())
 
     # Create specific datasets
 
     # Data Set 1
     delivery1 = Delivery(
-        delivery_id=max(d.delivery_id for d in deliveries) + 1,
+        delivery_id=writer.max_delivery_id + 1,
         delivery_date="2023-12-16",
         supplier="Slovenia Copper",
         carrier=fake.company(),
@@ -175,7 +382,7 @@ if __name__ == "__main__":
     )
 
     item1 = Item(
-        item_id=max(i["item_id"] for i in items_data) + 1,
+        item_id=writer.max_item_id + 1,
         material_number="MAT-00000001",
         material_type="Raw Material",
         description="copper cable",
@@ -295,25 +502,13 @@ if __name__ == "__main__":
     item3.delivery_id = delivery3.delivery_id
     delivery3.items.append(item3)
 
-    # Append the new deliveries and items to the data lists
-    deliveries.extend([delivery1, delivery2, delivery3])
-
+    # Append the new deliveries and items to the output files
     for delivery in [delivery1, delivery2, delivery3]:
-        delivery_dict = asdict(delivery)
-        delivery_dict.pop("items")  # Remove items to store separately
-        deliveries_data.append(delivery_dict)
-
-        for item in delivery.items:
-            item_dict = asdict(item)
-            # Link item to delivery
-            item_dict["delivery_id"] = delivery.delivery_id
-            items_data.append(item_dict)
-
-    # Save deliveries and items to JSON files
-    with open("db/deliveries.json", "w") as f:
-        json.dump(deliveries_data, f, indent=4)
+        writer.write_delivery(delivery)
 
-    with open("db/items.json", "w") as f:
-        json.dump(items_data, f, indent=4)
+    # Close the deliveries and items files
+    writer.close()
 
-    print("Data has been saved to 'deliveries.json' and 'items.json'.")
+    print(f"Data has been saved to '{deliveries_path}' and '{items_path}'.")
+    if corpus is not None:
+        print(f"{len(corpus.labels)} contracts and labels.json have been saved to '{args.contracts_dir}'.")
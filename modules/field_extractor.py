@@ -0,0 +1,269 @@
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from .breach_rules import UNITS, parse_amount, parse_date, parse_dimensions
+from .parsed_contract import ParsedContract, document_text
+
+_NUMBER = r"\d[\d,]*(?:\.\d+)?"
+_MONTHS = (
+    "January|February|March|April|May|June|July|August|September|October|November|December|"
+    "Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sept|Sep|Oct|Nov|Dec"
+)
+_DATE = (
+    rf"(?:\d{{1,2}}(?:st|nd|rd|th)?\s+(?:{_MONTHS})\.?,?\s+\d{{4}}"
+    rf"|(?:{_MONTHS})\.?\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}"
+    rf"|\d{{4}}-\d{{2}}-\d{{2}})"
+)
+# Longest first, so "kgs" is not matched as "kg" followed by "s"
+_ALL_UNITS = "|".join(sorted(map(re.escape, UNITS), key=len, reverse=True))
+_MASS_UNITS = "|".join(sorted((re.escape(u) for u, (d, _) in UNITS.items() if d == "mass"), key=len, reverse=True))
+_LENGTH = r"(?:mm|cm|m)"
+_DIMENSIONS = (
+    rf"{_NUMBER}\s*{_LENGTH}?\s*[x×]\s*{_NUMBER}\s*{_LENGTH}?\s*[x×]\s*{_NUMBER}\s*{_LENGTH}(?![a-z])"
+)
+
+# Contract wording that names the same field differently, e.g. location fields in app.py
+FIELD_ALIASES = {"deliver_date": "delivery_date", "supplier": "supplier_name"}
+
+
+@dataclass
+class FieldPattern:
+    """
+    A pattern that reads one contract field from a paragraph.
+
+    Attributes:
+        regex (re.Pattern): The compiled pattern, with the field's text in the "value" group.
+        confidence (float): How reliably a match gives the right value, from 0 to 1.
+    """
+    regex: re.Pattern
+    confidence: float
+
+
+@dataclass
+class FieldMatch:
+    """
+    A field value found by the local extractor.
+
+    Attributes:
+        value (str): The value in the form the LLM is asked for, e.g. "2024-06-15" for dates.
+        text (str): The matched contract text, e.g. "15 June 2024".
+        start (int): The offset of `text` in the contract.
+        end (int): The end offset of `text` in the contract (exclusive).
+        confidence (float): The pattern's confidence, lowered if the contract states conflicting values.
+    """
+    value: str
+    text: str
+    start: int
+    end: int
+    confidence: float
+
+
+def _compile(pattern: str) -> re.Pattern:
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def _normalise_date(text: str) -> Optional[str]:
+    date = parse_date(text)
+    return date.isoformat() if date else None
+
+
+def _normalise_amount(text: str) -> Optional[str]:
+    return " ".join(text.split()) if parse_amount(text) is not None else None
+
+
+def _normalise_dimensions(text: str) -> Optional[str]:
+    return " ".join(text.split()) if parse_dimensions(text) is not None else None
+
+
+def _normalise_text(text: str) -> Optional[str]:
+    text = " ".join(text.split()).strip(" .,;:\"'")
+    return text or None
+
+
+# The pattern library: field -> (patterns, normaliser). Labelled forms ("Quantity: ...")
+# are the most reliable; forms recognised from the surrounding wording score lower.
+FIELD_PATTERNS = {
+    "contract_number": ([
+        FieldPattern(_compile(r"\bcontract\s+(?:number|no\.?|#)\s*[:.]?\s*(?P<value>[A-Z0-9][A-Z0-9/-]*\d[A-Z0-9/-]*)"), 0.95),
+        FieldPattern(_compile(r"\bagreement\s+(?:number|no\.?|#)\s*[:.]?\s*(?P<value>[A-Z0-9][A-Z0-9/-]*\d[A-Z0-9/-]*)"), 0.9),
+    ], _normalise_text),
+    "supplier_name": ([
+        FieldPattern(_compile(r"\bsupplier\s*(?:name)?\s*:\s*(?P<value>[^\n]+)"), 0.95),
+        FieldPattern(_compile(r"\band\s+(?P<value>[^()\n]+?)\s*\(\s*the\s+[\"“]?supplier[\"”]?\s*\)"), 0.9),
+    ], _normalise_text),
+    "delivery_date": ([
+        FieldPattern(_compile(rf"\bdelivery\s+date\s*:\s*(?P<value>{_DATE})"), 0.95),
+        FieldPattern(_compile(rf"\bdeliver(?:ed|y)?\b[^\n.]*?\b(?:no\s+later\s+than|on\s+or\s+before|by|before|on)\s+(?P<value>{_DATE})"), 0.9),
+    ], _normalise_date),
+    "quantity": ([
+        FieldPattern(_compile(rf"\bquantity\s*:\s*(?P<value>{_NUMBER}\s*(?:{_ALL_UNITS}))\b"), 0.95),
+        FieldPattern(_compile(rf"\b(?:supply|deliver|provide|sell)\s+(?P<value>{_NUMBER}\s*(?:{_ALL_UNITS}))\b"), 0.9),
+    ], _normalise_amount),
+    "weight": ([
+        FieldPattern(_compile(rf"\bweight\s*:\s*(?P<value>{_NUMBER}\s*(?:{_MASS_UNITS}))\b"), 0.95),
+        FieldPattern(_compile(rf"\bweight\b[^\n]*?(?P<value>{_NUMBER}\s*(?:{_MASS_UNITS}))\b"), 0.85),
+    ], _normalise_amount),
+    "pallet_dimensions": ([
+        FieldPattern(_compile(rf"\bpallet\s+dimensions\s*:\s*(?P<value>{_DIMENSIONS})"), 0.95),
+        FieldPattern(_compile(rf"\bpallets?\b[^\n]*?(?P<value>{_DIMENSIONS})"), 0.9),
+    ], _normalise_dimensions),
+}
+
+
+class FieldExtractor:
+    """
+    Reads deterministic contract fields (contract number, supplier, delivery date, quantity,
+    weight and pallet dimensions) with a compiled pattern library, so the LLM is only asked
+    for the fields the patterns cannot settle.
+
+    Each paragraph is matched against each field's patterns and the most confident match
+    is kept. If a contract states different values for a field, its confidence is halved,
+    leaving the choice to the LLM.
+
+    Attributes:
+        patterns (dict): field -> (list of `FieldPattern`, normaliser), see `FIELD_PATTERNS`.
+        min_confidence (float): The lowest confidence at which a field is filled locally.
+    """
+
+    def __init__(self, patterns: dict = None, min_confidence: float = 0.85):
+        """
+        Initializes the FieldExtractor class.
+
+        Args:
+            patterns (dict): The pattern library (default is None, `FIELD_PATTERNS`).
+            min_confidence (float): The lowest confidence at which a field is filled locally
+                (default is 0.85).
+        """
+        self.patterns = FIELD_PATTERNS if patterns is None else patterns
+        self.min_confidence = min_confidence
+
+    @staticmethod
+    def _paragraphs(document) -> List[tuple]:
+        """
+        Returns (offset, text) of each paragraph in the contract's flattened text.
+        """
+        if isinstance(document, ParsedContract):
+            return [(start, document.text[start:end]) for start, end in document.paragraph_offsets]
+        paragraphs, position = [], 0
+        for line in document_text(document).split("\n"):
+            paragraphs.append((position, line))
+            position += len(line) + 1
+        return paragraphs
+
+    def _match_field(self, paragraphs: List[tuple], patterns: List[FieldPattern], normalise: Callable) -> Optional[FieldMatch]:
+        best, values = None, set()
+        for offset, paragraph in paragraphs:
+            for pattern in patterns:
+                for match in pattern.regex.finditer(paragraph):
+                    text = match.group("value").strip()
+                    value = normalise(text)
+                    if value is None:
+                        continue
+                    values.add(value.lower())
+                    if best is None or pattern.confidence > best.confidence:
+                        start = offset + match.start("value")
+                        best = FieldMatch(value, text, start, start + len(text), pattern.confidence)
+        if best is not None and len(values) > 1:
+            best.confidence /= 2
+        return best
+
+    def extract(self, document) -> dict:
+        """
+        Runs the pattern library over a contract.
+
+        Args:
+            document (Document | ParsedContract): The contract.
+
+        Returns:
+            dict: field -> `FieldMatch` for every field with a match, at any confidence.
+        """
+        paragraphs = self._paragraphs(document)
+        matches = {}
+        for name, (patterns, normalise) in self.patterns.items():
+            match = self._match_field(paragraphs, patterns, normalise)
+            if match is not None:
+                matches[name] = match
+        return matches
+
+    def fill(self, document, terms: dict) -> tuple:
+        """
+        Fills the fields of a term dictionary that the patterns settle with enough confidence.
+
+        Plain fields get the normalised value (ISO dates), and location fields
+        ({"value", "start_position", "end_position"}) the matched text and its offsets.
+
+        Args:
+            document (Document | ParsedContract): The contract.
+            terms (dict): A term dictionary in the format passed to `ContractProcessor.extract_terms`,
+                e.g. `structured_outputs.contract_enforcement`.
+
+        Returns:
+            tuple: (filled, remaining) where `filled` holds the resolved fields in the nesting
+                of `terms`, and `remaining` is `terms` without them, to be asked of the LLM.
+                Sections left with no fields are dropped from `remaining`.
+        """
+        matches = {
+            name: match for name, match in self.extract(document).items() if match.confidence >= self.min_confidence
+        }
+
+        def walk(node: dict) -> tuple:
+            filled, remaining = {}, {}
+            for key, template in node.items():
+                match = matches.get(FIELD_ALIASES.get(key, key))
+                if isinstance(template, dict) and "start_position" in template:
+                    if match is not None:
+                        filled[key] = {"value": match.text, "start_position": match.start, "end_position": match.end}
+                    else:
+                        remaining[key] = template
+                elif isinstance(template, dict):
+                    section_filled, section_remaining = walk(template)
+                    if section_filled:
+                        filled[key] = section_filled
+                    if section_remaining:
+                        remaining[key] = section_remaining
+                elif match is not None:
+                    filled[key] = match.value
+                else:
+                    remaining[key] = template
+            return filled, remaining
+
+        return walk(terms) if isinstance(terms, dict) else ({}, terms)
+
+
+def count_fields(terms: dict) -> int:
+    """
+    Counts the fields of a term dictionary, treating location fields as one field each.
+
+    Args:
+        terms (dict): A term dictionary, or a part of one.
+
+    Returns:
+        int: The number of fields.
+    """
+    if not isinstance(terms, dict):
+        return 0
+    return sum(
+        count_fields(value) if isinstance(value, dict) and "start_position" not in value else 1
+        for value in terms.values()
+    )
+
+
+def merge_terms(response, filled: dict) -> dict:
+    """
+    Merges locally filled fields into an LLM response, the local values taking precedence.
+
+    Args:
+        response (dict): The LLM's extracted terms, or anything else if the query failed.
+        filled (dict): The fields from `FieldExtractor.fill`.
+
+    Returns:
+        dict: The combined terms.
+    """
+    merged = dict(response) if isinstance(response, dict) else {}
+    for key, value in filled.items():
+        if isinstance(value, dict) and "start_position" not in value and isinstance(merged.get(key), dict):
+            merged[key] = merge_terms(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
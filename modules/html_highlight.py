@@ -0,0 +1,65 @@
+import html
+from typing import List, TextIO
+
+HIGHLIGHT_OPEN = '<span style="background-color: yellow;">'
+HIGHLIGHT_CLOSE = "</span>"
+
+
+def highlight_spans(annotations: dict, text_length: int) -> List[List[int]]:
+    """
+    Turns extracted field locations into sorted, non-overlapping [start, end) spans.
+
+    Fields without a value or with positions that are not numbers are skipped, positions
+    are clamped to the text, and overlapping or nested spans are merged into one.
+
+    Args:
+        annotations (dict): {field: {"value", "start_position", "end_position"}} as returned
+            by `ContractProcessor.extract_terms_with_locations`.
+        text_length (int): The length of the contract text.
+
+    Returns:
+        list: The merged spans in document order.
+    """
+    spans = []
+    for field in annotations.values():
+        if not isinstance(field, dict) or not field.get("value"):
+            continue
+        try:
+            start, end = int(field["start_position"]), int(field["end_position"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        start, end = max(start, 0), min(end, text_length)
+        if start < end:
+            spans.append([start, end])
+
+    spans.sort()
+    merged = []
+    for start, end in spans:
+        if merged and start < merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def write_highlighted_html(text: str, spans: List[List[int]], file: TextIO):
+    """
+    Streams the contract as HTML with each span highlighted, in a single pass over the text.
+
+    The text is HTML-escaped, so markup in a contract is shown rather than interpreted.
+
+    Args:
+        text (str): The contract text.
+        spans (list): Sorted, non-overlapping [start, end) spans from `highlight_spans`.
+        file (TextIO): The file to write to.
+    """
+    file.write('<html><head><meta charset="utf-8"></head><body><pre>')
+    position = 0
+    for start, end in spans:
+        file.write(html.escape(text[position:start], quote=False))
+        file.write(HIGHLIGHT_OPEN)
+        file.write(html.escape(text[start:end], quote=False))
+        file.write(HIGHLIGHT_CLOSE)
+        position = end
+    file.write(html.escape(text[position:], quote=False))
+    file.write("</pre></body></html>")
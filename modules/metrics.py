@@ -0,0 +1,285 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# Upper bounds in seconds of the Prometheus stage latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Percentiles reported by InMemoryMetrics.summary
+PERCENTILES = [50, 95, 99]
+
+
+def _label_text(labels: dict) -> str:
+    """
+    Formats labels as a Prometheus label set, e.g. '{model="gpt-4o-mini"}', or '' if empty.
+    """
+    if not labels:
+        return ""
+    escaped = {
+        key: str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for key, value in labels.items()
+    }
+    pairs = ",".join(f'{key}="{value}"' for key, value in sorted(escaped.items()))
+    return "{" + pairs + "}"
+
+
+class MetricsSink:
+    """
+    The interface for pipeline instrumentation.
+
+    Components record stage wall times with `timer` (or `timing`) and counts such as
+    LLM tokens and cache hits with `count`. Subclasses must implement `timing` and `count`.
+    """
+
+    def timing(self, stage: str, seconds: float, **labels):
+        """
+        Records the wall time of one run of a pipeline stage.
+
+        Args:
+            stage (str): The stage name, e.g. "lookup_contract".
+            seconds (float): The wall time in seconds.
+            **labels: Extra dimensions, e.g. model="gpt-4o-mini".
+        """
+        raise NotImplementedError
+
+    def count(self, name: str, value: float = 1, **labels):
+        """
+        Adds to a counter.
+
+        Args:
+            name (str): The counter name, e.g. "llm_prompt_tokens".
+            value (float): The amount to add (default is 1).
+            **labels: Extra dimensions, e.g. model="gpt-4o-mini".
+        """
+        raise NotImplementedError
+
+    @contextmanager
+    def timer(self, stage: str, **labels):
+        """
+        Times the enclosed block as a run of `stage`, including when it raises.
+
+        Args:
+            stage (str): The stage name.
+            **labels: Extra dimensions.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timing(stage, time.perf_counter() - start, **labels)
+
+
+class NullMetrics(MetricsSink):
+    """
+    Discards all metrics. The default sink, so instrumentation costs next to nothing.
+    """
+
+    def timing(self, stage: str, seconds: float, **labels):
+        pass
+
+    def count(self, name: str, value: float = 1, **labels):
+        pass
+
+
+class InMemoryMetrics(MetricsSink):
+    """
+    Keeps every timing and counter in memory, for tests, benchmarks and ad hoc inspection.
+
+    Attributes:
+        timings (dict): The recorded wall times in seconds, keyed by stage (with labels).
+        counters (dict): The counter totals, keyed by name (with labels).
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def timing(self, stage: str, seconds: float, **labels):
+        with self._lock:
+            self.timings.setdefault(stage + _label_text(labels), []).append(seconds)
+
+    def count(self, name: str, value: float = 1, **labels):
+        key = name + _label_text(labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def summary(self) -> dict:
+        """
+        Summarises the recorded metrics.
+
+        Returns:
+            dict: {"stages": per stage the count, total seconds and mean and percentile
+                latencies in milliseconds, "counters": the counter totals}.
+        """
+        with self._lock:
+            timings = {stage: list(values) for stage, values in self.timings.items()}
+            counters = dict(self.counters)
+
+        stages = {}
+        for stage, durations in timings.items():
+            values = np.array(durations) * 1000.0
+            stages[stage] = {"count": len(values), "total_s": float(values.sum()) / 1000.0, "mean_ms": float(values.mean())}
+            for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+                stages[stage][f"p{percentile}_ms"] = float(value)
+        return {"stages": stages, "counters": counters}
+
+    def reset(self):
+        """
+        Discards everything recorded so far.
+        """
+        with self._lock:
+            self.timings.clear()
+            self.counters.clear()
+
+
+class JSONLinesMetrics(MetricsSink):
+    """
+    Appends every timing and counter as one JSON object per line, for offline analysis.
+
+    Each line is {"type": "timing" | "count", "name", "value", "labels", "timestamp"}.
+
+    Attributes:
+        path (str): The file the events are appended to.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initializes the JSONLinesMetrics class.
+
+        Args:
+            path (str): The file to append events to; its directory is created if needed.
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a")
+        self._lock = threading.Lock()
+
+    def _write(self, event_type: str, name: str, value: float, labels: dict):
+        line = json.dumps({
+            "type": event_type, "name": name, "value": value, "labels": labels, "timestamp": time.time(),
+        })
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def timing(self, stage: str, seconds: float, **labels):
+        self._write("timing", stage, seconds, labels)
+
+    def count(self, name: str, value: float = 1, **labels):
+        self._write("count", name, value, labels)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class PrometheusMetrics(MetricsSink):
+    """
+    Aggregates metrics for the Prometheus text exposition format.
+
+    Stage timings become a `<namespace>_stage_seconds` histogram labelled by stage, and
+    each counter a `<namespace>_<name>_total` counter. Serve `render()` from an HTTP
+    endpoint, or `write` it to a file for the node_exporter textfile collector.
+
+    Attributes:
+        namespace (str): The prefix of every metric name.
+        buckets (tuple): The histogram bucket upper bounds in seconds.
+    """
+
+    def __init__(self, namespace: str = "contract_breach_detector", buckets: tuple = DEFAULT_BUCKETS):
+        """
+        Initializes the PrometheusMetrics class.
+
+        Args:
+            namespace (str): The prefix of every metric name (default is "contract_breach_detector").
+            buckets (tuple): The histogram bucket upper bounds in seconds (default is `DEFAULT_BUCKETS`).
+        """
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self._histograms = {}  # Label set -> [bucket counts, sum, count]
+        self._counters = {}  # Name -> {label set -> total}
+        self._lock = threading.Lock()
+
+    def timing(self, stage: str, seconds: float, **labels):
+        key = tuple(sorted({**labels, "stage": stage}.items()))
+        with self._lock:
+            histogram = self._histograms.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def count(self, name: str, value: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def render(self) -> str:
+        """
+        Renders every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text.
+        """
+        lines = []
+        with self._lock:
+            if self._histograms:
+                name = f"{self.namespace}_stage_seconds"
+                lines.append(f"# HELP {name} Wall time of each pipeline stage.")
+                lines.append(f"# TYPE {name} histogram")
+                for key, (bucket_counts, total, count) in sorted(self._histograms.items()):
+                    labels = dict(key)
+                    for bound, bucket_count in zip(self.buckets, bucket_counts):
+                        lines.append(f"{name}_bucket{_label_text({**labels, 'le': repr(float(bound))})} {bucket_count}")
+                    lines.append(f"{name}_bucket{_label_text({**labels, 'le': '+Inf'})} {count}")
+                    lines.append(f"{name}_sum{_label_text(labels)} {total}")
+                    lines.append(f"{name}_count{_label_text(labels)} {count}")
+            for counter, series in sorted(self._counters.items()):
+                name = f"{self.namespace}_{counter}_total"
+                lines.append(f"# TYPE {name} counter")
+                for key, total in sorted(series.items()):
+                    lines.append(f"{name}{_label_text(dict(key))} {total}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """
+        Atomically writes `render()` to a file, e.g. for the node_exporter textfile collector.
+
+        Args:
+            path (str): The file to write.
+        """
+        directory = os.path.dirname(path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+
+class MultiMetrics(MetricsSink):
+    """
+    Forwards every metric to several sinks, e.g. Prometheus for dashboards and JSON lines for analysis.
+
+    Attributes:
+        sinks (list): The sinks to forward to.
+    """
+
+    def __init__(self, *sinks: MetricsSink):
+        self.sinks = list(sinks)
+
+    def timing(self, stage: str, seconds: float, **labels):
+        for sink in self.sinks:
+            sink.timing(stage, seconds, **labels)
+
+    def count(self, name: str, value: float = 1, **labels):
+        for sink in self.sinks:
+            sink.count(name, value, **labels)
@@ -0,0 +1,188 @@
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockLLMServer:
+    """
+    A local OpenAI-compatible chat completions server returning canned JSON responses.
+
+    Used to benchmark the pipeline end to end without calling (or paying for) the
+    OpenAI API: point `QueryLLM(base_url=server.url, api_key="mock")` at it. Each
+    request waits `latency` seconds plus or minus up to `jitter`, and fails with
+    `error_status` with probability `error_rate`.
+
+    A response is chosen by the first key of `responses` found in the last message of
+    the request, e.g. {"Contract Number: 2000001": {...}}, falling back to `default_response`.
+
+    Attributes:
+        responses (dict): Canned responses keyed by a substring of the request's last message.
+        default_response (dict): The response when no key matches.
+        latency (float): The mean response delay in seconds.
+        jitter (float): The maximum deviation from `latency` in seconds.
+        error_rate (float): The fraction of requests that fail.
+        error_status (int): The HTTP status of failed requests, e.g. 429 or 500.
+        requests (int): The number of requests received.
+        errors (int): The number of requests failed on purpose.
+    """
+
+    def __init__(
+        self,
+        responses: dict = None,
+        default_response: dict = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        seed: int = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        Initializes the MockLLMServer class.
+
+        Args:
+            responses (dict): Canned responses keyed by a substring of the request's
+                last message (default is None, always `default_response`).
+            default_response (dict): The response when no key matches (default is None,
+                a breach analysis finding no breach).
+            latency (float): The mean response delay in seconds (default is 0.0).
+            jitter (float): The maximum deviation from `latency` in seconds (default is 0.0).
+            error_rate (float): The fraction of requests that fail (default is 0.0).
+            error_status (int): The HTTP status of failed requests (default is 500).
+            seed (int): Seed for the latency and error draws (default is None).
+            host (str): The interface to listen on (default is "127.0.0.1").
+            port (int): The port to listen on (default is 0, any free port).
+        """
+        self.responses = responses or {}
+        self.default_response = default_response or {"breached": False, "breached_description": ""}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """
+        The base URL to pass to `QueryLLM(base_url=...)`.
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def respond(self, messages: list) -> dict:
+        """
+        Picks the canned response for a request.
+
+        Args:
+            messages (list): The request's message dictionaries.
+
+        Returns:
+            dict: The response to return as the completion's JSON content.
+        """
+        content = messages[-1]["content"] if messages else ""
+        for key, response in self.responses.items():
+            if key in content:
+                return response
+        return self.default_response
+
+    def _draw(self) -> tuple:
+        """
+        Draws the delay and whether to fail for one request.
+
+        Returns:
+            tuple: The delay in seconds and True if the request should fail.
+        """
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        return delay, fail
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                delay, fail = server._draw()
+                time.sleep(delay)
+
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+                elif fail:
+                    self._send(server.error_status, {"error": {"message": "Injected failure", "type": "server_error"}})
+                else:
+                    messages = body.get("messages", [])
+                    content = json.dumps(server.respond(messages))
+                    prompt_tokens = sum(len(str(message.get("content", ""))) for message in messages) // 4 + 1
+                    completion_tokens = len(content) // 4 + 1
+                    self._send(200, {
+                        "id": f"chatcmpl-{uuid.uuid4().hex}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": body.get("model", "mock"),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens,
+                        },
+                    })
+
+            def _send(self, status: int, payload: dict):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output clean
+
+        return Handler
+
+    def start(self) -> "MockLLMServer":
+        """
+        Starts serving on a background thread.
+
+        Returns:
+            MockLLMServer: The server, for chaining.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops serving and releases the port.
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
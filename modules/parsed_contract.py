@@ -0,0 +1,227 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field, asdict
+from typing import List
+
+from docx import Document
+
+
+@dataclass
+class ParsedContract:
+    """
+    The flattened text of a contract, built once per file so the .docx never needs reparsing.
+
+    `text` is the paragraphs joined with newlines, exactly as the LLM prompts and
+    HTML highlighting expect, so character positions are interchangeable with those
+    computed from a `Document`.
+
+    Attributes:
+        path (str): The path the contract was loaded from.
+        text (str): The paragraphs of the contract joined with newlines.
+        paragraph_offsets (list): [start, end) character offsets of each paragraph in `text`.
+        content_hash (str): A SHA256 hash of the .docx file contents.
+        mtime (float): The file modification time when parsed.
+        size (int): The file size in bytes when parsed.
+    """
+    path: str
+    text: str
+    paragraph_offsets: List[List[int]] = field(default_factory=list)
+    content_hash: str = ""
+    mtime: float = 0.0
+    size: int = 0
+
+    @property
+    def paragraphs(self) -> List[str]:
+        """
+        The text of each paragraph, sliced from `text`.
+
+        Returns:
+            list: The paragraph strings.
+        """
+        return [self.text[start:end] for start, end in self.paragraph_offsets]
+
+    @classmethod
+    def from_paragraphs(cls, paragraphs: List[str], **metadata) -> "ParsedContract":
+        """
+        Builds a ParsedContract from paragraph strings.
+
+        Args:
+            paragraphs (list): The text of each paragraph in order.
+            **metadata: path, content_hash, mtime and size.
+
+        Returns:
+            ParsedContract: The parsed contract.
+        """
+        offsets = []
+        position = 0
+        for paragraph in paragraphs:
+            offsets.append([position, position + len(paragraph)])
+            position += len(paragraph) + 1  # Paragraphs are separated by a newline
+        metadata.setdefault("path", "")
+        return cls(text="\n".join(paragraphs), paragraph_offsets=offsets, **metadata)
+
+    @classmethod
+    def from_document(cls, document: Document, **metadata) -> "ParsedContract":
+        """
+        Builds a ParsedContract from a python-docx `Document`.
+
+        Args:
+            document (Document): The loaded contract.
+            **metadata: path, content_hash, mtime and size.
+
+        Returns:
+            ParsedContract: The parsed contract.
+        """
+        return cls.from_paragraphs([p.text for p in document.paragraphs], **metadata)
+
+    @classmethod
+    def from_file(cls, filepath: str) -> "ParsedContract":
+        """
+        Reads and parses a .docx file.
+
+        Args:
+            filepath (str): The path to the .docx file.
+
+        Returns:
+            ParsedContract: The parsed contract.
+        """
+        stat = os.stat(filepath)
+        with open(filepath, "rb") as file:
+            data = file.read()
+        return cls.from_bytes(data, path=filepath, mtime=stat.st_mtime, size=stat.st_size)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, **metadata) -> "ParsedContract":
+        """
+        Parses .docx file contents.
+
+        Args:
+            data (bytes): The contents of a .docx file.
+            **metadata: path, mtime and size.
+
+        Returns:
+            ParsedContract: The parsed contract.
+        """
+        document = Document(io.BytesIO(data))
+        return cls.from_document(document, content_hash=hashlib.sha256(data).hexdigest(), **metadata)
+
+
+def document_text(document) -> str:
+    """
+    Returns the flattened text of a `Document` or `ParsedContract`.
+
+    Args:
+        document (Document | ParsedContract): The contract.
+
+    Returns:
+        str: The paragraphs joined with newlines.
+    """
+    if isinstance(document, ParsedContract):
+        return document.text
+    return "\n".join([p.text for p in document.paragraphs])
+
+
+class ParsedContractCache:
+    """
+    An on-disk cache of ParsedContracts, so reruns over an unchanged corpus skip .docx parsing.
+
+    Each file's (mtime, size) is remembered per path: if both match, the cached parse is
+    used without reading the file. Otherwise the file is hashed, and a parse stored under
+    that content hash is reused (e.g. for a touched or copied file) before parsing anew.
+
+    Attributes:
+        cache_dir (str): Directory to store parsed contracts.
+        hits (int): The number of loads served from the cache.
+        misses (int): The number of loads that had to parse the .docx.
+    """
+
+    def __init__(self, cache_dir: str = "./cache/contracts"):
+        """
+        Initializes the ParsedContractCache class.
+
+        Args:
+            cache_dir (str): Directory to store parsed contracts (default is "./cache/contracts").
+        """
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.join(self.cache_dir, "paths"), exist_ok=True)
+
+    def _content_path(self, content_hash: str) -> str:
+        return os.path.join(self.cache_dir, f"{content_hash}.json")
+
+    def _path_index(self, filepath: str) -> str:
+        path_key = hashlib.sha256(os.path.abspath(filepath).encode()).hexdigest()
+        return os.path.join(self.cache_dir, "paths", f"{path_key}.json")
+
+    @staticmethod
+    def _read_json(path: str):
+        try:
+            with open(path, "r") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_json(self, path: str, data: dict):
+        # Write to a temporary file and rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            json.dump(data, file)
+        os.replace(tmp_path, path)
+
+    def _load_content(self, content_hash: str, filepath: str, mtime: float, size: int):
+        data = self._read_json(self._content_path(content_hash))
+        if data is None:
+            return None
+        data.update(path=filepath, mtime=mtime, size=size)
+        return ParsedContract(**data)
+
+    def load(self, filepath: str) -> ParsedContract:
+        """
+        Loads a parsed contract, parsing and caching the .docx only if it has changed.
+
+        Args:
+            filepath (str): The path to the .docx file.
+
+        Returns:
+            ParsedContract: The parsed contract.
+        """
+        stat = os.stat(filepath)
+        index_path = self._path_index(filepath)
+
+        index = self._read_json(index_path)
+        if index and index["mtime"] == stat.st_mtime and index["size"] == stat.st_size:
+            contract = self._load_content(index["content_hash"], filepath, stat.st_mtime, stat.st_size)
+            if contract is not None:
+                self.hits += 1
+                return contract
+
+        with open(filepath, "rb") as file:
+            data = file.read()
+        content_hash = hashlib.sha256(data).hexdigest()
+
+        contract = self._load_content(content_hash, filepath, stat.st_mtime, stat.st_size)
+        if contract is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            contract = ParsedContract.from_bytes(data, path=filepath, mtime=stat.st_mtime, size=stat.st_size)
+            self.store(contract)
+
+        self._write_json(index_path, {"mtime": stat.st_mtime, "size": stat.st_size, "content_hash": content_hash})
+        return contract
+
+    def store(self, contract: ParsedContract):
+        """
+        Saves a parsed contract under its content hash.
+
+        Args:
+            contract (ParsedContract): The parsed contract to cache.
+        """
+        data = asdict(contract)
+        for key in ("path", "mtime", "size"):  # Per-file details live in the path index
+            data.pop(key)
+        self._write_json(self._content_path(contract.content_hash), data)
@@ -0,0 +1,267 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .breach_rules import (
+    BreachRules, UNITS, is_missing, is_short, parse_amount, parse_date, parse_dimensions
+)
+from .DB_code import DataBase
+
+# The contract fields evaluated for every contract, in breach matrix column order
+PORTFOLIO_FIELDS = ["delivery_date", "quantity", "weight", "pallet_dimensions"]
+
+# One pass over every ERP row of every contract: converts delivered quantities and weights to
+# base units, then aggregates per contract. Contracts with no ERP rows keep a row with no data.
+PORTFOLIO_QUERY = """
+WITH erp AS (
+    SELECT
+        t.contract_number,
+        i.item_id,
+        d.delivery_date,
+        date_diff('day', t.expected_date, d.delivery_date) AS date_delta_days,
+        i.quantity * COALESCE(u.factor, 1.0) AS delivered_quantity,
+        u.dimension AS delivered_dimension,
+        COALESCE(u.factor, 1.0) AS delivered_factor,
+        i.weight * ? AS delivered_weight,
+        i.pallet_dimensions
+    FROM contract_terms t
+    LEFT JOIN items i ON i.contract_number = t.contract_number
+    LEFT JOIN deliveries d ON d.delivery_id = i.delivery_id
+    LEFT JOIN units u ON u.unit = lower(i.base_unit_of_measure)
+)
+SELECT
+    contract_number,
+    count(item_id) AS erp_rows,
+    count(delivery_date) AS dated_rows,
+    max(date_delta_days) AS date_delta_days,
+    sum(delivered_quantity) AS delivered_quantity,
+    count(DISTINCT delivered_dimension) AS delivered_dimensions,
+    any_value(delivered_dimension) AS delivered_dimension,
+    any_value(delivered_factor) AS delivered_factor,
+    count(DISTINCT delivered_factor) AS delivered_factors,
+    sum(delivered_weight) AS delivered_weight,
+    list(DISTINCT pallet_dimensions) FILTER (WHERE pallet_dimensions IS NOT NULL) AS delivered_pallets
+FROM erp
+GROUP BY contract_number
+"""
+
+
+@dataclass
+class PortfolioReport:
+    """
+    The outcome of evaluating a whole portfolio of contracts against the ERP data.
+
+    Attributes:
+        deltas (pandas.DataFrame): Per contract: the number of ERP rows, the latest delivery
+            relative to the contracted date in days, and the delivered minus contracted
+            quantity and weight in base units (kg for mass), summed over every ERP row.
+        matrix (pandas.DataFrame): Per contract: a nullable boolean per field, True if
+            breached, False if not and <NA> if the rules cannot decide, plus a "breached"
+            column that is True if any field is breached.
+    """
+    deltas: pd.DataFrame
+    matrix: pd.DataFrame
+
+
+class PortfolioEvaluator:
+    """
+    Evaluates every contract in a portfolio against every ERP row in one database pass.
+
+    Unlike `DetectBreach.get_comparisons`, which reads only the first ERP row of a single
+    contract, deliveries are checked row by row (any late delivery or pallet mismatch is a
+    breach) and quantities and weights are summed over all of a contract's rows. The
+    decisions follow the same `BreachRules` as `DetectBreach.detect_breach`.
+
+    Attributes:
+        db (DataBase): The ERP database.
+        rules (BreachRules): The rules and tolerances to evaluate with.
+    """
+
+    def __init__(self, db: DataBase, rules: BreachRules = None):
+        """
+        Initializes the PortfolioEvaluator class.
+
+        Args:
+            db (DataBase): The ERP database.
+            rules (BreachRules): The rules to use (default is None, `BreachRules()`).
+        """
+        self.db = db
+        self.rules = rules or BreachRules()
+
+    @staticmethod
+    def terms_frame(contract_terms: list) -> pd.DataFrame:
+        """
+        Flattens extracted contract terms into one row per contract.
+
+        Args:
+            contract_terms (list): Extracted terms, each {"info": {...}, "details": {...}}
+                as returned for `structured_outputs.contract_enforcement`.
+
+        Returns:
+            pandas.DataFrame: A contract_number column plus one column per `PORTFOLIO_FIELDS`.
+        """
+        return pd.DataFrame([
+            {"contract_number": terms["info"].get("contract_number"),
+             **{field: terms["details"].get(field) for field in PORTFOLIO_FIELDS}}
+            for terms in contract_terms
+        ])
+
+    def _typed_terms(self, terms: pd.DataFrame) -> pd.DataFrame:
+        """
+        Parses the contracted values once per contract into typed columns.
+
+        Args:
+            terms (pandas.DataFrame): The output of `terms_frame`.
+
+        Returns:
+            pandas.DataFrame: The typed contract terms.
+        """
+        quantities = [None if is_missing(v) else parse_amount(v) for v in terms["quantity"]]
+        weights = [
+            None if is_missing(v) else parse_amount(v, default_unit=self.rules.erp_weight_unit)
+            for v in terms["weight"]
+        ]
+        return pd.DataFrame({
+            "contract_number": pd.array(
+                [DataBase._parse_contract_number(v) for v in terms["contract_number"]], dtype="Int64"
+            ),
+            "expected_date": pd.to_datetime(
+                [None if is_missing(v) else parse_date(v) for v in terms["delivery_date"]]
+            ),
+            "expected_quantity": [q[0] if q else np.nan for q in quantities],
+            "quantity_dimension": [q[1] if q else None for q in quantities],
+            "expected_weight": [w[0] if w and w[1] == "mass" else np.nan for w in weights],
+        })
+
+    def evaluate(self, contract_terms) -> PortfolioReport:
+        """
+        Evaluates every contract against all of its ERP rows.
+
+        Args:
+            contract_terms (list | pandas.DataFrame): Extracted contract terms, or the
+                output of `terms_frame`.
+
+        Returns:
+            PortfolioReport: The per-contract deltas and the breach matrix, indexed by
+                contract number in input order.
+        """
+        terms = contract_terms if isinstance(contract_terms, pd.DataFrame) else self.terms_frame(contract_terms)
+        terms = terms.reset_index(drop=True)
+        typed = self._typed_terms(terms)
+
+        units = pd.DataFrame(
+            [(unit, dimension, factor) for unit, (dimension, factor) in UNITS.items()],
+            columns=["unit", "dimension", "factor"],
+        )
+        weight_factor = UNITS[self.rules.erp_weight_unit.lower()][1]
+        erp = self.db.query_db(
+            PORTFOLIO_QUERY,
+            [weight_factor],
+            result_format="pandas",
+            tables={"contract_terms": typed[["contract_number", "expected_date"]].drop_duplicates("contract_number"),
+                    "units": units},
+        )
+        erp = typed.merge(erp, on="contract_number", how="left")  # Restore input order
+        has_rows = erp["erp_rows"].fillna(0).to_numpy() > 0
+        tolerance = self.rules.amount_tolerance
+
+        matrix = pd.DataFrame({"contract_number": terms["contract_number"]})
+        deltas = pd.DataFrame({
+            "contract_number": terms["contract_number"],
+            "erp_rows": erp["erp_rows"].fillna(0).astype(int),
+        })
+
+        # Delivery dates: the latest delivery decides, and any undated row counts as missing
+        date_delta = erp["date_delta_days"].to_numpy(dtype=float)
+        deltas["date_delta_days"] = date_delta
+        matrix["delivery_date"] = self._flags(
+            date_delta > self.rules.date_tolerance_days,
+            contract_values=terms["delivery_date"],
+            parsed=erp["expected_date"],
+            delivered_missing=~has_rows | (erp["dated_rows"] < erp["erp_rows"]).to_numpy(),
+        )
+
+        # Quantities: bare contracted numbers are in the ERP unit, otherwise units must share a dimension
+        bare = erp["quantity_dimension"].isna().to_numpy()
+        single_unit = (erp["delivered_dimensions"] <= 1).to_numpy() & (erp["delivered_factors"] <= 1).to_numpy()
+        expected_quantity = np.where(
+            bare, erp["expected_quantity"] * erp["delivered_factor"], erp["expected_quantity"]
+        ).astype(float)
+        delivered_quantity = erp["delivered_quantity"].to_numpy(dtype=float)
+        comparable = single_unit & (bare | (erp["quantity_dimension"] == erp["delivered_dimension"]).to_numpy())
+        deltas["quantity_delta"] = np.where(comparable, delivered_quantity - expected_quantity, np.nan)
+        matrix["quantity"] = self._flags(
+            is_short(delivered_quantity, expected_quantity, tolerance),
+            contract_values=terms["quantity"],
+            parsed=erp["expected_quantity"],
+            delivered_missing=~has_rows | np.isnan(delivered_quantity),
+            comparable=comparable,
+        )
+
+        # Weights: always compared in kg
+        expected_weight = erp["expected_weight"].to_numpy(dtype=float)
+        delivered_weight = erp["delivered_weight"].to_numpy(dtype=float)
+        deltas["weight_delta"] = delivered_weight - expected_weight
+        matrix["weight"] = self._flags(
+            is_short(delivered_weight, expected_weight, tolerance),
+            contract_values=terms["weight"],
+            parsed=erp["expected_weight"],
+            delivered_missing=~has_rows | np.isnan(delivered_weight),
+        )
+
+        # Pallet dimensions: each distinct delivered value is parsed once and must match
+        matrix["pallet_dimensions"] = pd.array(
+            [
+                self._pallet_flag(expected, delivered)
+                for expected, delivered in zip(terms["pallet_dimensions"], erp["delivered_pallets"])
+            ],
+            dtype="boolean",
+        )
+
+        matrix["breached"] = matrix[PORTFOLIO_FIELDS].fillna(False).any(axis=1)
+        return PortfolioReport(deltas=deltas.set_index("contract_number"), matrix=matrix.set_index("contract_number"))
+
+    @staticmethod
+    def _flags(breached, contract_values, parsed, delivered_missing, comparable=None):
+        """
+        Turns a vectorised comparison into nullable breach flags, following `BreachRules`:
+        a missing value is a breach, and an unparseable or incomparable value is undecided.
+
+        Args:
+            breached (numpy.ndarray): The comparison result per contract.
+            contract_values (pandas.Series): The contracted values as extracted.
+            parsed (pandas.Series): The parsed contracted values, null where parsing failed.
+            delivered_missing (numpy.ndarray): Whether the delivered value is missing per contract.
+            comparable (numpy.ndarray): Whether the values can be compared per contract
+                (default is None, always).
+
+        Returns:
+            pandas.arrays.BooleanArray: The breach flag per contract.
+        """
+        contract_missing = np.array([is_missing(value) for value in contract_values], dtype=bool)
+        missing = contract_missing | np.asarray(delivered_missing, dtype=bool)
+        undecided = parsed.isna().to_numpy() & ~contract_missing
+        if comparable is not None:
+            undecided |= ~np.asarray(comparable, dtype=bool)
+
+        flags = pd.array(np.where(missing, True, breached), dtype="boolean")
+        flags[undecided & ~missing] = pd.NA
+        return flags
+
+    def _pallet_flag(self, expected, delivered_pallets):
+        if is_missing(expected) or not isinstance(delivered_pallets, (list, np.ndarray)) or len(delivered_pallets) == 0:
+            return True  # Missing; human clarification is required
+        expected_dims = parse_dimensions(expected)
+        if expected_dims is None:
+            return pd.NA
+        for delivered in delivered_pallets:
+            delivered_dims = parse_dimensions(delivered)
+            if delivered_dims is None or len(delivered_dims) != len(expected_dims):
+                return pd.NA
+            if any(
+                abs(e - d) > self.rules.dimension_tolerance_mm
+                for e, d in zip(sorted(expected_dims), sorted(delivered_dims))
+            ):
+                return True
+        return False
@@ -0,0 +1,313 @@
+import bisect
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List
+
+# Words added to the query when a schema key contains the given word, so clauses phrased
+# differently from the key still rank (e.g. "liquidated damages" for a penalties question)
+QUERY_EXPANSIONS = {
+    "contract": ["agreement"],
+    "number": ["no", "reference"],
+    "supplier": ["vendor", "between", "party"],
+    "deliver": ["delivery", "delivered", "dispatch", "shipment", "later"],
+    "delivery": ["deliver", "delivered", "dispatch", "shipment", "later"],
+    "date": ["later", "before", "deadline"],
+    "quantity": ["supply", "goods", "units", "amount"],
+    "weight": ["kg", "tons", "tonnes", "net", "gross"],
+    "pallet": ["pallets", "packaging"],
+    "dimension": ["measuring", "mm", "size"],
+    "penalty": ["damages", "liquidated", "late", "delay", "fee"],
+    "late": ["delay", "damages", "liquidated", "penalty"],
+    "clause": ["penalty", "damages"],
+}
+
+# Inserted between sections that are not adjacent in the original document
+OMISSION_MARKER = "\n[...]\n"
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into lowercase word tokens with plural "s" stripped.
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        list: The tokens in order.
+    """
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        if len(word) > 3 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def schema_query(schema) -> List[str]:
+    """
+    Builds a relevance query from the keys of a term dictionary, a list of fields, or a
+    mapping of section name to term dictionary as used for combined extraction.
+
+    Args:
+        schema (dict | list): The requested terms.
+
+    Returns:
+        list: The query tokens, expanded with `QUERY_EXPANSIONS`.
+    """
+    keys = []
+
+    def collect(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                keys.append(str(key))
+                collect(value)
+        elif isinstance(node, (list, tuple)):
+            for item in node:
+                keys.append(str(item))
+
+    collect(schema)
+    query = []
+    for token in tokenize(" ".join(keys).replace("_", " ")):
+        query.append(token)
+        query.extend(tokenize(" ".join(QUERY_EXPANSIONS.get(token, []))))
+    return query
+
+
+class BM25Index:
+    """
+    An Okapi BM25 index over a small set of passages, built in memory per document.
+
+    Attributes:
+        k1 (float): Term frequency saturation.
+        b (float): Length normalisation.
+    """
+
+    def __init__(self, passages: List[List[str]], k1: float = 1.5, b: float = 0.75):
+        """
+        Initializes the BM25Index class.
+
+        Args:
+            passages (list): The tokens of each passage.
+            k1 (float): Term frequency saturation (default is 1.5).
+            b (float): Length normalisation (default is 0.75).
+        """
+        self.k1 = k1
+        self.b = b
+        self._frequencies = [Counter(tokens) for tokens in passages]
+        self._lengths = [len(tokens) for tokens in passages]
+        self._average_length = (sum(self._lengths) / len(passages)) if passages else 0.0
+        document_frequency = Counter(token for counts in self._frequencies for token in counts)
+        n = len(passages)
+        self._idf = {
+            token: math.log(1 + (n - df + 0.5) / (df + 0.5)) for token, df in document_frequency.items()
+        }
+
+    def scores(self, query: List[str]) -> List[float]:
+        """
+        Scores every passage against a query.
+
+        Args:
+            query (list): The query tokens; repeated tokens weigh more.
+
+        Returns:
+            list: The BM25 score of each passage, in passage order.
+        """
+        weights = Counter(token for token in query if token in self._idf)
+        scores = []
+        for counts, length in zip(self._frequencies, self._lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self._average_length) if self._average_length else self.k1
+            score = 0.0
+            for token, weight in weights.items():
+                tf = counts.get(token, 0)
+                if tf:
+                    score += weight * self._idf[token] * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+
+@dataclass
+class CompactedText:
+    """
+    The text sent to the LLM in place of a full contract, and how it maps back.
+
+    Attributes:
+        text (str): The selected sections in document order, separated by `OMISSION_MARKER`
+            where text was left out.
+        segments (list): [compacted start, original start, length] of each run of text
+            copied from the original document, in order.
+        original_length (int): The length of the full document text.
+    """
+    text: str
+    segments: List[List[int]] = field(default_factory=list)
+    original_length: int = 0
+
+    @classmethod
+    def identity(cls, text: str) -> "CompactedText":
+        """
+        Wraps a full document text that was sent unchanged.
+        """
+        return cls(text=text, segments=[[0, 0, len(text)]], original_length=len(text))
+
+    @property
+    def compacted(self) -> bool:
+        return len(self.text) != self.original_length or len(self.segments) != 1
+
+    def to_original(self, position: int) -> int:
+        """
+        Maps a character position in `text` to the full document text.
+
+        Positions inside an omission marker map to the end of the preceding section.
+
+        Args:
+            position (int): A position in `text`.
+
+        Returns:
+            int: The corresponding position in the full document.
+        """
+        if not self.segments:
+            return position
+        index = max(bisect.bisect_right([segment[0] for segment in self.segments], position) - 1, 0)
+        compacted_start, original_start, length = self.segments[index]
+        return original_start + min(max(position - compacted_start, 0), length)
+
+    def remap_locations(self, locations: dict) -> dict:
+        """
+        Maps the positions in a location response back to the full document.
+
+        Args:
+            locations (dict): {field: {"value", "start_position", "end_position"}} as
+                returned for `ContractProcessor.extract_terms_with_locations`.
+
+        Returns:
+            dict: The same fields with positions in the full document. Positions that
+                are empty or not numbers are left unchanged.
+        """
+        if not self.compacted or not isinstance(locations, dict):
+            return locations
+        remapped = {}
+        for name, location in locations.items():
+            if isinstance(location, dict):
+                location = dict(location)
+                for key in ("start_position", "end_position"):
+                    try:
+                        location[key] = self.to_original(int(location[key]))
+                    except (KeyError, TypeError, ValueError):
+                        pass
+            remapped[name] = location
+        return remapped
+
+
+class PromptCompactor:
+    """
+    Shrinks long contracts to the sections most relevant to the requested terms.
+
+    The text is split into sections (paragraphs, with long paragraphs cut into pieces),
+    ranked with BM25 against the schema keys and their `QUERY_EXPANSIONS`, and the best
+    sections that fit `token_budget` are kept in document order. Documents already within
+    the budget are sent unchanged.
+
+    Attributes:
+        token_budget (int): The maximum estimated tokens of contract text per prompt.
+        chars_per_token (float): The characters per token used to estimate prompt size.
+        max_section_chars (int): Paragraphs longer than this are split into several sections.
+    """
+
+    def __init__(self, token_budget: int = 3000, chars_per_token: float = 4.0, max_section_chars: int = 1500):
+        """
+        Initializes the PromptCompactor class.
+
+        Args:
+            token_budget (int): The maximum estimated tokens of contract text (default is 3000).
+            chars_per_token (float): Characters per token, matching `AsyncQueryLLM._estimate_tokens`
+                (default is 4.0).
+            max_section_chars (int): The longest section in characters (default is 1500).
+        """
+        self.token_budget = token_budget
+        self.chars_per_token = chars_per_token
+        self.max_section_chars = max_section_chars
+
+    def sections(self, text: str, max_chars: int = None) -> List[List[int]]:
+        """
+        Splits text into [start, end) sections: non-empty lines, with long lines cut at whitespace.
+
+        Args:
+            text (str): The flattened contract text.
+            max_chars (int): The longest section in characters (default is None, `max_section_chars`).
+
+        Returns:
+            list: The section offsets in document order.
+        """
+        max_chars = max(max_chars or self.max_section_chars, 1)
+        sections = []
+        position = 0
+        for line in text.split("\n"):
+            start, end = position, position + len(line)
+            position = end + 1
+            while end - start > max_chars:
+                cut = text.rfind(" ", start, start + max_chars)
+                cut = cut if cut > start else start + max_chars
+                sections.append([start, cut])
+                start = cut
+            if text[start:end].strip():
+                sections.append([start, end])
+        return sections
+
+    def compact(self, text: str, schema) -> CompactedText:
+        """
+        Selects the sections of a contract to send for a schema.
+
+        Args:
+            text (str): The flattened contract text.
+            schema (dict | list): The requested terms, fields or combined schemas.
+
+        Returns:
+            CompactedText: The text to send and its mapping to the full document.
+        """
+        budget = int(self.token_budget * self.chars_per_token)
+        if len(text) <= budget:
+            return CompactedText.identity(text)
+
+        # Sections never exceed the budget, so even a tiny budget keeps the best-ranked text
+        sections = self.sections(text, min(self.max_section_chars, max(budget - len(OMISSION_MARKER), 1)))
+        if not sections:
+            return CompactedText.identity(text)
+        scores = BM25Index([tokenize(text[start:end]) for start, end in sections]).scores(schema_query(schema))
+        ranked = sorted(range(len(sections)), key=lambda i: (-scores[i], i))
+
+        chosen, used = [], 0
+        for i in ranked:
+            start, end = sections[i]
+            cost = end - start + len(OMISSION_MARKER)
+            if used + cost <= budget:
+                chosen.append(i)
+                used += cost
+        if not chosen:
+            # A budget smaller than any section still sends the start of the best one
+            start, end = sections[ranked[0]]
+            sections[ranked[0]] = [start, start + max(min(budget, end - start), 1)]
+            chosen.append(ranked[0])
+
+        parts, segments, position, previous_end = [], [], 0, None
+        for i in sorted(chosen):
+            start, end = sections[i]
+            if previous_end is not None and text[previous_end:start] in ("", "\n"):
+                # Adjacent in the document: keep the original separator so the run maps as one segment
+                piece = text[previous_end:end]
+                segments[-1][2] += len(piece)
+            else:
+                if previous_end is not None:
+                    parts.append(OMISSION_MARKER)
+                    position += len(OMISSION_MARKER)
+                piece = text[start:end]
+                segments.append([position, start, len(piece)])
+            parts.append(piece)
+            position += len(piece)
+            previous_end = end
+
+        return CompactedText(text="".join(parts), segments=segments, original_length=len(text))
@@ -1,9 +1,16 @@
 import openai
 import os
 import hashlib
-import pickle
 import json
 import re
+import asyncio
+import random
+import time
+import weakref
+
+from .cache_store import CacheBackend, CacheCompactor, CachePolicy, MemoryCache, PickleDirCache
+from .metrics import MetricsSink, NullMetrics
+from .single_flight import SingleFlight
 
 
 class QueryLLM:
@@ -13,12 +20,33 @@ class QueryLLM:
 
     Attributes:
         model (str): The model to be used for querying the LLM.
+        base_url (str): The API endpoint, or None for the OpenAI API.
+        api_key (str): The API key.
         client (openai.OpenAI): The OpenAI client for interacting with the API.
         cache_dir (str): Directory to store cached responses.
+        cache (CacheBackend): The store holding cached responses.
+        memory_cache (MemoryCache): The in-process LRU tier in front of `cache`, or None if disabled.
+        cache_compactor (CacheCompactor): The background cache maintenance thread, or None.
+        single_flight (SingleFlight): Coalesces concurrent identical queries into one request.
+        metrics (MetricsSink): Receives request timings, token usage and cache hits and misses.
         debug (bool): Flag for enabling debug mode.
     """
 
-    def __init__(self, debug=False, model: str = "gpt-4o-mini", cache_dir: str = "./cache"):
+    def __init__(
+        self,
+        debug=False,
+        model: str = "gpt-4o-mini",
+        cache_dir: str = "./cache",
+        cache_backend: CacheBackend = None,
+        memory_cache_entries: int = 1024,
+        memory_cache_bytes: int = 64 * 1024 * 1024,
+        cache_policy: CachePolicy = None,
+        cache_gc_interval: float = None,
+        process_lock_dir: str = None,
+        base_url: str = None,
+        api_key: str = None,
+        metrics: MetricsSink = None,
+    ):
         """
         Initializes the QueryLLM class.
 
@@ -26,12 +54,44 @@ class QueryLLM:
             debug (bool): Enable or disable debug mode (default is False).
             model (str): The model to use for querying the LLM (default is "gpt-4o-mini").
             cache_dir (str): Directory to store cached responses (default is "./cache").
+            cache_backend (CacheBackend): The cache store to use (default is a `PickleDirCache`
+                over `cache_dir`). Pass e.g. a `SQLiteCache` for a single-file store.
+            memory_cache_entries (int): Entry limit of the in-memory LRU tier; 0 disables it (default is 1024).
+            memory_cache_bytes (int): Byte limit of the in-memory LRU tier (default is 64 MiB).
+            cache_policy (CachePolicy): Size, entry and TTL limits for the cache (default is None, unbounded).
+                LFU eviction needs a backend that counts reads, such as `SQLiteCache`.
+            cache_gc_interval (float): If set with `cache_policy`, enforce the policy on a background
+                thread every this many seconds (default is None).
+            process_lock_dir (str): If set, identical queries are also coalesced across worker
+                processes using lock files in this directory (default is None, in-process only).
+            base_url (str): The API endpoint, e.g. a local OpenAI-compatible server for
+                benchmarking (default is None, the OpenAI API).
+            api_key (str): The API key (default is None, the OPENAI_API_KEY environment variable).
+            metrics (MetricsSink): Where to record request timings, token usage and cache
+                hits and misses (default is None, discarded).
         """
         self.model = model
-        self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.base_url = base_url
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.client = openai.OpenAI(api_key=self.api_key, base_url=base_url)
         self.cache_dir = cache_dir
-        os.makedirs(self.cache_dir, exist_ok=True)  # Ensure the cache directory exists
         self.debug = debug
+        self.cache = cache_backend if cache_backend is not None else PickleDirCache(cache_dir, debug=debug)
+        if cache_policy is not None:
+            self.cache.check_policy(cache_policy)
+        ttl = cache_policy.ttl if cache_policy else None
+        if ttl is not None:
+            self.cache.ttl = ttl
+        self.memory_cache = (
+            MemoryCache(max_entries=memory_cache_entries, max_bytes=memory_cache_bytes, ttl=ttl)
+            if memory_cache_entries > 0 else None
+        )
+        self.cache_compactor = None
+        if cache_policy and cache_gc_interval:
+            self.cache_compactor = CacheCompactor(self.cache, cache_policy, interval=cache_gc_interval)
+            self.cache_compactor.start()
+        self.single_flight = SingleFlight(lock_dir=process_lock_dir)
+        self.metrics = metrics or NullMetrics()
 
     def _generate_hash(self, raw_text: str) -> str:
         """
@@ -49,35 +109,43 @@ class QueryLLM:
         """
         Constructs the file path for the cached response based on the hash key.
 
+        Only meaningful for file-per-entry backends such as `PickleDirCache`.
+
         Args:
             hash_key (str): The hash key for the cache.
 
         Returns:
             str: The full path to the cache file.
+
+        Raises:
+            TypeError: If the cache backend does not store one file per entry.
         """
-        return os.path.join(self.cache_dir, f"{hash_key}.pkl")
+        if not isinstance(self.cache, PickleDirCache):
+            raise TypeError(f"{type(self.cache).__name__} does not store one file per cache entry.")
+        return self.cache.path(hash_key)
 
     def _load_from_cache(self, hash_key: str):
         """
         Loads a cached response if it exists.
 
+        The in-memory tier is checked first; disk hits are promoted into it so
+        repeated prompts stay off the filesystem.
+
         Args:
             hash_key (str): The hash key for the cache.
 
         Returns:
             object: The cached response or None if not found.
         """
-        cache_file = self._cache_path(hash_key)
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, "rb") as file:
-                    return pickle.load(file)
-            except (EOFError, pickle.UnpicklingError):
-                # Handle empty or corrupted cache file
-                if self.debug:
-                    print(f"Cache file {cache_file} is corrupted or empty. Deleting...")
-                os.remove(cache_file)
-        return None
+        if self.memory_cache is not None:
+            response = self.memory_cache.get(hash_key)
+            if response is not None:
+                return response
+
+        response = self.cache.get(hash_key)
+        if response is not None and self.memory_cache is not None:
+            self.memory_cache.set(hash_key, response)
+        return response
 
     def _save_to_cache(self, hash_key: str, response):
         """
@@ -87,9 +155,9 @@ class QueryLLM:
             hash_key (str): The hash key for the cache.
             response (object): The response to cache.
         """
-        cache_file = self._cache_path(hash_key)
-        with open(cache_file, "wb") as file:
-            pickle.dump(response, file)
+        self.cache.set(hash_key, response)
+        if self.memory_cache is not None:
+            self.memory_cache.set(hash_key, response)
 
     def _extract_json(self, content: str) -> dict:
         """
@@ -131,6 +199,35 @@ class QueryLLM:
         else:
             raise ValueError("No JSON object found in the response content.")
 
+    def _query_hash(self, messages: list) -> str:
+        """
+        Generates the cache key for a list of messages.
+
+        Args:
+            messages (list): A list of message dictionaries to send to the LLM.
+
+        Returns:
+            str: A SHA256 hash of the role-prefixed message contents.
+        """
+        # Construct a unique key for the query
+        key = " ".join(f"{message['role']}: {message['content']}" for message in messages)
+        return self._generate_hash(key)
+
+    def _record_usage(self, response):
+        """
+        Records the token usage reported with an LLM response.
+
+        Args:
+            response (openai.types.chat.ChatCompletion): The response from the API.
+        """
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        for kind in ("prompt_tokens", "completion_tokens"):
+            tokens = getattr(usage, kind, None)
+            if isinstance(tokens, int):
+                self.metrics.count(f"llm_{kind}", tokens, model=self.model)
+
     def query_llm(self, messages: list) -> dict:
         """
         Queries the LLM with the provided messages.
@@ -144,22 +241,42 @@ class QueryLLM:
         Returns:
             dict: The parsed JSON response from the LLM or cache.
         """
-        # Construct a unique key for the query
-        key = " ".join(f"{message['role']}: {message['content']}" for message in messages)
-
         # Generate a hash for the query
-        query_hash = self._generate_hash(key)
+        query_hash = self._query_hash(messages)
 
         # Check if the response is cached
         cached_output = self._load_from_cache(query_hash)
         if cached_output:
+            self.metrics.count("llm_cache_hits")
             if self.debug:
                 print("Loaded response from cache.")
                 print(cached_output)
             return cached_output
+        self.metrics.count("llm_cache_misses")
+
+        # Concurrent callers with the same query wait for a single request
+        return self.single_flight.do(query_hash, lambda: self._request(query_hash, messages))
+
+    def _request(self, query_hash: str, messages: list) -> dict:
+        """
+        Sends a query to the LLM and caches the parsed response.
+
+        Args:
+            query_hash (str): The cache key for the query.
+            messages (list): A list of message dictionaries to send to the LLM.
+
+        Returns:
+            dict: The parsed JSON response from the LLM or cache.
+        """
+        # Another caller, possibly in another process, may have filled the cache in the meantime
+        cached_output = self._load_from_cache(query_hash)
+        if cached_output:
+            return cached_output
 
         # Send the query to the LLM
-        response = self.client.chat.completions.create(model=self.model, messages=messages)
+        with self.metrics.timer("llm_request"):
+            response = self.client.chat.completions.create(model=self.model, messages=messages)
+        self._record_usage(response)
 
         if self.debug:
             print("LLM Response:", response)
@@ -171,3 +288,259 @@ class QueryLLM:
         self._save_to_cache(query_hash, output)
 
         return output
+
+
+class RateLimiter:
+    """
+    An asyncio scheduler that caps concurrent requests and tokens per minute.
+
+    Tokens are drawn from a bucket that refills continuously at `tokens_per_minute / 60`
+    per second. When the API reports a rate limit, `pause` holds back every caller
+    until the cooldown has passed rather than letting them all hit the limit again.
+
+    asyncio primitives are bound to the event loop that first uses them, so the
+    semaphore and bucket lock are created per running loop. The limiter can then be
+    reused across successive `asyncio.run` calls; the token bucket is shared by all of them.
+
+    Attributes:
+        max_concurrency (int): The maximum number of requests in flight at once.
+        tokens_per_minute (int): The token budget per minute.
+    """
+
+    def __init__(self, max_concurrency: int = 16, tokens_per_minute: int = 200_000):
+        """
+        Initializes the RateLimiter class.
+
+        Args:
+            max_concurrency (int): The maximum number of requests in flight at once (default is 16).
+            tokens_per_minute (int): The token budget per minute (default is 200,000).
+        """
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self._loop_primitives = weakref.WeakKeyDictionary()  # event loop -> (semaphore, bucket lock)
+        self._tokens = float(tokens_per_minute)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+
+    def _primitives(self) -> tuple:
+        """
+        Returns the semaphore and bucket lock for the running event loop, creating them on first use.
+
+        Returns:
+            tuple: (asyncio.Semaphore, asyncio.Lock).
+        """
+        loop = asyncio.get_running_loop()
+        primitives = self._loop_primitives.get(loop)
+        if primitives is None:
+            primitives = (asyncio.Semaphore(self.max_concurrency), asyncio.Lock())
+            self._loop_primitives[loop] = primitives
+        return primitives
+
+    def _refill(self):
+        """
+        Adds the tokens accrued since the last refill, up to the bucket capacity.
+        """
+        now = time.monotonic()
+        rate = self.tokens_per_minute / 60.0
+        self._tokens = min(self.tokens_per_minute, self._tokens + (now - self._last_refill) * rate)
+        self._last_refill = now
+
+    async def _take_tokens(self, tokens: int):
+        """
+        Waits until `tokens` are available in the bucket and removes them.
+
+        Args:
+            tokens (int): The estimated number of tokens the request will use.
+        """
+        tokens = min(tokens, self.tokens_per_minute)  # A single oversized request must still run
+        async with self._primitives()[1]:
+            while True:
+                wait = self._paused_until - time.monotonic()
+                if wait <= 0:
+                    self._refill()
+                    if self._tokens >= tokens:
+                        self._tokens -= tokens
+                        return
+                    wait = (tokens - self._tokens) / (self.tokens_per_minute / 60.0)
+                await asyncio.sleep(wait)
+
+    def pause(self, delay: float):
+        """
+        Holds back all new requests for `delay` seconds, e.g. after a 429 response.
+
+        Args:
+            delay (float): The cooldown in seconds.
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+    async def run(self, tokens: int, request):
+        """
+        Runs a request once a concurrency slot and enough tokens are available.
+
+        Args:
+            tokens (int): The estimated number of tokens the request will use.
+            request (callable): A zero-argument coroutine function performing the request.
+
+        Returns:
+            object: The result of the request.
+        """
+        async with self._primitives()[0]:
+            await self._take_tokens(tokens)
+            return await request()
+
+
+class AsyncQueryLLM(QueryLLM):
+    """
+    An asyncio counterpart to QueryLLM using `openai.AsyncOpenAI`.
+
+    Responses share the cache (and cache keys) of QueryLLM, so sync and async callers
+    reuse each other's results. Requests are scheduled through a RateLimiter, and
+    429 responses are retried with exponential backoff and full jitter.
+
+    Attributes:
+        async_client (openai.AsyncOpenAI): The async OpenAI client.
+        limiter (RateLimiter): The scheduler capping concurrency and tokens per minute.
+        max_retries (int): The number of retries after a rate-limit error.
+        base_delay (float): The initial backoff delay in seconds.
+        max_delay (float): The maximum backoff delay in seconds.
+    """
+
+    def __init__(
+        self,
+        *args,
+        max_concurrency: int = 16,
+        tokens_per_minute: int = 200_000,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        **kwargs,
+    ):
+        """
+        Initializes the AsyncQueryLLM class.
+
+        Positional arguments are those of `QueryLLM`; the rate-limit settings are keyword-only.
+
+        Args:
+            *args: Passed to `QueryLLM.__init__` (debug, model, cache_dir, ...).
+            max_concurrency (int): The maximum number of requests in flight (default is 16).
+            tokens_per_minute (int): The token budget per minute (default is 200,000).
+            max_retries (int): The number of retries after a rate-limit error (default is 6).
+            base_delay (float): The initial backoff delay in seconds (default is 1.0).
+            max_delay (float): The maximum backoff delay in seconds (default is 60.0).
+            **kwargs: Passed to `QueryLLM.__init__` (debug, model, endpoint and cache settings).
+        """
+        super().__init__(*args, **kwargs)
+        # Retries are handled by `_arequest`, so the SDK must not retry 429s underneath it
+        self.async_client = openai.AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+        self.limiter = RateLimiter(max_concurrency=max_concurrency, tokens_per_minute=tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @staticmethod
+    def _estimate_tokens(messages: list) -> int:
+        """
+        Roughly estimates the tokens a request will use (about four characters per token).
+
+        Args:
+            messages (list): A list of message dictionaries to send to the LLM.
+
+        Returns:
+            int: The estimated token count.
+        """
+        return sum(len(message["content"]) for message in messages) // 4 + 1
+
+    def _backoff_delay(self, attempt: int, error: openai.RateLimitError) -> float:
+        """
+        Computes how long to wait before retrying a rate-limited request.
+
+        Uses the server's Retry-After header when present, otherwise exponential
+        backoff with full jitter.
+
+        Args:
+            attempt (int): The zero-based retry attempt.
+            error (openai.RateLimitError): The rate-limit error raised by the client.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), self.max_delay)
+        except (TypeError, ValueError):
+            pass
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def aquery_llm(self, messages: list) -> dict:
+        """
+        Asynchronously queries the LLM with the provided messages.
+
+        If a cached response exists for the same query, it will be loaded from the cache.
+        Otherwise, the query is scheduled through the rate limiter, retried on 429s,
+        and the response is cached.
+
+        Args:
+            messages (list): A list of message dictionaries to send to the LLM.
+
+        Returns:
+            dict: The parsed JSON response from the LLM or cache.
+
+        Raises:
+            openai.RateLimitError: If the request is still rate limited after `max_retries` retries.
+        """
+        query_hash = self._query_hash(messages)
+
+        cached_output = self._load_from_cache(query_hash)
+        if cached_output:
+            self.metrics.count("llm_cache_hits")
+            if self.debug:
+                print("Loaded response from cache.")
+                print(cached_output)
+            return cached_output
+        self.metrics.count("llm_cache_misses")
+
+        return await self.single_flight.ado(query_hash, lambda: self._arequest(query_hash, messages))
+
+    async def _arequest(self, query_hash: str, messages: list) -> dict:
+        """
+        Sends a query through the rate limiter, retrying 429s, and caches the parsed response.
+
+        Args:
+            query_hash (str): The cache key for the query.
+            messages (list): A list of message dictionaries to send to the LLM.
+
+        Returns:
+            dict: The parsed JSON response from the LLM or cache.
+        """
+        # Another caller, possibly in another process, may have filled the cache in the meantime
+        cached_output = self._load_from_cache(query_hash)
+        if cached_output:
+            return cached_output
+
+        tokens = self._estimate_tokens(messages)
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.metrics.timer("llm_request"):
+                    response = await self.limiter.run(
+                        tokens,
+                        lambda: self.async_client.chat.completions.create(model=self.model, messages=messages),
+                    )
+                break
+            except openai.RateLimitError as e:
+                self.metrics.count("llm_rate_limited", model=self.model)
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt, e)
+                if self.debug:
+                    print(f"Rate limited, retrying in {delay:.2f}s (attempt {attempt + 1}/{self.max_retries})")
+                self.limiter.pause(delay)
+
+        if self.debug:
+            print("LLM Response:", response)
+
+        self._record_usage(response)
+        output = self._extract_json(response.choices[0].message.content)
+        self._save_to_cache(query_hash, output)
+        return output
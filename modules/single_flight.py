@@ -0,0 +1,168 @@
+import asyncio
+import os
+import threading
+import zlib
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; cross-process mode is then unsupported
+    fcntl = None
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share a key.
+
+    The first caller for a key (the leader) runs the work; every caller that arrives
+    while it is in flight waits for and receives the leader's result (or exception).
+    Thread callers and asyncio callers share the same in-flight table, so a thread
+    and a task asking for the same key also coalesce.
+
+    When `lock_dir` is set, the leader additionally holds an exclusive file lock while
+    it works, so leaders in other worker processes queue behind it. Keys are hashed
+    onto a fixed set of `lock_stripes` lock files, so the directory never grows with
+    the number of keys; unrelated keys that share a stripe simply take turns. The work
+    function should re-check any shared cache once it runs, since another process may
+    have filled it in the meantime.
+
+    Attributes:
+        lock_dir (str): Directory for cross-process lock files, or None for in-process only.
+        lock_stripes (int): The number of lock files keys are spread over.
+        shared (int): The number of calls that were served by another caller's result.
+    """
+
+    def __init__(self, lock_dir: str = None, lock_stripes: int = 256):
+        """
+        Initializes the SingleFlight class.
+
+        Args:
+            lock_dir (str): Directory for cross-process lock files (default is None, in-process only).
+            lock_stripes (int): The number of lock files keys are spread over (default is 256).
+        """
+        if lock_stripes < 1:
+            raise ValueError("lock_stripes must be at least 1.")
+        if lock_dir is not None:
+            if fcntl is None:
+                raise RuntimeError("Cross-process single-flight requires fcntl, which is unavailable on this platform.")
+            os.makedirs(lock_dir, exist_ok=True)
+        self.lock_dir = lock_dir
+        self.lock_stripes = lock_stripes
+        self.shared = 0
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> concurrent.futures.Future of the leader's result
+
+    def _join(self, key: str):
+        """
+        Registers interest in `key`, becoming the leader if no call is in flight.
+
+        Args:
+            key (str): The deduplication key.
+
+        Returns:
+            tuple: (future, is_leader).
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _finish(self, key: str, future: Future, result=None, error: BaseException = None):
+        """
+        Publishes the leader's outcome and removes the key from the in-flight table.
+
+        Args:
+            key (str): The deduplication key.
+            future (Future): The leader's future.
+            result (object): The result to publish.
+            error (BaseException): The exception to publish instead of a result.
+        """
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _lock_path(self, key: str) -> str:
+        # A stable hash, so every process maps a key to the same stripe
+        stripe = zlib.crc32(key.encode()) % self.lock_stripes
+        return os.path.join(self.lock_dir, f"stripe-{stripe:03d}.lock")
+
+    @contextmanager
+    def _process_lock(self, key: str):
+        """
+        Holds the cross-process file lock for `key`, if cross-process mode is enabled.
+
+        Args:
+            key (str): The deduplication key.
+        """
+        if self.lock_dir is None:
+            yield
+            return
+        with open(self._lock_path(key), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def do(self, key: str, fn):
+        """
+        Runs `fn` once per key across concurrent callers.
+
+        Args:
+            key (str): The deduplication key.
+            fn (callable): A zero-argument function producing the result.
+
+        Returns:
+            object: The result of the leader's call.
+        """
+        future, is_leader = self._join(key)
+        if not is_leader:
+            return future.result()
+
+        try:
+            with self._process_lock(key):
+                result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def ado(self, key: str, coro_fn):
+        """
+        Awaits `coro_fn()` once per key across concurrent tasks and threads.
+
+        Args:
+            key (str): The deduplication key.
+            coro_fn (callable): A zero-argument coroutine function producing the result.
+
+        Returns:
+            object: The result of the leader's call.
+        """
+        future, is_leader = self._join(key)
+        if not is_leader:
+            return await asyncio.wrap_future(future)
+
+        lock_file = None
+        try:
+            if self.lock_dir is not None:
+                lock_file = open(self._lock_path(key), "a")
+                await asyncio.to_thread(fcntl.flock, lock_file, fcntl.LOCK_EX)  # Don't block the loop
+            result = await coro_fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        finally:
+            if lock_file is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+        self._finish(key, future, result=result)
+        return result
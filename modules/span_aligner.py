@@ -0,0 +1,228 @@
+import bisect
+import difflib
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+_WORD = re.compile(r"\w+")
+
+
+@dataclass
+class Alignment:
+    """
+    Where a value was found in the contract text.
+
+    Attributes:
+        start (int): The start offset in the text.
+        end (int): The end offset in the text (exclusive).
+        method (str): "exact", "normalised" (whitespace and case) or "approximate".
+        score (float): The similarity of the matched text to the value, 1.0 unless approximate.
+    """
+    start: int
+    end: int
+    method: str
+    score: float = 1.0
+
+
+class SpanAligner:
+    """
+    Finds the offsets of extracted values in a contract's flattened text, so highlight
+    locations do not depend on the positions an LLM reports.
+
+    Each value is matched exactly first, then with whitespace and case normalised, then
+    approximately (difflib similarity around occurrences of the value's rarest word).
+    Whole-word occurrences are preferred, so "500" is not placed inside "15000" when
+    "500" also appears on its own. When a value occurs more than once, the occurrence
+    nearest the reported position wins.
+
+    The normalised text and a word index are built once per contract, so aligning many
+    values costs little more than searching for them.
+
+    Attributes:
+        text (str): The contract text.
+        min_score (float): The lowest similarity accepted for an approximate match.
+    """
+
+    def __init__(self, text: str, min_score: float = 0.8):
+        """
+        Initializes the SpanAligner class.
+
+        Args:
+            text (str): The flattened contract text, e.g. `ParsedContract.text`.
+            min_score (float): The lowest similarity accepted for an approximate match (default is 0.8).
+        """
+        self.text = text
+        self.min_score = min_score
+
+        # Lowercased text with whitespace runs collapsed, and the original offset of each character
+        normalised, offsets = [], []
+        previous_space = False
+        for position, char in enumerate(text):
+            if char.isspace():
+                if previous_space:
+                    continue
+                char, previous_space = " ", True
+            else:
+                previous_space = False
+            normalised.append(char.lower())
+            offsets.append(position)
+        offsets.append(len(text))
+        self._normalised = "".join(normalised)
+        self._offsets = offsets
+
+        self._words = {}
+        for match in _WORD.finditer(self._normalised):
+            self._words.setdefault(match.group(), []).append(match.start())
+
+    @staticmethod
+    def normalise(value: str) -> str:
+        return " ".join(value.split()).lower()
+
+    @staticmethod
+    def _occurrences(haystack: str, needle: str) -> tuple:
+        """
+        Finds every occurrence of `needle`.
+
+        Returns:
+            tuple: (whole_word, all) start positions, where `whole_word` holds the occurrences
+                not running into a neighbouring word character at an end where `needle`
+                itself starts or ends with one.
+        """
+        positions = []
+        position = haystack.find(needle)
+        while position >= 0:
+            positions.append(position)
+            position = haystack.find(needle, position + 1)
+
+        def is_word(char: str) -> bool:
+            return char.isalnum() or char == "_"
+
+        check_start, check_end = is_word(needle[0]), is_word(needle[-1])
+        whole_word = [
+            position for position in positions
+            if not (check_start and position > 0 and is_word(haystack[position - 1]))
+            and not (check_end and position + len(needle) < len(haystack) and is_word(haystack[position + len(needle)]))
+        ]
+        return whole_word, positions
+
+    @staticmethod
+    def _nearest(positions: list, hint: Optional[int]) -> int:
+        if hint is None:
+            return positions[0]
+        return min(positions, key=lambda position: abs(position - hint))
+
+    def _to_original(self, start: int, end: int) -> tuple:
+        """
+        Maps a [start, end) span of the normalised text to the original text.
+        """
+        return self._offsets[start], self._offsets[end - 1] + 1
+
+    def align(self, value, hint: int = None) -> Optional[Alignment]:
+        """
+        Finds a value in the text.
+
+        Args:
+            value (str): The extracted value.
+            hint (int): The position the LLM reported, used to choose between repeated
+                occurrences (default is None, the first occurrence).
+
+        Returns:
+            Alignment: The span found, or None if the value is empty or not found.
+        """
+        value = str(value).strip() if value is not None else ""
+        if not value:
+            return None
+
+        needle = self.normalise(value)
+        exact = self._occurrences(self.text, value)
+        normalised = self._occurrences(self._normalised, needle)
+        normalised_hint = bisect.bisect_left(self._offsets, hint) if hint is not None else None
+
+        # Whole-word occurrences at either level first, then any substring
+        for whole_word in (True, False):
+            positions = exact[0] if whole_word else exact[1]
+            if positions:
+                start = self._nearest(positions, hint)
+                return Alignment(start, start + len(value), "exact")
+            positions = normalised[0] if whole_word else normalised[1]
+            if positions:
+                start = self._nearest(positions, normalised_hint)
+                return Alignment(*self._to_original(start, start + len(needle)), "normalised")
+
+        return self._approximate(needle, hint)
+
+    def _approximate(self, needle: str, hint: Optional[int]) -> Optional[Alignment]:
+        """
+        Scores windows of the normalised text around occurrences of the value's rarest word.
+        """
+        words = [word for word in _WORD.findall(needle) if word in self._words]
+        if not words:
+            return None
+        anchor = min(words, key=lambda word: len(self._words[word]))
+        anchor_offset = needle.find(anchor)
+
+        best = None
+        matcher = difflib.SequenceMatcher(autojunk=False)
+        matcher.set_seq2(needle)
+        slack = max(len(needle) // 4, 2)
+        for occurrence in self._words[anchor]:
+            window_start = max(occurrence - anchor_offset - slack, 0)
+            window_end = min(occurrence - anchor_offset + len(needle) + slack, len(self._normalised))
+            matcher.set_seq1(self._normalised[window_start:window_end])
+            blocks = [block for block in matcher.get_matching_blocks() if block.size]
+            if not blocks:
+                continue
+            start = window_start + blocks[0].a
+            end = window_start + blocks[-1].a + blocks[-1].size
+            score = difflib.SequenceMatcher(None, self._normalised[start:end], needle, autojunk=False).ratio()
+            original = self._to_original(start, end)
+            distance = abs(original[0] - hint) if hint is not None else 0
+            if best is None or (score, -distance) > (best.score, -best_distance):
+                best, best_distance = Alignment(*original, "approximate", score), distance
+
+        return best if best is not None and best.score >= self.min_score else None
+
+    def align_locations(self, locations: dict) -> dict:
+        """
+        Corrects the positions of extracted field locations.
+
+        Args:
+            locations (dict): {field: {"value", "start_position", "end_position"}} as
+                returned by `ContractProcessor.extract_terms_with_locations`.
+
+        Returns:
+            dict: The same fields with positions found in the text and an "alignment" key
+                naming the method used. Values that cannot be found get empty positions
+                and "unresolved", so they are not highlighted in the wrong place.
+        """
+        aligned = {}
+        for name, location in locations.items():
+            if not isinstance(location, dict) or not location.get("value"):
+                aligned[name] = location
+                continue
+            try:
+                hint = int(location.get("start_position"))
+            except (TypeError, ValueError):
+                hint = None
+            alignment = self.align(location["value"], hint)
+            location = dict(location)
+            if alignment is None:
+                location.update(start_position="", end_position="", alignment="unresolved")
+            else:
+                location.update(start_position=alignment.start, end_position=alignment.end, alignment=alignment.method)
+            aligned[name] = location
+        return aligned
+
+    def locate(self, values: dict) -> dict:
+        """
+        Builds field locations for plain extracted values, without asking the LLM for offsets.
+
+        Args:
+            values (dict): {field: value}, e.g. the "details" of extracted contract terms.
+
+        Returns:
+            dict: {field: {"value", "start_position", "end_position", "alignment"}}.
+        """
+        return self.align_locations({
+            name: {"value": value, "start_position": "", "end_position": ""} for name, value in values.items()
+        })
@@ -1,5 +1,9 @@
 import unittest
 from unittest.mock import MagicMock, patch
+import json
+import os
+import shutil
+import time
 import pandas as pd
 from contract_breach_detector.modules.DB_code import DataBase
 
@@ -81,30 +85,229 @@ class TestDataBase(unittest.TestCase):
         query_contract_number = "12345"
         result = self.database.lookup_contract(query_contract_number)
 
-        expected_query = f"""
+        expected_query = """
+        PREPARE lookup_contract AS
         SELECT d.*, i.*
         FROM deliveries d
         JOIN items i
         ON d.delivery_id = i.delivery_id
-        WHERE i.contract_number = '{query_contract_number}';
+        WHERE i.contract_number = $1::BIGINT;
         """
 
         # Normalize the expected query
         normalized_expected_query = " ".join(expected_query.split())
 
-        # Extract the actual query from the mock calls
-        actual_query = None
-        for call in self.mock_execute.call_args_list:
-            if "SELECT" in call.args[0]:
-                actual_query = " ".join(call.args[0].split())
-                break
+        # Extract the actual queries from the mock calls
+        actual_queries = [" ".join(call.args[0].split()) for call in self.mock_execute.call_args_list]
 
-        # Verify the query matches
-        self.assertEqual(normalized_expected_query, actual_query)
+        # Verify the statement was prepared once and executed with a typed parameter
+        self.assertEqual(actual_queries, [normalized_expected_query, "EXECUTE lookup_contract(12345);"])
+
+        self.database.lookup_contract(query_contract_number)
+        self.assertEqual(self.mock_execute.call_count, 3)  # No second PREPARE
 
         # Verify the result matches the mock
         pd.testing.assert_frame_equal(result, mock_df)
 
 
+class TestDataBaseIngestion(unittest.TestCase):
+    """
+    Test suite for ingesting the ERP JSON into a persistent DuckDB file.
+    """
+
+    def setUp(self):
+        """
+        Writes small deliveries and items JSON files and ingests them.
+        """
+        self.test_dir = os.path.join(os.path.dirname(__file__), "test_data", "test_ingest")
+        os.makedirs(self.test_dir, exist_ok=True)
+        self.deliveries_path = os.path.join(self.test_dir, "deliveries.json")
+        self.items_path = os.path.join(self.test_dir, "items.json")
+        self.db_path = os.path.join(self.test_dir, "erp.duckdb")
+
+        self._write(self.deliveries_path, [
+            {"delivery_id": 1, "delivery_date": "2024-06-15", "supplier": "Test Supplier",
+             "carrier": "Carrier", "tracking_number": "TN1", "order_number": "ORD-1"},
+        ])
+        self._write(self.items_path, [self._item(101, 12345, quantity=10)])
+        self.database = DataBase(self.deliveries_path, self.items_path, db_path=self.db_path)
+
+    def tearDown(self):
+        """
+        Clean up after tests by closing the database and removing the test directory.
+        """
+        self.database.con.close()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    @staticmethod
+    def _write(path, records):
+        with open(path, "w") as f:
+            json.dump(records, f)
+
+    @staticmethod
+    def _item(item_id, contract_number, quantity):
+        return {
+            "item_id": item_id, "material_number": "M001", "material_type": "Raw Material",
+            "description": "Test Material", "base_unit_of_measure": "EA", "quantity": quantity,
+            "unit_price": 1.0, "currency": "USD", "batch_number": "BN", "serial_number": "SN",
+            "vendor": "V", "manufacturer": "M", "country_of_origin": "GB", "weight": 5.0,
+            "dimensions": "1x1x1 cm", "tax_code": "A0", "procurement_type": "External",
+            "material_group": "MG01", "plant": "Plant1", "storage_location": "SL01",
+            "valuation_class": "3000", "price_control": "Standard", "profit_center": "PC1",
+            "expiration_date": "2025-01-01", "total_amount": 10.0,
+            "pallet_dimensions": "1200mm x 1000mm x 150mm", "contract_number": contract_number,
+            "delivery_id": 1,
+        }
+
+    def test_ingests_typed_indexed_tables(self):
+        """
+        Tests that ingestion creates typed tables with indexes and supports lookups.
+        """
+        types = dict(self.database.con.execute(
+            "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = 'items';"
+        ).fetchall())
+        self.assertEqual(types["contract_number"], "BIGINT")
+        self.assertEqual(types["expiration_date"], "DATE")
+
+        indexes = {row[0] for row in self.database.con.execute("SELECT index_name FROM duckdb_indexes();").fetchall()}
+        self.assertIn("items_contract_number_idx", indexes)
+        self.assertIn("items_delivery_id_idx", indexes)
+
+        result = self.database.lookup_contract("12345")
+        self.assertEqual(list(result["quantity"]), [10])
+
+    def test_reingests_only_changed_sources(self):
+        """
+        Tests that unchanged sources are skipped and changed ones are reloaded.
+        """
+        self.assertEqual(self.database.ingest(), [])
+
+        time.sleep(0.01)
+        self._write(self.items_path, [self._item(101, 12345, quantity=10), self._item(102, 67890, quantity=3)])
+        self.assertEqual(self.database.ingest(), ["items"])
+        self.assertEqual(list(self.database.lookup_contract("67890")["quantity"]), [3])
+
+    def test_persists_between_connections(self):
+        """
+        Tests that reopening the database file reuses the ingested data without reloading.
+        """
+        self.database.con.close()
+        self.database = DataBase(self.deliveries_path, self.items_path, db_path=self.db_path)
+
+        self.assertEqual(self.database.ingest(), [])
+        self.assertEqual(len(self.database.lookup_contract("12345")), 1)
+
+    def test_ingests_ndjson_and_parquet_shards(self):
+        """
+        Tests that NDJSON sources and globs of Parquet shards are ingested, and that
+        adding a shard triggers re-ingestion.
+        """
+        self.database.con.close()
+        deliveries_path = os.path.join(self.test_dir, "deliveries.ndjson")
+        with open(deliveries_path, "w") as f:
+            f.write(json.dumps({"delivery_id": 1, "delivery_date": "2024-06-15", "supplier": "Test Supplier",
+                                "carrier": "Carrier", "tracking_number": "TN1", "order_number": "ORD-1"}) + "\n")
+        pd.DataFrame([self._item(101, 12345, quantity=10)]).to_parquet(os.path.join(self.test_dir, "items-0.parquet"))
+        pd.DataFrame([self._item(102, 67890, quantity=3)]).to_parquet(os.path.join(self.test_dir, "items-1.parquet"))
+        items_glob = os.path.join(self.test_dir, "items-*.parquet")
+
+        self.database = DataBase(deliveries_path, items_glob, db_path=self.db_path, memory_limit="256MB")
+        self.assertEqual(list(self.database.lookup_contract("67890")["quantity"]), [3])
+        self.assertEqual(self.database.ingest(), [])
+
+        pd.DataFrame([self._item(103, 55555, quantity=7)]).to_parquet(os.path.join(self.test_dir, "items-2.parquet"))
+        self.assertEqual(self.database.ingest(), ["items"])
+        self.assertEqual(list(self.database.lookup_contract("55555")["quantity"]), [7])
+
+        views = DataBase(deliveries_path, items_glob)
+        self.assertEqual(len(views.lookup_contract("12345")), 1)
+
+    def test_lookup_contract_binds_typed_parameter(self):
+        """
+        Tests that LLM-style contract numbers are matched as integers and text never reaches the SQL.
+        """
+        self.assertEqual(len(self.database.lookup_contract("No. 12345")), 1)
+        self.assertEqual(len(self.database.lookup_contract(12345)), 1)
+
+        result = self.database.lookup_contract("x'; DROP TABLE items; --")
+        self.assertTrue(result.empty)
+        self.assertEqual(len(self.database.lookup_contract("12345")), 1)  # items still exists
+
+    def test_result_formats(self):
+        """
+        Tests that lookups can return Arrow tables, NumPy arrays and row tuples.
+        """
+        arrow = self.database.lookup_contract("12345", result_format="arrow")
+        self.assertEqual(arrow.column("quantity").to_pylist(), [10])
+
+        arrays = self.database.lookup_contract("12345", result_format="numpy")
+        self.assertEqual(arrays["quantity"].tolist(), [10])
+
+        rows = self.database.query_db("SELECT quantity FROM items WHERE contract_number = ?;", [12345], "rows")
+        self.assertEqual(rows, [(10,)])
+
+        prefetched = self.database.prefetch_contracts(["12345"])["12345"]
+        self.assertEqual(list(prefetched["quantity"]), [10])
+        self.assertEqual(self.database.lookup_contract("12345", result_format="numpy")["quantity"].tolist(), [10])
+
+        with self.assertRaises(ValueError):
+            self.database.query_db("SELECT 1;", result_format="polars")
+
+    def test_lookup_contracts_groups_by_number(self):
+        """
+        Tests that lookup_contracts returns rows per contract, with empty frames for misses.
+        """
+        self._write(self.items_path, [self._item(101, 12345, quantity=10), self._item(102, 67890, quantity=3)])
+        self.database.ingest(force=True)
+
+        results = self.database.lookup_contracts(["12345", 67890, "99999", "12345"])
+
+        self.assertEqual(list(results), ["12345", "67890", "99999"])
+        self.assertEqual(list(results["12345"]["quantity"]), [10])
+        self.assertEqual(list(results["67890"]["quantity"]), [3])
+        self.assertTrue(results["99999"].empty)
+
+    def test_lookup_contracts_in_requested_format(self):
+        """
+        Tests that batch lookups group NumPy and Arrow results without DataFrames, that
+        prefetched rows keep the database's format, and that row tuples are not a lookup format.
+        """
+        self._write(self.items_path, [
+            self._item(101, 12345, quantity=10), self._item(102, 67890, quantity=3), self._item(103, 12345, quantity=4),
+        ])
+        self.database.ingest(force=True)
+
+        arrays = self.database.lookup_contracts(["67890", "12345", "99999"], result_format="numpy")
+        self.assertEqual(sorted(arrays["12345"]["quantity"].tolist()), [4, 10])
+        self.assertEqual(arrays["67890"]["quantity"].tolist(), [3])
+        self.assertEqual(len(arrays["99999"]["quantity"]), 0)
+        arrow = self.database.lookup_contracts(["12345"], result_format="arrow")
+        self.assertEqual(sorted(arrow["12345"].column("quantity").to_pylist()), [4, 10])
+
+        self.database.result_format = "numpy"
+        self.database.prefetch_contracts(["67890"])
+        with patch.object(self.database, "_convert") as mock_convert:
+            self.assertEqual(self.database.lookup_contract("67890")["quantity"].tolist(), [3])
+            mock_convert.assert_not_called()
+
+        with self.assertRaises(ValueError):
+            DataBase(self.deliveries_path, self.items_path, result_format="rows")
+        with self.assertRaises(ValueError):
+            self.database.lookup_contract("12345", result_format="rows")
+
+    def test_prefetch_serves_lookups_without_querying(self):
+        """
+        Tests that prefetched contracts are served from memory until the prefetch is cleared.
+        """
+        self.database.prefetch_contracts(["12345"])
+
+        with patch.object(self.database, "query_db") as mock_query:
+            self.assertEqual(list(self.database.lookup_contract("12345")["quantity"]), [10])
+            mock_query.assert_not_called()
+
+        self.database.clear_prefetch()
+        self.assertEqual(self.database.prefetched, {})
+
+
 if __name__ == "__main__":
     unittest.main()
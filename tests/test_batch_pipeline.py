@@ -0,0 +1,114 @@
+import os
+import shutil
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from contract_breach_detector.modules.batch_pipeline import BatchProcessor
+from contract_breach_detector.modules.contract_processor import ContractProcessor
+from contract_breach_detector.modules.DB_code import DataBase
+from contract_breach_detector.modules.query_llm import QueryLLM
+
+
+class TestBatchProcessor(unittest.TestCase):
+    """
+    Test suite for the BatchProcessor class.
+    """
+
+    def setUp(self):
+        """
+        Sets up the test environment by mocking the processor, database and LLM,
+        and creating a BatchProcessor instance.
+        """
+        self.mock_processor = MagicMock(spec=ContractProcessor)
+        self.mock_db = MagicMock(spec=DataBase)
+        self.mock_llm = MagicMock(spec=QueryLLM)
+        self.test_dir = os.path.join(os.path.dirname(__file__), "test_data", "batch_contracts")
+        os.makedirs(self.test_dir, exist_ok=True)
+
+        self.mock_processor.extract_terms_combined.return_value = {
+            "contract_terms": {
+                "info": {"contract_number": "12345"},
+                "details": {"quantity": "10"},
+            },
+        }
+        self.mock_db.lookup_contract.return_value = {"quantity": ["10"]}
+        self.mock_llm.query_llm.return_value = {"breached": False, "breached_description": ""}
+
+        self.batch = BatchProcessor(self.mock_processor, self.mock_db, self.mock_llm, max_in_flight=2)
+
+    def tearDown(self):
+        """
+        Clean up after tests by removing the test contract directory.
+        """
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_collect_contracts(self):
+        """
+        Tests that collect_contracts returns only .docx files from a directory, sorted.
+        """
+        for name in ["b.docx", "a.docx", "notes.txt", "~$a.docx"]:
+            open(os.path.join(self.test_dir, name), "w").close()
+
+        paths = self.batch.collect_contracts(self.test_dir)
+        self.assertEqual([os.path.basename(p) for p in paths], ["a.docx", "b.docx"])
+
+    def test_process_returns_results_and_summary(self):
+        """
+        Tests that process runs every stage per contract and summarises the batch.
+        """
+        report = self.batch.process(["one.docx", "two.docx"])
+
+        self.assertEqual([r.contract_name for r in report.results], ["one", "two"])
+        self.assertTrue(all(r.succeeded for r in report.results))
+        self.assertEqual(self.mock_db.lookup_contract.call_count, 2)
+        self.assertEqual(self.mock_processor.extract_terms_combined.call_count, 2)  # One LLM extraction per contract
+        self.mock_db.prefetch_contracts.assert_called_once_with(["12345", "12345"])  # One ERP query per batch
+        self.mock_db.clear_prefetch.assert_called_once()
+        self.assertEqual(report.summary.total, 2)
+        self.assertEqual(report.summary.succeeded, 2)
+        self.assertEqual(report.summary.breached, 0)
+        self.mock_processor.generate_html_highlight.assert_not_called()  # No output_dir given
+
+    def test_process_captures_errors(self):
+        """
+        Tests that a failing contract is reported without failing the rest of the batch.
+        """
+        self.mock_processor.load_contract.side_effect = lambda path: self._fail_on("bad.docx", path)
+
+        report = self.batch.process(["good.docx", "bad.docx"])
+
+        self.assertTrue(report.results[0].succeeded)
+        self.assertIn("corrupt", report.results[1].error)
+        self.assertEqual(report.summary.failed, 1)
+        self.assertEqual(self.mock_db.lookup_contract.call_count, 1)  # Failed contracts skip detection
+
+    def test_max_in_flight_is_respected(self):
+        """
+        Tests that no more than max_in_flight contracts are processed at once.
+        """
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def slow_load(path):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.05)
+            with lock:
+                state["running"] -= 1
+
+        self.mock_processor.load_contract.side_effect = slow_load
+        self.batch.process([f"{i}.docx" for i in range(6)])
+
+        self.assertEqual(state["peak"], 2)
+
+    @staticmethod
+    def _fail_on(bad_path, path):
+        if path == bad_path:
+            raise ValueError("corrupt document")
+
+
+if __name__ == "__main__":
+    unittest.main()
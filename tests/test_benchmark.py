@@ -0,0 +1,89 @@
+import json
+import os
+import shutil
+import unittest
+import urllib.error
+import urllib.request
+from contract_breach_detector.modules.benchmark import BenchmarkConfig, compare_results, run_benchmark
+from contract_breach_detector.modules.mock_llm_server import MockLLMServer
+from contract_breach_detector.modules.query_llm import QueryLLM
+
+
+class TestMockLLMServer(unittest.TestCase):
+    """
+    Test suite for the MockLLMServer class.
+    """
+
+    def setUp(self):
+        """
+        Sets up a cache directory for QueryLLM.
+        """
+        self.test_dir = os.path.join(os.path.dirname(__file__), "test_data", "test_benchmark")
+        os.makedirs(self.test_dir, exist_ok=True)
+
+    def tearDown(self):
+        """
+        Clean up after tests by removing the test directory.
+        """
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_query_llm_receives_canned_responses(self):
+        """
+        Tests that QueryLLM pointed at the server gets the response matching its prompt.
+        """
+        with MockLLMServer(responses={"Contract Number: 1\n": {"contract": 1}}) as server:
+            llm = QueryLLM(cache_dir=self.test_dir, base_url=server.url, api_key="mock")
+
+            matched = llm.query_llm([{"role": "user", "content": "Contract Number: 1\nDetails"}])
+            fallback = llm.query_llm([{"role": "user", "content": "Anything else"}])
+
+        self.assertEqual(matched, {"contract": 1})
+        self.assertEqual(fallback, {"breached": False, "breached_description": ""})
+        self.assertEqual(server.requests, 2)
+
+    def test_injects_errors(self):
+        """
+        Tests that failed requests return the configured status.
+        """
+        with MockLLMServer(error_rate=1.0, error_status=429) as server:
+            request = urllib.request.Request(
+                f"{server.url}/chat/completions", data=json.dumps({"messages": []}).encode(), method="POST"
+            )
+            with self.assertRaises(urllib.error.HTTPError) as raised:
+                urllib.request.urlopen(request)
+
+        self.assertEqual(raised.exception.code, 429)
+        self.assertEqual(server.errors, 1)
+
+
+class TestBenchmark(unittest.TestCase):
+    """
+    Test suite for the end-to-end benchmark harness.
+    """
+
+    def test_run_benchmark_reports_stages_and_cache(self):
+        """
+        Tests that a run processes the corpus correctly and the second pass is served from cache.
+        """
+        results = run_benchmark(BenchmarkConfig(contracts=4, latency=0.0, jitter=0.0, max_in_flight=2))
+        json.dumps(results)  # Must be serialisable for regression comparison
+
+        first, second = results["passes"]
+        self.assertEqual(first["succeeded"], 4)
+        self.assertEqual(first["label_agreement"], 1.0)
+        self.assertEqual(first["cache"]["hit_ratio"], 0.0)
+        self.assertEqual(second["cache"]["hit_ratio"], 1.0)
+        for stage in ["load_contract", "extract_terms_combined", "lookup_contract", "breach_rules", "llm_request", "contract"]:
+            self.assertIn("p99_ms", first["stages"][stage])
+        self.assertGreater(first["tokens"]["prompt"], 0)
+        self.assertEqual(second["tokens"]["prompt"], 0)
+        self.assertGreater(results["peak_rss_mb"], 0)
+
+        self.assertEqual(compare_results(results, results), [])
+        slower = json.loads(json.dumps(results))
+        slower["passes"][0]["contracts_per_second"] /= 2
+        self.assertEqual(len(compare_results(results, slower)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,10 @@
+import asyncio
+import datetime
 import unittest
-from unittest.mock import MagicMock
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from unittest.mock import AsyncMock, MagicMock
 from contract_breach_detector.modules.breach_detector import DetectBreach
 from contract_breach_detector.modules.DB_code import DataBase
 from contract_breach_detector.modules.query_llm import QueryLLM
@@ -70,6 +75,31 @@ class TestDetectBreach(unittest.TestCase):
 
         self.assertEqual(comparisons, expected_comparisons)
 
+    def test_get_comparisons_matches_across_result_formats(self):
+        """
+        Tests that pandas, NumPy and Arrow lookups produce identical comparisons, and
+        that an empty lookup is treated as missing values.
+        """
+        df = pd.DataFrame({
+            "delivery_date": pd.to_datetime(["2024-06-15"]),
+            "quantity": np.array([12]),
+            "pallet_dimensions": ["1200x1000x150"],
+        })
+        numpy_info = {column: df[column].to_numpy() for column in df.columns}
+        arrow_info = pa.table({
+            "delivery_date": [datetime.date(2024, 6, 15)],
+            "quantity": [12],
+            "pallet_dimensions": ["1200x1000x150"],
+        })
+
+        expected = self.detect_breach.get_comparisons(df)
+        self.assertIn("The delivered value was 2024-06-15 00:00:00.", expected[0])
+        self.assertEqual(self.detect_breach.get_comparisons(numpy_info), expected)
+        self.assertEqual(self.detect_breach.get_comparisons(arrow_info), expected)
+
+        empty = self.detect_breach.get_comparisons({"quantity": np.array([])})
+        self.assertTrue(all(c.endswith("The delivered value was .") for c in empty))
+
     def test_analyse_comparisons(self):
         """
         Tests the analyse_comparisons method to ensure it queries the LLM
@@ -99,6 +129,60 @@ class TestDetectBreach(unittest.TestCase):
         self.mock_llm.query_llm.assert_called_once()  # Ensure LLM was called
         self.assertEqual(result, mock_llm_response)  # Ensure result matches mock response
 
+    def test_detect_breach_skips_llm_when_rules_decide(self):
+        """
+        Tests that detect_breach decides typed fields locally without querying the LLM.
+        """
+        erp_info = {
+            "delivery_date": ["2024-06-20"],
+            "quantity": ["8"],
+            "pallet_dimensions": ["1200x1000x150"],
+        }
+
+        result = self.detect_breach.detect_breach(erp_info)
+
+        self.mock_llm.query_llm.assert_not_called()
+        self.assertTrue(result["breached"])
+        self.assertIn("day(s) after", result["breached_description"])
+        self.assertIn("less than the contracted 10", result["breached_description"])
+        self.assertEqual([v.field for v in self.detect_breach.verdicts if v.breached], ["delivery_date", "quantity"])
+
+    def test_detect_breach_asks_llm_for_undecided_fields(self):
+        """
+        Tests that only fields the rules cannot decide are sent to the LLM.
+        """
+        self.test_contract["details"]["incoterms"] = "FOB"
+        erp_info = {
+            "delivery_date": ["2024-06-10"],
+            "quantity": ["10"],
+            "pallet_dimensions": ["1200x1000x150"],
+            "incoterms": ["CIF"],
+        }
+        self.mock_llm.query_llm.return_value = {"breached": True, "breached_description": "Wrong incoterms."}
+
+        result = self.detect_breach.detect_breach(erp_info)
+
+        messages = self.mock_llm.query_llm.call_args.args[0]
+        self.assertIn("incoterms should be FOB", messages[1]["content"])
+        self.assertNotIn("quantity", messages[1]["content"])
+        self.assertEqual(result, {"breached": True, "breached_description": "Wrong incoterms."})
+
+    def test_aanalyse_comparisons(self):
+        """
+        Tests the aanalyse_comparisons method sends the same prompt through the async client.
+        """
+        mock_comparisons = [
+            "The contract states that the value for quantity should be 10. "
+            "The delivered value was 8.",
+        ]
+        mock_llm_response = {"breached": True, "breached_description": "Short delivery."}
+        self.mock_llm.aquery_llm = AsyncMock(return_value=mock_llm_response)
+
+        result = asyncio.run(self.detect_breach.aanalyse_comparisons(mock_comparisons))
+
+        self.mock_llm.aquery_llm.assert_awaited_once_with(self.detect_breach._analysis_messages(mock_comparisons))
+        self.assertEqual(result, mock_llm_response)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,92 @@
+import datetime
+import unittest
+import numpy as np
+from contract_breach_detector.modules.breach_rules import (
+    BreachRules, is_short, parse_amount, parse_date, parse_dimensions
+)
+
+
+class TestBreachRules(unittest.TestCase):
+    """
+    Test suite for the BreachRules engine and its parsers.
+    """
+
+    def setUp(self):
+        """
+        Sets up a rule engine with default tolerances and a delivered ERP row.
+        """
+        self.rules = BreachRules()
+        self.erp_row = {
+            "delivery_date": np.datetime64("2023-10-20"),
+            "quantity": 73,
+            "base_unit_of_measure": "Ton",
+            "weight": 73000.0,
+            "pallet_dimensions": "1200mm x 1000mm x 150mm",
+        }
+
+    def _verdict(self, field, contract_value, rules=None):
+        return (rules or self.rules).evaluate_field(field, contract_value, self.erp_row)
+
+    def test_parsers(self):
+        """
+        Tests parsing of dates, amounts with units and pallet dimensions.
+        """
+        self.assertEqual(parse_date("20 October 2023"), datetime.date(2023, 10, 20))
+        self.assertEqual(parse_amount("73,000 kg"), (73000.0, "mass"))
+        self.assertEqual(parse_amount("73 tons"), (73000.0, "mass"))
+        self.assertEqual(parse_amount(5, default_unit="Reel"), (5.0, "count"))
+        self.assertIsNone(parse_amount("73 furlongs"))
+        self.assertEqual(parse_dimensions("120 x 100 x 15 cm"), (1200.0, 1000.0, 150.0))
+
+    def test_delivery_date(self):
+        """
+        Tests that early or on-time delivery passes and late delivery breaches, within tolerance.
+        """
+        self.assertFalse(self._verdict("delivery_date", "2023-10-25").breached)
+        self.assertTrue(self._verdict("delivery_date", "2023-10-18").breached)
+        self.assertFalse(self._verdict("delivery_date", "2023-10-18", BreachRules(date_tolerance_days=2)).breached)
+
+    def test_quantity_and_weight_convert_units(self):
+        """
+        Tests that quantities and weights are compared after unit conversion.
+        """
+        self.assertFalse(self._verdict("quantity", "73,000 kg").breached)
+        self.assertFalse(self._verdict("quantity", "70").breached)  # Bare numbers use the ERP unit
+        self.assertTrue(self._verdict("quantity", "80 tonnes").breached)
+        self.assertTrue(self._verdict("weight", "74 t").breached)
+        self.assertIsNone(self._verdict("quantity", "73 boxes").breached)  # Cannot convert
+
+    def test_float_rounding_is_not_a_shortfall(self):
+        """
+        Tests that an amount equal up to float rounding, e.g. after a unit conversion or a
+        JSON round trip, is not a breach, while a real shortfall still is.
+        """
+        self.assertGreater(4.2 * 0.001, 0.0042)  # "4.2 g" converts to slightly more than 0.0042 kg
+        self.erp_row["weight"] = 0.0042
+        self.assertFalse(self._verdict("weight", "4.2 g").breached)
+        self.assertTrue(self._verdict("weight", "4.3 g").breached)
+
+        delivered = np.array([0.0042, 0.0042, 0.0041])
+        expected = np.array([4.2 * 0.001, 0.0042, 0.0042])
+        np.testing.assert_array_equal(is_short(delivered, expected), [False, False, True])
+
+    def test_pallet_dimensions(self):
+        """
+        Tests that pallet dimensions match in any unit or orientation, and mismatches breach.
+        """
+        self.assertFalse(self._verdict("pallet_dimensions", "100cm x 120cm x 15cm").breached)
+        self.assertTrue(self._verdict("pallet_dimensions", "1100mm x 1000mm x 150mm").breached)
+
+    def test_missing_and_unknown_fields(self):
+        """
+        Tests that missing values breach for clarification and unknown fields are left undecided.
+        """
+        missing = self.rules.evaluate_field("quantity", "10", {"quantity": ""})
+        self.assertTrue(missing.breached)
+        self.assertIn("clarification", missing.reason)
+        self.erp_row["incoterms"] = "CIF"
+        self.assertIsNone(self._verdict("incoterms", "FOB").breached)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import glob
+import os
+import shutil
+import unittest
+import pandas as pd
+from contract_breach_detector.modules.bulk_data_generator import BulkDataGenerator
+from contract_breach_detector.modules.DB_code import DataBase
+from contract_breach_detector.modules.portfolio_evaluator import PortfolioEvaluator
+
+
+class TestBulkDataGenerator(unittest.TestCase):
+    """
+    Test suite for the BulkDataGenerator class.
+    """
+
+    def setUp(self):
+        """
+        Sets up an output directory for generated shards.
+        """
+        self.test_dir = os.path.join(os.path.dirname(__file__), "test_data", "test_bulk")
+        os.makedirs(self.test_dir, exist_ok=True)
+
+    def tearDown(self):
+        """
+        Clean up after tests by removing the output directory.
+        """
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_shards_are_reproducible_and_unique(self):
+        """
+        Tests that a seed reproduces the same shard and ids are unique across shards.
+        """
+        generator = BulkDataGenerator(1001, shards=3, seed=42, breach_fraction=0.25)
+        again = BulkDataGenerator(1001, shards=3, seed=42, breach_fraction=0.25, workers=4)
+        pd.testing.assert_frame_equal(generator.generate_shard(1)["items"], again.generate_shard(1)["items"])
+
+        shards = [generator.generate_shard(i) for i in range(3)]
+        items = pd.concat([shard["items"] for shard in shards])
+        deliveries = pd.concat([shard["deliveries"] for shard in shards])
+        self.assertEqual(len(items), 1001)
+        self.assertTrue(items["item_id"].is_unique)
+        self.assertTrue(deliveries["delivery_id"].is_unique)
+        self.assertTrue(items["delivery_id"].isin(deliveries["delivery_id"]).all())
+
+        contracts = pd.concat([shard["contracts"] for shard in shards])
+        self.assertAlmostEqual(contracts["breached"].mean(), 0.25, delta=0.05)
+
+    def test_written_shards_load_and_match_labels(self):
+        """
+        Tests that written shards load into DataBase and the portfolio evaluator agrees
+        with the ground-truth breach labels.
+        """
+        for output_format in ["parquet", "ndjson"]:
+            BulkDataGenerator(600, shards=2, seed=1, breach_fraction=0.3, output_format=output_format,
+                              workers=2).write(self.test_dir)
+            database = DataBase(
+                os.path.join(self.test_dir, f"deliveries-*.{output_format}"),
+                os.path.join(self.test_dir, f"items-*.{output_format}"),
+            )
+            contract_paths = sorted(glob.glob(os.path.join(self.test_dir, f"contracts-*.{output_format}")))
+            read = pd.read_parquet if output_format == "parquet" else lambda path: pd.read_json(path, lines=True)
+            contracts = pd.concat([read(path) for path in contract_paths], ignore_index=True)
+
+            report = PortfolioEvaluator(database).evaluate(contracts)
+
+            self.assertEqual(report.matrix["breached"].tolist(), contracts["breached"].tolist())
+            database.con.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
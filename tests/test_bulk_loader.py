@@ -0,0 +1,107 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+from docx import Document
+from contract_breach_detector.modules.batch_pipeline import BatchProcessor
+from contract_breach_detector.modules.bulk_loader import BulkContractLoader
+from contract_breach_detector.modules.contract_processor import ContractProcessor
+from contract_breach_detector.modules.DB_code import DataBase
+from contract_breach_detector.modules.parsed_contract import ParsedContract, ParsedContractCache
+from contract_breach_detector.modules.query_llm import QueryLLM
+
+
+class TestBulkContractLoader(unittest.TestCase):
+    """
+    Test suite for the BulkContractLoader class.
+    """
+
+    def setUp(self):
+        """
+        Writes a handful of small contracts and one corrupt file.
+        """
+        self.test_dir = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(7):
+            path = os.path.join(self.test_dir, f"contract_{i}.docx")
+            doc = Document()
+            doc.add_paragraph(f"Contract Number: {i}")
+            doc.add_paragraph("The goods shall be delivered no later than 15 June 2024.")
+            doc.save(path)
+            self.paths.append(path)
+        self.bad_path = os.path.join(self.test_dir, "corrupt.docx")
+        with open(self.bad_path, "w") as f:
+            f.write("not a docx")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_load_in_process_pool(self):
+        """
+        Tests that chunks parsed across processes match a serial parse, in input order,
+        and that a corrupt file is reported without stopping the load.
+        """
+        paths = self.paths[:3] + [self.bad_path] + self.paths[3:]
+        results = BulkContractLoader(workers=2, chunksize=2).load(paths)
+
+        self.assertEqual([r.path for r in results], paths)
+        self.assertEqual([r.index for r in results], list(range(len(paths))))
+        self.assertFalse(results[3].succeeded)
+        for result in results[:3] + results[4:]:
+            self.assertEqual(result.contract, ParsedContract.from_file(result.path))
+
+    def test_unordered_streaming(self):
+        """
+        Tests that unordered results cover every input once, identified by index.
+        """
+        results = list(BulkContractLoader(workers=2, chunksize=1, max_pending=2).iter_load(self.paths, ordered=False))
+
+        self.assertEqual(sorted(r.index for r in results), list(range(len(self.paths))))
+        self.assertTrue(all(r.path == self.paths[r.index] for r in results))
+
+    def test_contract_cache(self):
+        """
+        Tests that workers share the contract cache and its hit and miss counts are kept.
+        """
+        cache = ParsedContractCache(os.path.join(self.test_dir, "cache"))
+        loader = BulkContractLoader(workers=2, chunksize=2, contract_cache=cache)
+
+        first = loader.load(self.paths)
+        second = loader.load(self.paths)
+
+        self.assertFalse(any(r.cached for r in first))
+        self.assertTrue(all(r.cached for r in second))
+        self.assertEqual((cache.hits, cache.misses), (7, 7))
+        self.assertEqual([r.contract.text for r in first], [r.contract.text for r in second])
+
+    def test_batch_processor_uses_bulk_loader(self):
+        """
+        Tests that BatchProcessor extracts the contracts parsed by the bulk loader, in input
+        order, and reports load errors per contract.
+        """
+        mock_processor = MagicMock(spec=ContractProcessor)
+        extracted = {"contract_terms": {"info": {"contract_number": "1"}, "details": {"quantity": "10"}}}
+        mock_processor.extract_terms_combined.return_value = extracted
+        mock_processor.aextract_terms_combined = AsyncMock(return_value=extracted)
+        mock_db = MagicMock(spec=DataBase)
+        mock_db.lookup_contract.return_value = {"quantity": ["10"]}
+        mock_llm = MagicMock(spec=QueryLLM)
+        mock_llm.query_llm.return_value = {"breached": False, "breached_description": ""}
+        batch = BatchProcessor(
+            mock_processor, mock_db, mock_llm, bulk_loader=BulkContractLoader(workers=2, chunksize=2)
+        )
+        paths = self.paths + [self.bad_path]
+
+        for report in (batch.process(paths), asyncio.run(batch.aprocess(paths))):
+            self.assertEqual([r.source_path for r in report.results], paths)
+            self.assertEqual(report.summary.failed, 1)
+            self.assertFalse(report.results[-1].succeeded)
+        mock_processor.load_contract.assert_not_called()
+        parsed = mock_processor.extract_terms_combined.call_args[0][0]
+        self.assertIsInstance(parsed, ParsedContract)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,272 @@
+import os
+import shutil
+import threading
+import time
+import unittest
+from contract_breach_detector.modules.cache_store import (
+    CacheCompactor,
+    CachePolicy,
+    MemoryCache,
+    PickleDirCache,
+    SQLiteCache,
+    migrate_pickle_dir,
+)
+
+
+class TestPickleDirCache(unittest.TestCase):
+    """
+    Test suite for the PickleDirCache backend.
+    """
+
+    def setUp(self):
+        """
+        Sets up an empty pickle cache directory.
+        """
+        self.cache_dir = os.path.join(os.path.dirname(__file__), "test_data", "test_pickle_cache")
+        self.cache = PickleDirCache(self.cache_dir)
+
+    def tearDown(self):
+        """
+        Clean up after tests by removing the cache directory.
+        """
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_set_get_delete(self):
+        """
+        Tests that entries round-trip and can be deleted.
+        """
+        self.cache.set("abc", {"response": "value"})
+        self.assertEqual(self.cache.get("abc"), {"response": "value"})
+        self.assertEqual(list(self.cache.keys()), ["abc"])
+
+        self.cache.delete("abc")
+        self.assertIsNone(self.cache.get("abc"))
+
+    def test_corrupted_entry_is_removed(self):
+        """
+        Tests that an empty pickle is treated as a miss and deleted.
+        """
+        open(self.cache.path("broken"), "wb").close()
+
+        self.assertIsNone(self.cache.get("broken"))
+        self.assertFalse(os.path.exists(self.cache.path("broken")))
+
+    def test_gc_expires_and_evicts_lru(self):
+        """
+        Tests that gc removes entries past the TTL, then least recently used entries over quota.
+        """
+        now = time.time()
+        for key, age in [("old", 1000), ("a", 30), ("b", 20), ("c", 10)]:
+            self.cache.set(key, key)
+            os.utime(self.cache.path(key), (now - age, now - age))
+
+        result = self.cache.gc(CachePolicy(max_entries=2, ttl=500), now=now)
+
+        self.assertEqual((result["expired"], result["evicted"], result["entries"]), (1, 1, 2))
+        self.assertEqual(sorted(self.cache.keys()), ["b", "c"])
+
+    def test_lfu_is_rejected(self):
+        """
+        Tests that LFU eviction is refused rather than silently applied in LRU order.
+        """
+        policy = CachePolicy(max_entries=1, eviction="lfu")
+
+        with self.assertRaises(ValueError):
+            self.cache.gc(policy)
+        with self.assertRaises(ValueError):
+            CacheCompactor(self.cache, policy)
+
+    def test_ttl_expires_on_read(self):
+        """
+        Tests that an entry older than the TTL reads as a miss.
+        """
+        self.cache.ttl = 60
+        self.cache.set("stale", 1)
+        past = time.time() - 120
+        os.utime(self.cache.path("stale"), (past, past))
+
+        self.assertIsNone(self.cache.get("stale"))
+        self.assertFalse(os.path.exists(self.cache.path("stale")))
+
+
+class TestSQLiteCache(unittest.TestCase):
+    """
+    Test suite for the SQLiteCache backend.
+    """
+
+    def setUp(self):
+        """
+        Sets up an empty SQLite cache file.
+        """
+        self.test_dir = os.path.join(os.path.dirname(__file__), "test_data", "test_sqlite_cache")
+        self.cache = SQLiteCache(os.path.join(self.test_dir, "cache.sqlite"))
+
+    def tearDown(self):
+        """
+        Clean up after tests by removing the cache file.
+        """
+        self.cache.close()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_set_get_replace_delete(self):
+        """
+        Tests point lookups, replacement and deletion.
+        """
+        self.cache.set("abc", {"response": "first"})
+        self.cache.set("abc", {"response": "second"})
+        self.assertEqual(self.cache.get("abc"), {"response": "second"})
+        self.assertEqual(len(self.cache), 1)
+
+        self.cache.delete("abc")
+        self.assertIsNone(self.cache.get("abc"))
+        self.assertNotIn("abc", self.cache)
+
+    def test_uses_wal_mode(self):
+        """
+        Tests that the store is opened in WAL mode so readers do not block on writers.
+        """
+        mode = self.cache._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_concurrent_threads(self):
+        """
+        Tests that several threads can write and read the store at once.
+        """
+        def worker(n):
+            for i in range(20):
+                self.cache.set(f"{n}-{i}", i)
+                self.assertEqual(self.cache.get(f"{n}-{i}"), i)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.cache), 80)
+
+    def test_gc_enforces_byte_quota_with_lfu(self):
+        """
+        Tests that LFU eviction removes the least read entries until under the byte quota.
+        """
+        for key in ["a", "b", "c"]:
+            self.cache.set(key, "x" * 100)
+        for _ in range(3):
+            self.cache.get("a")
+        self.cache.get("c")
+
+        _, size = self.cache.usage()
+        result = self.cache.gc(CachePolicy(max_bytes=size - 1, eviction="lfu"))
+
+        self.assertEqual(result["evicted"], 1)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+
+    def test_ttl_and_gc_expiry(self):
+        """
+        Tests that expired rows read as misses and are removed by gc.
+        """
+        self.cache.set("stale", 1)
+        self.cache.set("fresh", 2)
+        with self.cache._connection() as con:
+            con.execute("UPDATE cache SET created_at = created_at - 1000 WHERE key = 'stale'")
+
+        result = self.cache.gc(CachePolicy(ttl=500))
+        self.assertEqual(result["expired"], 1)
+        self.assertEqual(list(self.cache.keys()), ["fresh"])
+
+        self.cache.ttl = 0.0
+        self.assertIsNone(self.cache.get("fresh"))
+
+    def test_compactor_runs_in_background(self):
+        """
+        Tests that the CacheCompactor keeps the store within quota on its own thread.
+        """
+        for i in range(10):
+            self.cache.set(str(i), i)
+
+        compactor = CacheCompactor(self.cache, CachePolicy(max_entries=3), interval=0.01)
+        compactor.start()
+        deadline = time.time() + 2
+        while compactor.last_result is None and time.time() < deadline:
+            time.sleep(0.01)
+        compactor.stop()
+
+        self.assertEqual(len(self.cache), 3)
+
+    def test_migrate_pickle_dir(self):
+        """
+        Tests that migrate_pickle_dir imports every valid .pkl entry.
+        """
+        source = PickleDirCache(os.path.join(self.test_dir, "pkl"))
+        source.set("one", {"response": 1})
+        source.set("two", {"response": 2})
+        open(source.path("broken"), "wb").close()  # Corrupted entries are skipped
+
+        imported = migrate_pickle_dir(source.cache_dir, self.cache, remove_source=True, batch_size=1)
+
+        self.assertEqual(imported, 2)
+        self.assertEqual(self.cache.get("one"), {"response": 1})
+        self.assertEqual(self.cache.get("two"), {"response": 2})
+        self.assertEqual(list(source.keys()), [])
+
+
+class TestMemoryCache(unittest.TestCase):
+    """
+    Test suite for the in-process MemoryCache tier.
+    """
+
+    def test_evicts_least_recently_used_by_entries(self):
+        """
+        Tests that the least recently used entry is evicted at the entry limit.
+        """
+        cache = MemoryCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_evicts_by_bytes(self):
+        """
+        Tests that the byte limit is enforced and oversized entries are not held.
+        """
+        cache = MemoryCache(max_entries=100, max_bytes=200)
+        cache.set("a", "x" * 100)
+        cache.set("b", "y" * 100)  # Together these exceed 200 pickled bytes
+        self.assertEqual(len(cache), 1)
+        self.assertLessEqual(cache.stats()["bytes"], 200)
+
+        cache.set("huge", "z" * 1000)
+        self.assertIsNone(cache.get("huge"))
+
+    def test_counts_hits_and_misses(self):
+        """
+        Tests the hit, miss and hit ratio counters.
+        """
+        cache = MemoryCache()
+        cache.set("a", {"response": 1})
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_ratio"], 0.5)
+
+    def test_returns_independent_copies(self):
+        """
+        Tests that mutating a returned value does not change the cached entry.
+        """
+        cache = MemoryCache()
+        cache.set("a", {"response": 1})
+        cache.get("a")["response"] = 2
+
+        self.assertEqual(cache.get("a"), {"response": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,12 @@
 import sys
 import os
+import asyncio
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 from docx import Document
 from contract_breach_detector.modules.contract_processor import ContractProcessor
 from contract_breach_detector.modules.query_llm import QueryLLM
+from contract_breach_detector.modules.parsed_contract import ParsedContract
 
 
 class TestContractProcessor(unittest.TestCase):
@@ -60,6 +62,37 @@ class TestContractProcessor(unittest.TestCase):
         self.mock_llm.query_llm.assert_called_once()  # Ensure LLM was called
         self.assertEqual(result, mock_response)  # Ensure response matches mock
 
+    def test_extract_terms_accepts_parsed_contract(self):
+        """
+        Tests that a ParsedContract produces exactly the same prompt as the Document it came from.
+        """
+        doc = Document()
+        doc.add_paragraph("Contract Number: 12345")
+        doc.add_paragraph("Delivery Date: 2024-06-15")
+        parsed = ParsedContract.from_document(doc)
+
+        terms_format = {"contract_number": ""}
+        self.assertEqual(
+            self.processor._terms_messages(parsed, terms_format),
+            self.processor._terms_messages(doc, terms_format),
+        )
+
+    def test_aextract_terms(self):
+        """
+        Tests the aextract_terms method sends the same prompt as extract_terms through the async client.
+        """
+        mock_response = {"contract_number": "12345"}
+        self.mock_llm.aquery_llm = AsyncMock(return_value=mock_response)
+
+        doc = Document()
+        doc.add_paragraph("Contract Number: 12345")
+
+        terms_format = {"contract_number": ""}
+        result = asyncio.run(self.processor.aextract_terms(doc, terms_format))
+
+        self.mock_llm.aquery_llm.assert_awaited_once_with(self.processor._terms_messages(doc, terms_format))
+        self.assertEqual(result, mock_response)
+
     def test_extract_terms_with_locations(self):
         """
         Tests the extract_terms_with_locations method to ensure it correctly queries the LLM and returns field locations.
@@ -81,6 +114,51 @@ class TestContractProcessor(unittest.TestCase):
         self.mock_llm.query_llm.assert_called_once()  # Ensure LLM was called
         self.assertEqual(result, mock_response)  # Ensure response matches mock
 
+    def test_extract_terms_combined(self):
+        """
+        Tests the extract_terms_combined method sends the document once and splits the response per schema.
+        """
+        mock_response = {
+            "questions": {"What is the item being delivered": "Copper cable"},
+            "terms": {"contract_number": "12345"},
+            "locations": {"contract_number": {"value": "12345", "start_position": "17", "end_position": "22"}},
+        }
+        self.mock_llm.query_llm.return_value = mock_response
+
+        doc = Document()
+        doc.add_paragraph("Contract Number: 12345")
+
+        schemas = {
+            "questions": {"What is the item being delivered": ""},
+            "terms": {"contract_number": ""},
+            "locations": self.processor.location_terms(["contract_number"]),
+        }
+        result = self.processor.extract_terms_combined(doc, schemas)
+
+        self.mock_llm.query_llm.assert_called_once()  # One query for every schema
+        self.assertEqual(result, mock_response)
+        sent = self.mock_llm.query_llm.call_args.args[0]
+        self.assertEqual(sum("Contract Number: 12345" in m["content"] for m in sent), 1)
+
+    def test_extract_terms_combined_requeries_missing_sections(self):
+        """
+        Tests that a section missing from the combined response is requested on its own.
+        """
+        self.mock_llm.query_llm.side_effect = [
+            {"terms": {"contract_number": "12345"}},
+            {"What is the item being delivered": "Copper cable"},
+        ]
+
+        doc = Document()
+        doc.add_paragraph("Contract Number: 12345")
+
+        schemas = {"questions": {"What is the item being delivered": ""}, "terms": {"contract_number": ""}}
+        result = self.processor.extract_terms_combined(doc, schemas)
+
+        self.assertEqual(self.mock_llm.query_llm.call_count, 2)
+        self.assertEqual(result["questions"], {"What is the item being delivered": "Copper cable"})
+        self.assertEqual(result["terms"], {"contract_number": "12345"})
+
     def test_generate_html_highlight(self):
         """
         Tests the generate_html_highlight method to ensure it correctly generates an HTML file with highlights.
@@ -0,0 +1,203 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from contract_breach_detector.modules.batch_pipeline import BatchProcessor
+from contract_breach_detector.modules.contract_processor import ContractProcessor
+from contract_breach_detector.modules.contract_watcher import ContractWatcher
+from contract_breach_detector.modules.DB_code import DataBase
+from contract_breach_detector.modules.query_llm import QueryLLM
+
+CONTRACT_NUMBERS = {"a": 111, "b": 222}
+
+
+class TestContractWatcher(unittest.TestCase):
+    """
+    Test suite for the ContractWatcher class, with a real ERP database over temporary JSON files.
+    """
+
+    def setUp(self):
+        """
+        Writes two contracts and their ERP data, and builds a watcher over them.
+        """
+        self.test_dir = tempfile.mkdtemp()
+        self.watch_dir = os.path.join(self.test_dir, "contracts")
+        os.makedirs(self.watch_dir)
+        for name in CONTRACT_NUMBERS:
+            self._write(os.path.join(self.watch_dir, f"{name}.docx"), name)
+
+        self.deliveries_path = os.path.join(self.test_dir, "deliveries.json")
+        self.items_path = os.path.join(self.test_dir, "items.json")
+        self._write(self.deliveries_path, json.dumps([
+            {"delivery_id": 1, "delivery_date": "2024-06-01", "supplier": "Supplier A"},
+            {"delivery_id": 2, "delivery_date": "2024-06-01", "supplier": "Supplier B"},
+        ]))
+        self._write_items({111: 10, 222: 10})
+        self.db = DataBase(self.deliveries_path, self.items_path)
+
+        self.mock_processor = MagicMock(spec=ContractProcessor)
+        self.mock_processor.load_contract.side_effect = lambda path: path
+        self.mock_processor.extract_terms_combined.side_effect = lambda path, schemas: {
+            "contract_terms": {
+                "info": {"contract_number": str(CONTRACT_NUMBERS[os.path.basename(path)[0]])},
+                "details": {"quantity": "10 units"},
+            },
+        }
+        self.mock_llm = MagicMock(spec=QueryLLM)
+        batch = BatchProcessor(self.mock_processor, self.db, self.mock_llm)
+        self.manifest_path = os.path.join(self.test_dir, "manifest.json")
+        self.watcher = ContractWatcher(batch, self.watch_dir, manifest_path=self.manifest_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    @staticmethod
+    def _write(path, content):
+        with open(path, "w") as f:
+            f.write(content)
+        # Step the mtime so edits within the filesystem's timestamp resolution are still seen
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+    def _write_items(self, quantities):
+        self._write(self.items_path, json.dumps([
+            {"delivery_id": i + 1, "contract_number": number, "quantity": quantity, "base_unit_of_measure": "EA"}
+            for i, (number, quantity) in enumerate(quantities.items())
+        ]))
+
+    def _names(self, results):
+        return sorted(r.contract_name for r in results)
+
+    def test_incremental_scans(self):
+        """
+        Tests that only new or edited contracts are extracted, that an ERP change re-checks
+        only the contracts whose rows changed, and that removed contracts are dropped.
+        """
+        first = self.watcher.scan()
+        self.assertEqual(self._names(first.extracted), ["a", "b"])
+        self.assertFalse(any(r.breach["breached"] for r in first.extracted))
+
+        idle = self.watcher.scan()
+        self.assertEqual((idle.extracted, idle.reevaluated, idle.unchanged), ([], [], 2))
+        self.assertFalse(idle.erp_changed)
+
+        # Only contract 222's rows change, so only b is re-checked, without extraction
+        self._write_items({111: 10, 222: 5})
+        erp_update = self.watcher.scan()
+        self.assertTrue(erp_update.erp_changed)
+        self.assertEqual(erp_update.extracted, [])
+        self.assertEqual(self._names(erp_update.reevaluated), ["b"])
+        self.assertTrue(erp_update.reevaluated[0].breach["breached"])
+        self.assertEqual(self.mock_processor.extract_terms_combined.call_count, 2)
+
+        self._write(os.path.join(self.watch_dir, "a.docx"), "edited")
+        edit = self.watcher.scan()
+        self.assertEqual(self._names(edit.extracted), ["a"])
+        self.assertEqual(self.mock_processor.extract_terms_combined.call_count, 3)
+
+        os.remove(os.path.join(self.watch_dir, "b.docx"))
+        removal = self.watcher.scan()
+        self.assertEqual([os.path.basename(p) for p in removal.removed], ["b.docx"])
+        self.assertEqual(self._names(self.watcher.results()), ["a"])
+
+    def test_resumes_from_manifest(self):
+        """
+        Tests that a restarted watcher reprocesses nothing, and that touching a contract
+        without changing it does not trigger extraction.
+        """
+        self.watcher.scan()
+        path = os.path.join(self.watch_dir, "a.docx")
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+        restarted = ContractWatcher(self.watcher.batch, self.watch_dir, manifest_path=self.manifest_path)
+        report = restarted.scan()
+
+        self.assertEqual((report.extracted, report.reevaluated, report.unchanged), ([], [], 2))
+        self.assertEqual(self.mock_processor.extract_terms_combined.call_count, 2)
+        self.assertEqual(self._names(restarted.results()), ["a", "b"])
+
+    def test_failed_contract_retried_after_edit_or_interval(self):
+        """
+        Tests that a contract that failed is not re-extracted on every poll, only once it is
+        edited or `retry_interval` has passed.
+        """
+        extract = self.mock_processor.extract_terms_combined.side_effect
+
+        def failing_b(path, schemas):
+            if os.path.basename(path) == "b.docx":
+                raise RuntimeError("LLM unavailable")
+            return extract(path, schemas)
+
+        self.mock_processor.extract_terms_combined.side_effect = failing_b
+        first = self.watcher.scan()
+        self.assertIsNotNone(next(r for r in first.extracted if r.contract_name == "b").error)
+
+        idle = self.watcher.scan()
+        self.assertEqual((idle.extracted, idle.unchanged), ([], 2))
+        self.assertEqual(self.mock_processor.extract_terms_combined.call_count, 2)
+
+        self._write(os.path.join(self.watch_dir, "b.docx"), "edited")
+        self.assertEqual(self._names(self.watcher.scan().extracted), ["b"])
+
+        self.watcher.retry_interval = 0
+        self.assertEqual(self._names(self.watcher.scan().extracted), ["b"])
+        self.assertEqual(self.mock_processor.extract_terms_combined.call_count, 4)
+
+    def test_run_continues_after_failed_scan(self):
+        """
+        Tests that a scan that raises is reported and the next poll carries on.
+        """
+        source_state = self.db.source_state
+        failures = [FileNotFoundError("items.json is being replaced")]
+
+        def flaky_source_state():
+            if failures:
+                raise failures.pop()
+            return source_state()
+
+        self.db.source_state = flaky_source_state
+        self.watcher.poll_interval = 0
+        reports, errors = [], []
+        self.watcher.run(iterations=2, on_scan=reports.append, on_error=errors.append)
+
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], FileNotFoundError)
+        self.assertEqual(len(reports), 1)
+        self.assertEqual(self._names(reports[0].extracted), ["a", "b"])
+        self.assertTrue(reports[0].erp_changed)
+
+    def test_failed_recheck_is_repeated(self):
+        """
+        Tests that when re-checking after an ERP change fails, the next scan re-checks the
+        affected contracts again instead of treating their rows as already seen.
+        """
+        self.watcher.scan()
+        self._write_items({111: 10, 222: 5})
+
+        reevaluate = self.watcher.batch.reevaluate
+        failures = [RuntimeError("database is locked")]
+
+        def flaky_reevaluate(results):
+            if failures:
+                raise failures.pop()
+            return reevaluate(results)
+
+        self.watcher.batch.reevaluate = flaky_reevaluate
+        self.watcher.poll_interval = 0
+        reports, errors = [], []
+        self.watcher.run(iterations=2, on_scan=reports.append, on_error=errors.append)
+
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(reports[0].erp_changed)
+        self.assertEqual(self._names(reports[0].reevaluated), ["b"])
+        self.assertTrue(reports[0].reevaluated[0].breach["breached"])
+
+        idle = self.watcher.scan()
+        self.assertEqual((idle.erp_changed, idle.reevaluated), (False, []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import glob
+import json
+import os
+import random
+import shutil
+import unittest
+from docx import Document
+from contract_breach_detector.modules.breach_rules import BreachRules
+from contract_breach_detector.modules.data_generator_code import (
+    CORPUS_CONTRACT_OFFSET, ContractCorpusWriter, DeliveryFactory, ERPWriter
+)
+
+
+class TestContractCorpusWriter(unittest.TestCase):
+    """
+    Test suite for generating labelled contracts alongside the ERP data.
+    """
+
+    def setUp(self):
+        """
+        Generates a small ERP dataset with a contract for most of its items.
+        """
+        self.test_dir = os.path.join(os.path.dirname(__file__), "test_data", "test_corpus")
+        self.contracts_dir = os.path.join(self.test_dir, "contracts")
+        random.seed(7)
+        corpus = ContractCorpusWriter(self.contracts_dir, 40, breach_fraction=0.5, seed=7)
+        with ERPWriter(
+            os.path.join(self.test_dir, "deliveries.ndjson"), os.path.join(self.test_dir, "items.ndjson"), corpus=corpus
+        ) as writer:
+            for _ in range(20):
+                writer.write_delivery(DeliveryFactory())
+
+        with open(os.path.join(self.contracts_dir, "labels.json")) as f:
+            self.labels = json.load(f)
+
+    def tearDown(self):
+        """
+        Clean up after tests by removing the output directory.
+        """
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_contracts_match_erp_items(self):
+        """
+        Tests that every labelled contract exists, states its number and is an ERP item.
+        """
+        self.assertEqual(len(self.labels), 40)
+        self.assertEqual(len(glob.glob(os.path.join(self.contracts_dir, "*.docx"))), 40)
+
+        with open(os.path.join(self.test_dir, "items.ndjson")) as f:
+            items = {item["contract_number"]: item for item in map(json.loads, f)}
+
+        for filename, label in self.labels.items():
+            text = "\n".join(p.text for p in Document(os.path.join(self.contracts_dir, filename)).paragraphs)
+            self.assertIn(f"Contract Number: {label['contract_number']}", text)
+            self.assertGreater(label["contract_number"], CORPUS_CONTRACT_OFFSET)
+            self.assertEqual(items[label["contract_number"]]["quantity"], label["delivered"]["quantity"])
+
+    def test_labels_agree_with_breach_rules(self):
+        """
+        Tests that the rule engine reaches the ground-truth label for every contract.
+        """
+        rules = BreachRules()
+        breached = [label["breached"] for label in self.labels.values()]
+        self.assertTrue(any(breached) and not all(breached))
+
+        for label in self.labels.values():
+            details = {field: label["terms"][field]
+                       for field in ["delivery_date", "quantity", "weight", "pallet_dimensions"]}
+            verdicts = rules.evaluate(details, label["delivered"])
+            self.assertTrue(all(verdict.decided for verdict in verdicts))
+            self.assertEqual(
+                [verdict.field for verdict in verdicts if verdict.breached],
+                [label["breach_field"]] if label["breached"] else [],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
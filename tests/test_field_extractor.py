@@ -0,0 +1,104 @@
+import unittest
+from unittest.mock import MagicMock
+from contract_breach_detector.modules.contract_processor import ContractProcessor
+from contract_breach_detector.modules.field_extractor import FieldExtractor, merge_terms
+from contract_breach_detector.modules.metrics import InMemoryMetrics
+from contract_breach_detector.modules.parsed_contract import ParsedContract
+import contract_breach_detector.modules.structured_outputs as structured_outputs
+
+CONTRACT = [
+    "SUPPLY AGREEMENT",
+    "Contract Number: 332889",
+    'This Supply Agreement is entered into between Hurst and Sons (the "Buyer") and '
+    'Myers, Jones and Becker (the "Supplier").',
+    "1. Goods. The Supplier shall supply 1,200 reels of LightBlue Widget to the Buyer.",
+    "2. Delivery. The goods shall be delivered no later than 15 June 2024.",
+    "3. Weight. The total net weight of the goods shall be not less than 35.13 kg.",
+    "4. Packaging. The goods shall be delivered on pallets measuring 1200mm x 1000mm x 150mm.",
+]
+
+
+class TestFieldExtractor(unittest.TestCase):
+    """
+    Test suite for the FieldExtractor class and its use in ContractProcessor.
+    """
+
+    def setUp(self):
+        self.contract = ParsedContract.from_paragraphs(CONTRACT)
+        self.extractor = FieldExtractor()
+
+    def test_extract_standard_contract(self):
+        """
+        Tests that every deterministic field is read with its normalised value and offsets.
+        """
+        matches = self.extractor.extract(self.contract)
+
+        self.assertEqual(matches["contract_number"].value, "332889")
+        self.assertEqual(matches["supplier_name"].value, "Myers, Jones and Becker")
+        self.assertEqual(matches["delivery_date"].value, "2024-06-15")
+        self.assertEqual(matches["quantity"].value, "1,200 reels")
+        self.assertEqual(matches["weight"].value, "35.13 kg")
+        self.assertEqual(matches["pallet_dimensions"].value, "1200mm x 1000mm x 150mm")
+        date = matches["delivery_date"]
+        self.assertEqual(self.contract.text[date.start:date.end], "15 June 2024")
+
+    def test_conflicting_values_lower_confidence(self):
+        """
+        Tests that a field stated with different values is left to the LLM.
+        """
+        contract = ParsedContract.from_paragraphs(CONTRACT + ["Delivery Date: 20 June 2024"])
+        filled, remaining = self.extractor.fill(contract, structured_outputs.contract_enforcement)
+
+        self.assertLess(self.extractor.extract(contract)["delivery_date"].confidence, self.extractor.min_confidence)
+        self.assertNotIn("delivery_date", filled["details"])
+        self.assertEqual(remaining, {"details": {"delivery_date": "YYYY-MM-DD"}})
+
+    def test_fill_locations(self):
+        """
+        Tests that location fields, including aliased names, are filled with text and offsets.
+        """
+        terms = ContractProcessor.location_terms(["deliver_date", "quantity", "penalty"])
+        filled, remaining = self.extractor.fill(self.contract, terms)
+
+        location = filled["deliver_date"]
+        self.assertEqual(self.contract.text[location["start_position"]:location["end_position"]], "15 June 2024")
+        self.assertEqual(filled["quantity"]["value"], "1,200 reels")
+        self.assertEqual(list(remaining), ["penalty"])
+
+    def test_merge_terms(self):
+        """
+        Tests that local values are merged into a nested LLM response and take precedence.
+        """
+        response = {"info": {"supplier_name": "LLM Supplier", "contract_number": "1"}, "details": {"weight": "1 kg"}}
+        merged = merge_terms(response, {"info": {"contract_number": "332889"}})
+
+        self.assertEqual(merged["info"], {"supplier_name": "LLM Supplier", "contract_number": "332889"})
+        self.assertEqual(merged["details"], {"weight": "1 kg"})
+        self.assertEqual(merge_terms(None, {"a": "b"}), {"a": "b"})
+
+    def test_contract_processor_skips_llm(self):
+        """
+        Tests that ContractProcessor only queries the LLM for fields the patterns cannot fill.
+        """
+        mock_llm = MagicMock()
+        metrics = InMemoryMetrics()
+        processor = ContractProcessor(mock_llm, metrics=metrics, field_extractor=self.extractor)
+
+        terms = processor.extract_terms(self.contract, structured_outputs.contract_enforcement)
+        mock_llm.query_llm.assert_not_called()
+        self.assertEqual(terms["details"]["delivery_date"], "2024-06-15")
+        self.assertEqual(metrics.counters["fields_extracted_locally"], 6)
+
+        mock_llm.query_llm.return_value = {"example_questions": {"What is the item being delivered": "Widgets"}}
+        results = processor.extract_terms_combined(self.contract, {
+            "example_questions": {"What is the item being delivered": ""},
+            "contract_terms": structured_outputs.contract_enforcement,
+        })
+        prompt = mock_llm.query_llm.call_args[0][0][0]["content"]
+        self.assertNotIn("contract_terms", prompt)  # Fully resolved sections are not sent
+        self.assertEqual(results["example_questions"], {"What is the item being delivered": "Widgets"})
+        self.assertEqual(results["contract_terms"]["info"]["contract_number"], "332889")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import io
+import unittest
+from contract_breach_detector.modules.html_highlight import HIGHLIGHT_OPEN, highlight_spans, write_highlighted_html
+
+
+class TestHtmlHighlight(unittest.TestCase):
+    """
+    Test suite for the HTML highlight renderer.
+    """
+
+    def _render(self, text, annotations):
+        output = io.StringIO()
+        write_highlighted_html(text, highlight_spans(annotations, len(text)), output)
+        return output.getvalue()
+
+    def test_merges_overlapping_and_nested_spans(self):
+        """
+        Tests that overlapping and nested annotations become one highlight and bad ones are skipped.
+        """
+        annotations = {
+            "outer": {"value": "x", "start_position": "0", "end_position": "10"},
+            "nested": {"value": "x", "start_position": 2, "end_position": 5},
+            "overlap": {"value": "x", "start_position": "8", "end_position": "14"},
+            "separate": {"value": "x", "start_position": "20", "end_position": "99"},
+            "empty": {"value": "", "start_position": "15", "end_position": "18"},
+            "missing": {"value": "x", "start_position": "", "end_position": ""},
+        }
+        self.assertEqual(highlight_spans(annotations, 24), [[0, 14], [20, 24]])
+
+    def test_escapes_contract_text(self):
+        """
+        Tests that markup in the contract is escaped inside and outside highlights.
+        """
+        text = "Price <b>& terms</b>: 5 < 6"
+        content = self._render(text, {"f": {"value": "<b>", "start_position": "6", "end_position": "9"}})
+
+        self.assertIn(f"Price {HIGHLIGHT_OPEN}&lt;b&gt;</span>&amp; terms&lt;/b&gt;: 5 &lt; 6", content)
+
+    def test_thousands_of_annotations(self):
+        """
+        Tests that every one of many annotations is highlighted exactly once.
+        """
+        text = "word " * 5000
+        annotations = {
+            f"field{i}": {"value": "word", "start_position": i * 5, "end_position": i * 5 + 4} for i in range(5000)
+        }
+        content = self._render(text, annotations)
+
+        self.assertEqual(content.count(HIGHLIGHT_OPEN), 5000)
+        self.assertEqual(content.count(f"{HIGHLIGHT_OPEN}word</span> "), 5000)
+
+
+if __name__ == "__main__":
+    unittest.main()
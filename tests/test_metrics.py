@@ -0,0 +1,113 @@
+import json
+import os
+import shutil
+import unittest
+from unittest.mock import MagicMock, patch
+from contract_breach_detector.modules.metrics import (
+    InMemoryMetrics, JSONLinesMetrics, MultiMetrics, PrometheusMetrics
+)
+from contract_breach_detector.modules.query_llm import QueryLLM
+
+
+class TestMetricsSinks(unittest.TestCase):
+    """
+    Test suite for the metrics sinks.
+    """
+
+    def setUp(self):
+        """
+        Sets up an output directory for file-based sinks.
+        """
+        self.test_dir = os.path.join(os.path.dirname(__file__), "test_data", "test_metrics")
+        os.makedirs(self.test_dir, exist_ok=True)
+
+    def tearDown(self):
+        """
+        Clean up after tests by removing the output directory.
+        """
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_in_memory_summary(self):
+        """
+        Tests that timings are summarised with percentiles, including for blocks that raise.
+        """
+        metrics = InMemoryMetrics()
+        for seconds in [0.01, 0.02, 0.03, 0.04]:
+            metrics.timing("lookup_contract", seconds)
+        with self.assertRaises(ValueError):
+            with metrics.timer("load_document"):
+                raise ValueError("bad document")
+        metrics.count("llm_prompt_tokens", 10, model="gpt-4o-mini")
+        metrics.count("llm_prompt_tokens", 5, model="gpt-4o-mini")
+
+        summary = metrics.summary()
+
+        self.assertEqual(summary["stages"]["lookup_contract"]["count"], 4)
+        self.assertAlmostEqual(summary["stages"]["lookup_contract"]["p50_ms"], 25.0)
+        self.assertEqual(summary["stages"]["load_document"]["count"], 1)
+        self.assertEqual(summary["counters"], {'llm_prompt_tokens{model="gpt-4o-mini"}': 15})
+
+    def test_json_lines_and_prometheus(self):
+        """
+        Tests that events are written as JSON lines and rendered in the Prometheus text format.
+        """
+        path = os.path.join(self.test_dir, "metrics.jsonl")
+        json_lines = JSONLinesMetrics(path)
+        prometheus = PrometheusMetrics(buckets=(0.1, 1.0))
+        metrics = MultiMetrics(json_lines, prometheus)
+
+        metrics.timing("extract_terms", 0.5)
+        metrics.count("llm_cache_hits")
+        json_lines.close()
+
+        with open(path) as f:
+            events = [json.loads(line) for line in f]
+        self.assertEqual([(e["type"], e["name"], e["value"]) for e in events],
+                         [("timing", "extract_terms", 0.5), ("count", "llm_cache_hits", 1)])
+
+        text = prometheus.render()
+        self.assertIn('contract_breach_detector_stage_seconds_bucket{le="0.1",stage="extract_terms"} 0', text)
+        self.assertIn('contract_breach_detector_stage_seconds_bucket{le="1.0",stage="extract_terms"} 1', text)
+        self.assertIn('contract_breach_detector_stage_seconds_count{stage="extract_terms"} 1', text)
+        self.assertIn("contract_breach_detector_llm_cache_hits_total 1", text)
+
+        prometheus.write(os.path.join(self.test_dir, "metrics.prom"))
+        with open(os.path.join(self.test_dir, "metrics.prom")) as f:
+            self.assertEqual(f.read(), text)
+
+
+class TestQueryLLMMetrics(unittest.TestCase):
+    """
+    Test suite for QueryLLM's token and cache instrumentation.
+    """
+
+    @patch("contract_breach_detector.modules.query_llm.openai.OpenAI")
+    def test_records_tokens_and_cache_hits(self, mock_openai):
+        """
+        Tests that a request records its token usage and timing, and a repeat is a cache hit.
+        """
+        mock_openai.return_value.chat.completions.create.return_value = MagicMock(
+            choices=[MagicMock(message=MagicMock(content=json.dumps({"response": "ok"})))],
+            usage=MagicMock(prompt_tokens=12, completion_tokens=3),
+        )
+        cache_dir = os.path.join(os.path.dirname(__file__), "test_data", "test_metrics_cache")
+        self.addCleanup(shutil.rmtree, cache_dir, True)
+        metrics = InMemoryMetrics()
+        llm = QueryLLM(cache_dir=cache_dir, metrics=metrics)
+
+        messages = [{"role": "user", "content": "Hello"}]
+        llm.query_llm(messages)
+        llm.query_llm(messages)
+
+        summary = metrics.summary()
+        self.assertEqual(summary["stages"]["llm_request"]["count"], 1)
+        self.assertEqual(summary["counters"], {
+            "llm_cache_misses": 1,
+            "llm_cache_hits": 1,
+            'llm_prompt_tokens{model="gpt-4o-mini"}': 12,
+            'llm_completion_tokens{model="gpt-4o-mini"}': 3,
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import shutil
+import time
+import unittest
+from unittest.mock import patch
+from docx import Document
+from contract_breach_detector.modules.parsed_contract import ParsedContract, ParsedContractCache, document_text
+
+
+class TestParsedContract(unittest.TestCase):
+    """
+    Test suite for ParsedContract and ParsedContractCache.
+    """
+
+    def setUp(self):
+        """
+        Sets up a test contract on disk and an empty contract cache.
+        """
+        self.test_dir = os.path.join(os.path.dirname(__file__), "test_data", "test_parsed_contract")
+        os.makedirs(self.test_dir, exist_ok=True)
+        self.contract_path = os.path.join(self.test_dir, "contract.docx")
+        self._write_contract(["Contract Number: 12345", "Delivery Date: 2024-06-15"])
+        self.cache = ParsedContractCache(os.path.join(self.test_dir, "cache"))
+
+    def tearDown(self):
+        """
+        Clean up after tests by removing the test directory.
+        """
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _write_contract(self, paragraphs):
+        doc = Document()
+        for paragraph in paragraphs:
+            doc.add_paragraph(paragraph)
+        doc.save(self.contract_path)
+
+    def test_text_and_offsets_match_document(self):
+        """
+        Tests that the flattened text matches the Document join and offsets slice each paragraph.
+        """
+        document = Document(self.contract_path)
+        contract = ParsedContract.from_file(self.contract_path)
+
+        self.assertEqual(contract.text, document_text(document))
+        self.assertEqual(contract.paragraphs, [p.text for p in document.paragraphs])
+        self.assertEqual(len(contract.content_hash), 64)
+
+    def test_cache_skips_parsing_unchanged_file(self):
+        """
+        Tests that a second load of an unchanged file does not parse the .docx.
+        """
+        first = self.cache.load(self.contract_path)
+
+        with patch("contract_breach_detector.modules.parsed_contract.Document") as mock_document:
+            second = self.cache.load(self.contract_path)
+            mock_document.assert_not_called()
+
+        self.assertEqual(first, second)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_cache_reparses_changed_file(self):
+        """
+        Tests that an edited file is reparsed.
+        """
+        self.cache.load(self.contract_path)
+        time.sleep(0.01)
+        self._write_contract(["Contract Number: 67890"])
+
+        contract = self.cache.load(self.contract_path)
+
+        self.assertEqual(contract.text, "Contract Number: 67890")
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_cache_reuses_parse_for_identical_content(self):
+        """
+        Tests that a copy of a cached file is served by content hash without parsing.
+        """
+        self.cache.load(self.contract_path)
+        copy_path = os.path.join(self.test_dir, "copy.docx")
+        shutil.copy(self.contract_path, copy_path)
+
+        with patch("contract_breach_detector.modules.parsed_contract.Document") as mock_document:
+            contract = self.cache.load(copy_path)
+            mock_document.assert_not_called()
+
+        self.assertEqual(contract.path, copy_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
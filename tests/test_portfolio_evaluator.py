@@ -0,0 +1,103 @@
+import json
+import os
+import shutil
+import unittest
+import pandas as pd
+from contract_breach_detector.modules.DB_code import DataBase
+from contract_breach_detector.modules.portfolio_evaluator import PortfolioEvaluator
+
+
+class TestPortfolioEvaluator(unittest.TestCase):
+    """
+    Test suite for the PortfolioEvaluator class.
+    """
+
+    def setUp(self):
+        """
+        Writes ERP JSON with one contract split over two deliveries and one single delivery.
+        """
+        self.test_dir = os.path.join(os.path.dirname(__file__), "test_data", "test_portfolio")
+        os.makedirs(self.test_dir, exist_ok=True)
+        deliveries_path = os.path.join(self.test_dir, "deliveries.json")
+        items_path = os.path.join(self.test_dir, "items.json")
+
+        with open(deliveries_path, "w") as f:
+            json.dump([
+                {"delivery_id": 1, "delivery_date": "2024-06-10"},
+                {"delivery_id": 2, "delivery_date": "2024-06-20"},
+                {"delivery_id": 3, "delivery_date": "2024-06-01"},
+            ], f)
+        with open(items_path, "w") as f:
+            json.dump([
+                self._item(1, 111, 40, "Ton", 40000.0),
+                self._item(2, 111, 35, "Ton", 35000.0),
+                self._item(3, 222, 500, "EA", 10.0, pallet="1100mm x 900mm x 130mm"),
+            ], f)
+        self.database = DataBase(deliveries_path, items_path)
+        self.evaluator = PortfolioEvaluator(self.database)
+
+    def tearDown(self):
+        """
+        Clean up after tests by removing the test directory.
+        """
+        self.database.con.close()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    @staticmethod
+    def _item(delivery_id, contract_number, quantity, unit, weight, pallet="1200mm x 1000mm x 150mm"):
+        return {
+            "item_id": delivery_id, "delivery_id": delivery_id, "contract_number": contract_number,
+            "quantity": quantity, "base_unit_of_measure": unit, "weight": weight, "pallet_dimensions": pallet,
+        }
+
+    @staticmethod
+    def _terms(contract_number, delivery_date, quantity, weight, pallet):
+        return {
+            "info": {"contract_number": contract_number},
+            "details": {"delivery_date": delivery_date, "quantity": quantity,
+                        "weight": weight, "pallet_dimensions": pallet},
+        }
+
+    def test_evaluates_every_row_of_every_contract(self):
+        """
+        Tests that quantities are summed over deliveries and any late delivery is a breach.
+        """
+        report = self.evaluator.evaluate([
+            self._terms("111", "2024-06-15", "73 tons", "73,000 kg", "1200 x 1000 x 150 mm"),
+            self._terms("222", "2024-06-15", "500 units", "10 kg", "1200mm x 1000mm x 150mm"),
+        ])
+
+        self.assertEqual(list(report.deltas["erp_rows"]), [2, 1])
+        self.assertEqual(report.deltas.loc["111", "date_delta_days"], 5)  # The second delivery was late
+        self.assertEqual(report.deltas.loc["111", "quantity_delta"], 2000.0)  # 75 tons delivered, in kg
+
+        matrix = report.matrix
+        self.assertEqual(
+            matrix.loc["111", ["delivery_date", "quantity", "weight", "pallet_dimensions"]].tolist(),
+            [True, False, False, False],
+        )
+        self.assertEqual(
+            matrix.loc["222", ["delivery_date", "quantity", "weight", "pallet_dimensions"]].tolist(),
+            [False, False, False, True],
+        )
+        self.assertEqual(list(matrix["breached"]), [True, True])
+
+    def test_missing_and_undecided_values(self):
+        """
+        Tests that contracts without ERP rows breach and unparseable terms are left undecided.
+        """
+        report = self.evaluator.evaluate(pd.DataFrame([
+            {"contract_number": "999", "delivery_date": "2024-06-15", "quantity": "1",
+             "weight": "1", "pallet_dimensions": "1x1x1"},
+            {"contract_number": "222", "delivery_date": "2024-06-15", "quantity": "3 boxes",
+             "weight": "", "pallet_dimensions": "1100mm x 900mm x 130mm"},
+        ]))
+
+        self.assertTrue(report.matrix.loc["999"].all())
+        self.assertTrue(pd.isna(report.matrix.loc["222", "quantity"]))  # Boxes cannot be compared with EA
+        self.assertTrue(report.matrix.loc["222", "weight"])  # Missing
+        self.assertFalse(report.matrix.loc["222", "pallet_dimensions"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+from unittest.mock import MagicMock
+from contract_breach_detector.modules import structured_outputs
+from contract_breach_detector.modules.contract_processor import ContractProcessor
+from contract_breach_detector.modules.parsed_contract import ParsedContract
+from contract_breach_detector.modules.prompt_compactor import (
+    OMISSION_MARKER, CompactedText, PromptCompactor, schema_query
+)
+from contract_breach_detector.modules.query_llm import QueryLLM
+
+
+class TestPromptCompactor(unittest.TestCase):
+    """
+    Test suite for the PromptCompactor class.
+    """
+
+    def setUp(self):
+        """
+        Builds a long contract with the relevant clauses buried in boilerplate.
+        """
+        boilerplate = [
+            "Each party shall keep confidential all information disclosed to it by the other party.",
+            "This Agreement is governed by the laws of England and the courts of London have jurisdiction.",
+            "Neither party may assign this Agreement without the prior written consent of the other.",
+        ]
+        paragraphs = ["SUPPLY AGREEMENT", "Contract Number: 123456"]
+        paragraphs += [boilerplate[i % 3] for i in range(300)]
+        paragraphs[120] = "The goods shall be delivered no later than 12 May 2025."
+        paragraphs[200] = "The Supplier shall supply 500 units on pallets measuring 1200mm x 1000mm x 150mm."
+        paragraphs[250] = "For each week of late delivery the Supplier shall pay liquidated damages of 2%."
+        self.contract = ParsedContract.from_paragraphs(paragraphs)
+
+    def test_keeps_relevant_sections_within_budget(self):
+        """
+        Tests that the relevant clauses are kept in order within the budget and map back exactly.
+        """
+        compactor = PromptCompactor(token_budget=120)
+        compacted = compactor.compact(self.contract.text, structured_outputs.contract_enforcement)
+
+        self.assertLessEqual(len(compacted.text), 120 * 4)
+        for clause in ["Contract Number: 123456", "no later than 12 May 2025", "500 units", "liquidated damages"]:
+            self.assertIn(clause, compacted.text)
+        self.assertLess(compacted.text.index("12 May"), compacted.text.index("500 units"))
+        self.assertIn(OMISSION_MARKER, compacted.text)
+
+        for compacted_start, original_start, length in compacted.segments:
+            self.assertEqual(
+                compacted.text[compacted_start:compacted_start + length],
+                self.contract.text[original_start:original_start + length],
+            )
+        position = compacted.text.index("500 units")
+        self.assertEqual(self.contract.text[compacted.to_original(position):][:9], "500 units")
+
+    def test_small_budget_never_sends_empty_text(self):
+        """
+        Tests that a budget smaller than a section still sends the most relevant text, and that
+        a long paragraph is cut to fit the budget.
+        """
+        for token_budget in (10, 1, 0):
+            compacted = PromptCompactor(token_budget=token_budget).compact(self.contract.text, ["contract_number"])
+            self.assertTrue(compacted.text)
+            self.assertLessEqual(len(compacted.text), max(token_budget * 4, 1))
+            compacted_start, original_start, length = compacted.segments[0]
+            self.assertEqual(compacted.text, self.contract.text[original_start:original_start + length])
+
+        long_paragraph = "Contract Number: 123456 " + "boilerplate " * 500
+        compacted = PromptCompactor(token_budget=100).compact(long_paragraph, ["contract_number"])
+        self.assertTrue(compacted.text.startswith("Contract Number: 123456"))
+        self.assertLessEqual(len(compacted.text), 400)
+
+    def test_short_documents_are_unchanged(self):
+        """
+        Tests that text within the budget is sent as is.
+        """
+        compacted = PromptCompactor(token_budget=3000).compact("Contract Number: 1", ["contract_number"])
+        self.assertFalse(compacted.compacted)
+        self.assertEqual(compacted.text, "Contract Number: 1")
+        self.assertEqual(compacted.to_original(5), 5)
+
+    def test_schema_query_expands_keys(self):
+        """
+        Tests that schema keys and questions are tokenized and expanded.
+        """
+        query = schema_query({"info": {"contract_number": ""}, "Are there any late delivery clauses": ""})
+        self.assertIn("number", query)
+        self.assertIn("liquidated", query)
+
+    def test_locations_map_back_to_full_contract(self):
+        """
+        Tests that ContractProcessor remaps positions returned for the compacted text.
+        """
+        llm = MagicMock(spec=QueryLLM)
+        processor = ContractProcessor(llm, compactor=PromptCompactor(token_budget=120))
+
+        def respond(messages):
+            text = messages[1]["content"].split("\n\n", 1)[1]
+            start = text.index("500 units")
+            return {"quantity": {"value": "500 units", "start_position": str(start), "end_position": start + 9}}
+
+        llm.query_llm.side_effect = respond
+        locations = processor.extract_terms_with_locations(self.contract, ["quantity"])
+
+        start, end = int(locations["quantity"]["start_position"]), locations["quantity"]["end_position"]
+        self.assertEqual(self.contract.text[start:end], "500 units")
+        self.assertLess(len(llm.query_llm.call_args.args[0][1]["content"]), len(self.contract.text))
+
+        unchanged = CompactedText.identity("abc")
+        self.assertIs(unchanged.remap_locations(locations), locations)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,17 @@
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 import json
 import os
 import shutil
 import pickle
-from contract_breach_detector.modules.query_llm import QueryLLM
+import openai
+from contract_breach_detector.modules.query_llm import QueryLLM, AsyncQueryLLM, RateLimiter
+from contract_breach_detector.modules.cache_store import CachePolicy, SQLiteCache
+from contract_breach_detector.modules.mock_llm_server import MockLLMServer
 
 
 class TestQueryLLM(unittest.TestCase):
@@ -103,6 +110,256 @@ class TestQueryLLM(unittest.TestCase):
         # Clean up the cache
         os.remove(self.query_llm._cache_path(hash_key))
 
+    def test_repeated_query_served_from_memory(self):
+        """
+        Test repeated prompts are answered by the in-memory tier without touching disk.
+        """
+        messages = [{"role": "user", "content": "Repeat me"}]
+        first = self.query_llm.query_llm(messages)
+
+        # Remove the disk entry; the memory tier should still answer
+        os.remove(self.query_llm._cache_path(self.query_llm._query_hash(messages)))
+        second = self.query_llm.query_llm(messages)
+
+        self.assertEqual(first, second)
+        self.mock_openai.return_value.chat.completions.create.assert_called_once()
+        self.assertEqual(self.query_llm.memory_cache.stats()["hits"], 1)
+
+    def test_entry_written_by_another_process_is_promoted(self):
+        """
+        Test the leader's cache re-check promotes an entry another process wrote into the memory tier.
+        """
+        messages = [{"role": "user", "content": "Filled elsewhere"}]
+        query_hash = self.query_llm._query_hash(messages)
+        self.query_llm.cache.set(query_hash, {"response": "From another process"})
+
+        result = self.query_llm._request(query_hash, messages)
+
+        self.assertEqual(result, {"response": "From another process"})
+        self.mock_openai.return_value.chat.completions.create.assert_not_called()
+        self.assertEqual(self.query_llm.memory_cache.get(query_hash), result)
+
+    def test_lfu_policy_rejected_for_pickle_cache(self):
+        """
+        Test an LFU cache policy is refused for the default pickle backend, which does not count reads.
+        """
+        with self.assertRaises(ValueError):
+            QueryLLM(cache_dir=self.cache_dir, cache_policy=CachePolicy(eviction="lfu"), api_key="test")
+
+    def test_concurrent_identical_queries_coalesce(self):
+        """
+        Test concurrent identical queries from several threads make a single LLM request.
+        """
+        create = self.mock_openai.return_value.chat.completions.create
+        response = create.return_value
+        create.side_effect = lambda **kwargs: time.sleep(0.1) or response
+
+        messages = [{"role": "user", "content": "Shared prompt"}]
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = list(executor.map(lambda _: self.query_llm.query_llm(messages), range(5)))
+
+        self.assertEqual(results, [{"response": "Mocked response"}] * 5)
+        create.assert_called_once()
+
+    @patch("contract_breach_detector.modules.query_llm.openai.OpenAI")
+    def test_query_llm_with_sqlite_backend(self, mock_openai):
+        """
+        Test query_llm caches responses in a pluggable single-file backend.
+        """
+        mock_openai.return_value.chat.completions.create.return_value = (
+            self.mock_openai.return_value.chat.completions.create.return_value
+        )
+        store = SQLiteCache(os.path.join(self.cache_dir, "cache.sqlite"))
+        query_llm = QueryLLM(cache_backend=store)
+        messages = [{"role": "user", "content": "What is a breach?"}]
+
+        first = query_llm.query_llm(messages)
+        second = query_llm.query_llm(messages)
+
+        self.assertEqual(first, second)
+        mock_openai.return_value.chat.completions.create.assert_called_once()
+        self.assertEqual(store.get(query_llm._query_hash(messages)), first)
+        with self.assertRaises(TypeError):
+            query_llm._cache_path(query_llm._query_hash(messages))
+        store.close()
+
+
+class TestAsyncQueryLLM(unittest.TestCase):
+    """
+    Test suite for the AsyncQueryLLM class with mocked OpenAI clients.
+    """
+
+    @patch("contract_breach_detector.modules.query_llm.openai.AsyncOpenAI")
+    @patch("contract_breach_detector.modules.query_llm.openai.OpenAI")
+    def setUp(self, mock_openai, mock_async_openai):
+        """
+        Sets up the test environment for AsyncQueryLLM.
+        """
+        self.cache_dir = os.path.join(os.path.dirname(__file__), "test_data", "test_async_cache")
+        self.mock_create = AsyncMock(
+            return_value=MagicMock(
+                choices=[MagicMock(message=MagicMock(content=json.dumps({"response": "Mocked response"})))]
+            )
+        )
+        mock_async_openai.return_value.chat.completions.create = self.mock_create
+        self.query_llm = AsyncQueryLLM(cache_dir=self.cache_dir, base_delay=0.01, max_delay=0.05)
+
+    def tearDown(self):
+        """
+        Clean up after tests by removing the test cache directory.
+        """
+        if os.path.exists(self.cache_dir):
+            shutil.rmtree(self.cache_dir)
+
+    @staticmethod
+    def _rate_limit_error():
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        response = httpx.Response(429, request=request)
+        return openai.RateLimitError("Rate limited", response=response, body=None)
+
+    def test_positional_arguments_match_query_llm(self):
+        """
+        Test positional arguments keep QueryLLM's order, with rate limits keyword-only.
+        """
+        query_llm = AsyncQueryLLM(True, "gpt-4o", self.cache_dir, max_concurrency=2, api_key="test")
+        self.assertTrue(query_llm.debug)
+        self.assertEqual(query_llm.model, "gpt-4o")
+        self.assertEqual(query_llm.limiter.max_concurrency, 2)
+
+    def test_aquery_llm_shares_cache_keys(self):
+        """
+        Test aquery_llm uses the same cache keys as the synchronous client.
+        """
+        messages = [{"role": "user", "content": "What are Newton's laws of motion?"}]
+        query_hash = self.query_llm._generate_hash(" ".join(f"{msg['role']}: {msg['content']}" for msg in messages))
+        self.query_llm._save_to_cache(query_hash, {"response": "Cached response"})
+
+        response = asyncio.run(self.query_llm.aquery_llm(messages))
+        self.assertEqual(response, {"response": "Cached response"})
+        self.mock_create.assert_not_called()
+
+    def test_aquery_llm_without_cache(self):
+        """
+        Test aquery_llm queries the async client and caches the response.
+        """
+        messages = [{"role": "user", "content": "What is a contract?"}]
+        response = asyncio.run(self.query_llm.aquery_llm(messages))
+
+        self.assertEqual(response["response"], "Mocked response")
+        self.mock_create.assert_awaited_once()
+        self.assertEqual(self.query_llm._load_from_cache(self.query_llm._query_hash(messages)), response)
+
+    def test_concurrent_identical_aqueries_coalesce(self):
+        """
+        Test concurrent identical queries from several tasks make a single LLM request.
+        """
+        response = self.mock_create.return_value
+
+        async def slow_create(**kwargs):
+            await asyncio.sleep(0.05)
+            return response
+
+        self.mock_create.side_effect = slow_create
+        messages = [{"role": "user", "content": "Shared async prompt"}]
+
+        async def run_all():
+            return await asyncio.gather(*(self.query_llm.aquery_llm(messages) for _ in range(5)))
+
+        results = asyncio.run(run_all())
+        self.assertEqual(results, [{"response": "Mocked response"}] * 5)
+        self.mock_create.assert_awaited_once()
+
+    def test_aquery_llm_retries_rate_limits(self):
+        """
+        Test aquery_llm backs off and retries when the API returns 429.
+        """
+        success = self.mock_create.return_value
+        self.mock_create.side_effect = [self._rate_limit_error(), self._rate_limit_error(), success]
+
+        response = asyncio.run(self.query_llm.aquery_llm([{"role": "user", "content": "Retry me"}]))
+
+        self.assertEqual(response["response"], "Mocked response")
+        self.assertEqual(self.mock_create.await_count, 3)
+
+    def test_aquery_llm_gives_up_after_max_retries(self):
+        """
+        Test aquery_llm raises once the retry budget is exhausted.
+        """
+        self.query_llm.max_retries = 1
+        self.mock_create.side_effect = self._rate_limit_error()
+
+        with self.assertRaises(openai.RateLimitError):
+            asyncio.run(self.query_llm.aquery_llm([{"role": "user", "content": "Always limited"}]))
+        self.assertEqual(self.mock_create.await_count, 2)
+
+    def test_client_does_not_retry_rate_limits_itself(self):
+        """
+        Test only aquery_llm's own retry loop re-sends a rate-limited request, not the OpenAI client.
+        """
+        with MockLLMServer(error_rate=1.0, error_status=429) as server:
+            query_llm = AsyncQueryLLM(
+                cache_dir=self.cache_dir, base_url=server.url, api_key="mock", max_retries=1, base_delay=0.01,
+            )
+            with self.assertRaises(openai.RateLimitError):
+                asyncio.run(query_llm.aquery_llm([{"role": "user", "content": "Always limited"}]))
+
+        self.assertEqual(server.requests, 2)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """
+    Test suite for the RateLimiter scheduler.
+    """
+
+    def test_caps_concurrency(self):
+        """
+        Test that no more than max_concurrency requests run at once.
+        """
+        state = {"running": 0, "peak": 0}
+
+        async def request():
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+            await asyncio.sleep(0.01)
+            state["running"] -= 1
+
+        async def run_all():
+            limiter = RateLimiter(max_concurrency=3, tokens_per_minute=1_000_000)
+            await asyncio.gather(*(limiter.run(1, request) for _ in range(10)))
+
+        asyncio.run(run_all())
+        self.assertEqual(state["peak"], 3)
+
+    def test_waits_for_token_budget(self):
+        """
+        Test that requests beyond the token budget wait for the bucket to refill.
+        """
+        async def run_all():
+            limiter = RateLimiter(max_concurrency=10, tokens_per_minute=6000)  # Refills 100 tokens/s
+            start = asyncio.get_running_loop().time()
+            await limiter.run(6000, AsyncMock())
+            await limiter.run(10, AsyncMock())
+            return asyncio.get_running_loop().time() - start
+
+        self.assertGreaterEqual(asyncio.run(run_all()), 0.09)
+
+    def test_reused_across_event_loops(self):
+        """
+        Test that one limiter serves successive asyncio.run calls, each with its own event loop.
+        """
+        limiter = RateLimiter(max_concurrency=1, tokens_per_minute=1_000_000)
+
+        async def request():
+            await asyncio.sleep(0.01)
+            return "done"
+
+        async def run_all():
+            # More requests than slots, so callers wait on the semaphore and bind it to the loop
+            return await asyncio.gather(*(limiter.run(1, request) for _ in range(4)))
+
+        self.assertEqual(asyncio.run(run_all()), ["done"] * 4)
+        self.assertEqual(asyncio.run(run_all()), ["done"] * 4)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import shutil
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from contract_breach_detector.modules.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """
+    Test suite for the SingleFlight deduplicator.
+    """
+
+    def setUp(self):
+        """
+        Sets up a SingleFlight instance and a call counter.
+        """
+        self.single_flight = SingleFlight()
+        self.calls = 0
+        self.calls_lock = threading.Lock()
+
+    def _slow_work(self, value="result"):
+        with self.calls_lock:
+            self.calls += 1
+        time.sleep(0.1)
+        return value
+
+    def test_threads_share_one_call(self):
+        """
+        Tests that concurrent threads with the same key trigger a single call.
+        """
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: self.single_flight.do("key", self._slow_work), range(8)))
+
+        self.assertEqual(results, ["result"] * 8)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.single_flight.shared, 7)
+
+    def test_different_keys_run_separately(self):
+        """
+        Tests that distinct keys are not coalesced.
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda key: self.single_flight.do(key, self._slow_work), ["a", "b"]))
+
+        self.assertEqual(self.calls, 2)
+
+    def test_errors_propagate_to_waiters(self):
+        """
+        Tests that every waiter receives the leader's exception and the key is released.
+        """
+        def failing():
+            time.sleep(0.1)
+            raise ValueError("boom")
+
+        def call(_):
+            try:
+                return self.single_flight.do("key", failing)
+            except ValueError as e:
+                return str(e)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(call, range(4)))
+
+        self.assertEqual(results, ["boom"] * 4)
+        self.assertEqual(self.single_flight.do("key", lambda: "retried"), "retried")
+
+    def test_tasks_and_threads_share_one_call(self):
+        """
+        Tests that asyncio tasks and a thread asking for the same key coalesce.
+        """
+        async def slow_coro():
+            with self.calls_lock:
+                self.calls += 1
+            await asyncio.sleep(0.2)
+            return "result"
+
+        async def run_all():
+            tasks = [asyncio.create_task(self.single_flight.ado("key", slow_coro)) for _ in range(5)]
+            await asyncio.sleep(0)  # Let the tasks register before the thread arrives
+            thread_result = asyncio.to_thread(self.single_flight.do, "key", self._slow_work)
+            return await asyncio.gather(*tasks, thread_result)
+
+        results = asyncio.run(run_all())
+
+        self.assertEqual(results, ["result"] * 6)
+        self.assertEqual(self.calls, 1)
+
+    def test_process_lock_mode(self):
+        """
+        Tests that leaders sharing a lock directory, as separate worker processes would, run one at a time.
+        """
+        lock_dir = os.path.join(os.path.dirname(__file__), "test_data", "test_locks")
+        self.addCleanup(shutil.rmtree, lock_dir, True)
+        state = {"running": 0, "peak": 0}
+
+        def tracked_work():
+            with self.calls_lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.05)
+            with self.calls_lock:
+                state["running"] -= 1
+            return "result"
+
+        # Separate instances do not share an in-flight table, only the lock files
+        workers = [SingleFlight(lock_dir=lock_dir) for _ in range(3)]
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results = list(executor.map(lambda sf: sf.do("key", tracked_work), workers))
+
+        self.assertEqual(results, ["result"] * 3)
+        self.assertEqual(state["peak"], 1)
+        self.assertEqual(len(os.listdir(lock_dir)), 1)
+
+    def test_lock_files_are_bounded(self):
+        """
+        Tests that cross-process lock files are striped rather than created per key.
+        """
+        lock_dir = os.path.join(os.path.dirname(__file__), "test_data", "test_locks")
+        self.addCleanup(shutil.rmtree, lock_dir, True)
+        single_flight = SingleFlight(lock_dir=lock_dir, lock_stripes=8)
+
+        async def work():
+            return "result"
+
+        for i in range(100):
+            single_flight.do(f"key-{i}", lambda: "result")
+        asyncio.run(single_flight.ado("async-key", work))
+
+        self.assertLessEqual(len(os.listdir(lock_dir)), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import MagicMock
+from docx import Document
+from contract_breach_detector.modules.contract_processor import ContractProcessor
+from contract_breach_detector.modules.span_aligner import SpanAligner
+
+
+class TestSpanAligner(unittest.TestCase):
+    """
+    Test suite for the SpanAligner class.
+    """
+
+    def test_exact_match_nearest_to_hint(self):
+        """
+        Tests that a repeated value resolves to the occurrence nearest the reported position.
+        """
+        text = "Contract Number: 12345. Reference to contract 12345 again."
+        aligner = SpanAligner(text)
+
+        self.assertEqual(aligner.align("12345").start, 17)
+        alignment = aligner.align("12345", hint=40)
+        self.assertEqual((alignment.start, alignment.end, alignment.method), (46, 51, "exact"))
+
+    def test_whole_word_match_preferred(self):
+        """
+        Tests that a number is not matched inside a longer number when it also appears on its own.
+        """
+        text = "Order ref 15000 units. Quantity: 500 units."
+        aligner = SpanAligner(text)
+
+        self.assertEqual(aligner.align("500").start, text.index("500 units."))
+        self.assertEqual(aligner.align("500 UNITS").start, text.index("500 units."))
+        self.assertEqual(aligner.align("1500").start, text.index("15000"))  # Substring fallback
+
+    def test_normalised_match(self):
+        """
+        Tests that differences in whitespace and case still find the value in the original text.
+        """
+        text = "Goods shall be delivered\n   NO LATER THAN 15 June 2024."
+        alignment = SpanAligner(text).align("no later than 15 june 2024")
+
+        self.assertEqual(alignment.method, "normalised")
+        self.assertEqual(text[alignment.start:alignment.end], "NO LATER THAN 15 June 2024")
+
+    def test_approximate_match(self):
+        """
+        Tests that a slightly paraphrased value is matched approximately, and an absent one is not.
+        """
+        text = "The Supplier shall deliver 1,200 units of copper cable to the Buyer."
+        aligner = SpanAligner(text)
+        alignment = aligner.align("1200 units of copper cables")
+
+        self.assertEqual(alignment.method, "approximate")
+        self.assertGreaterEqual(alignment.score, 0.8)
+        self.assertIn("units of copper cable", text[alignment.start:alignment.end])
+        self.assertIsNone(aligner.align("banana"))
+
+    def test_align_locations(self):
+        """
+        Tests that wrong positions are corrected and unfindable values are left unhighlighted.
+        """
+        text = "Contract Number: 12345\nDelivery Date: 15 June 2024"
+        locations = {
+            "contract_number": {"value": "12345", "start_position": "3", "end_position": "8"},
+            "penalty": {"value": "5% per week", "start_position": "30", "end_position": "41"},
+            "empty": {"value": "", "start_position": "", "end_position": ""},
+        }
+        aligned = SpanAligner(text).align_locations(locations)
+
+        self.assertEqual(aligned["contract_number"]["start_position"], 17)
+        self.assertEqual(aligned["contract_number"]["end_position"], 22)
+        self.assertEqual(aligned["contract_number"]["alignment"], "exact")
+        self.assertEqual(aligned["penalty"]["start_position"], "")
+        self.assertEqual(aligned["penalty"]["alignment"], "unresolved")
+        self.assertEqual(aligned["empty"], locations["empty"])
+        self.assertEqual(locations["contract_number"]["start_position"], "3")  # Input is not modified
+
+    def test_contract_processor_alignment(self):
+        """
+        Tests that ContractProcessor corrects LLM positions when alignment is enabled, and can
+        locate values without asking the LLM for positions.
+        """
+        mock_llm = MagicMock()
+        mock_llm.query_llm.return_value = {
+            "contract_number": {"value": "12345", "start_position": "0", "end_position": "5"},
+        }
+        processor = ContractProcessor(mock_llm, align_locations=True)
+        doc = Document()
+        doc.add_paragraph("Contract Number: 12345")
+
+        result = processor.extract_terms_with_locations(doc, ["contract_number"])
+        self.assertEqual((result["contract_number"]["start_position"], result["contract_number"]["end_position"]), (17, 22))
+
+        located = processor.locate_values(doc, {"contract_number": "12345"})
+        self.assertEqual(located["contract_number"]["start_position"], 17)
+        mock_llm.query_llm.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()